@@ -8,8 +8,9 @@ from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 
 from config import Config
+from app.db_routing import RoutingSession, init_replica_routing, replica_engine
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 jwt = JWTManager()
 
 
@@ -25,11 +26,19 @@ def create_app(config_class=Config):
 
     CORS(flask_app)
     db.init_app(flask_app)
+    init_replica_routing(flask_app)
     jwt.init_app(flask_app)
 
     with flask_app.app_context():
         import app.models  # noqa: F401 - register models for create_all
+        if flask_app.config.get("SQLITE_PROFILE", Config.SQLITE_PROFILE):
+            from app.sqlite_profile import apply_sqlite_profile
+            for engine in (db.engine, replica_engine(flask_app)):
+                if engine is not None:
+                    apply_sqlite_profile(engine)
         db.create_all()
+        from app.migrations import migrate
+        migrate(db.engine, db.metadata)
 
     from app.routes.auth import auth_bp
     from app.routes.users import users_bp
@@ -42,6 +51,7 @@ def create_app(config_class=Config):
     from app.routes.tts_stt import tts_stt_bp
     from app.routes.feedback import feedback_bp
     from app.routes.pages import pages_bp
+    from app.services.media import get_media_index, start_background_janitor
 
     flask_app.register_blueprint(pages_bp)
     flask_app.register_blueprint(auth_bp, url_prefix="/api/auth")
@@ -62,7 +72,13 @@ def create_app(config_class=Config):
     upload_folder = os.path.abspath(flask_app.config.get("UPLOAD_FOLDER", "uploads"))
     @flask_app.route("/uploads/<path:filename>")
     def serve_upload(filename):
-        return send_from_directory(upload_folder, filename)
+        response = send_from_directory(upload_folder, filename)
+        get_media_index().touch(filename)
+        return response
+
+    interval = flask_app.config.get("MEDIA_JANITOR_INTERVAL") or 0
+    if interval > 0 and not flask_app.testing:
+        start_background_janitor(flask_app, interval)
 
     @flask_app.errorhandler(500)
     def handle_500(e):
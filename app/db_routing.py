@@ -0,0 +1,80 @@
+"""
+Read-replica routing. With DATABASE_REPLICA_URL (SQLALCHEMY_REPLICA_URI) set, init_replica_routing() opens a
+second engine with the primary's SQLALCHEMY_ENGINE_OPTIONS, and RoutingSession sends SELECTs issued by
+read-only requests to it: GET/HEAD handlers of the blueprints in REPLICA_BLUEPRINTS. Everything else
+(flushes, INSERT/UPDATE/DELETE, raw SQL, other blueprints, any request without a replica) uses the primary.
+Replicas lag, so after a request commits a write the client gets a short-lived cookie that keeps its reads
+on the primary for DB_REPLICA_STICKY_SECONDS (read-your-writes).
+The replica is not a Flask-SQLAlchemy bind: binds register metadata on the shared `db`, and create_all()
+would then expect that bind in every app. Its schema comes from replication, not from create_all().
+"""
+import time
+
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event
+
+from config import Config
+
+REPLICA_EXTENSION = "db_replica"
+# Blueprints whose GET handlers only read, and may see data a moment old
+REPLICA_BLUEPRINTS = frozenset({"categories", "reading", "listening", "writing", "speaking", "reels"})
+STICKY_COOKIE = "db_primary_until"
+
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            if self._flushing or getattr(clause, "is_dml", False):
+                self.info["wrote"] = True
+            elif getattr(clause, "is_select", False) and has_request_context() and g.get("db_replica"):
+                engine = replica_engine(current_app)
+                if engine is not None:
+                    return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _note_write(session):
+    if session.info.pop("wrote", False) and has_request_context():
+        g.db_wrote = True
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _forget_write(session):
+    session.info.pop("wrote", None)
+
+
+def _sticky_until() -> float:
+    try:
+        return float(request.cookies.get(STICKY_COOKIE) or 0)
+    except ValueError:
+        return 0.0
+
+
+def replica_engine(app):
+    return app.extensions.get(REPLICA_EXTENSION)
+
+
+def init_replica_routing(app):
+    """Open the replica engine and route read-only requests to it, if configured; no-op otherwise."""
+    url = app.config.get("SQLALCHEMY_REPLICA_URI")
+    if not url:
+        return
+    app.extensions[REPLICA_EXTENSION] = create_engine(url, **app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {}))
+    sticky_s = app.config.get("DB_REPLICA_STICKY_SECONDS", Config.DB_REPLICA_STICKY_SECONDS)
+
+    @app.before_request
+    def _choose_database():
+        g.db_replica = (
+            request.method in ("GET", "HEAD")
+            and request.blueprint in REPLICA_BLUEPRINTS
+            and _sticky_until() <= time.time()
+        )
+
+    @app.after_request
+    def _stick_to_primary(response):
+        if sticky_s > 0 and g.get("db_wrote"):
+            response.set_cookie(STICKY_COOKIE, f"{time.time() + sticky_s:.3f}", max_age=int(sticky_s) or 1,
+                                httponly=True, samesite="Lax")
+        return response
@@ -0,0 +1,276 @@
+"""
+Versioned schema migrations, run by create_app() after db.create_all() (CLI: migrate.py).
+create_all() only creates missing tables; changes to existing tables (new columns, new indexes) go here as
+numbered steps. Applied versions are recorded in schema_version, and every step is idempotent, so a database
+created fresh by create_all() just records them, and several workers starting at once cannot apply a step twice.
+Append new steps to MIGRATIONS; never renumber or edit an applied one.
+"""
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, inspect, select, type_coerce
+from sqlalchemy.exc import IntegrityError
+
+from app.models import CompactId, generate_id
+
+logger = logging.getLogger(__name__)
+
+_version_metadata = MetaData()
+schema_version = Table(
+    "schema_version",
+    _version_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String(100), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    apply: Callable  # apply(connection, metadata)
+
+
+def _add_missing_columns(conn, metadata):
+    """create_all() never alters existing tables: add new nullable model columns to an older database."""
+    inspector = inspect(conn)
+    for table in metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            ddl = column.type.compile(dialect=conn.dialect)
+            conn.exec_driver_sql(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {ddl}')
+
+
+def _create_indexes(*names):
+    """Step that creates the named model indexes (declared in __table_args__) if they are missing."""
+
+    def apply(conn, metadata):
+        wanted = set(names)
+        for table in metadata.sorted_tables:
+            for index in table.indexes:
+                if index.name in wanted:
+                    index.create(conn, checkfirst=True)
+                    wanted.discard(index.name)
+        if wanted:
+            raise RuntimeError(f"Indexes not declared on any model: {sorted(wanted)}")
+
+    return apply
+
+
+def _rebuild_indexes(*names):
+    """Step that drops the named indexes (if present) and creates them from their current model definition."""
+    create = _create_indexes(*names)
+
+    def apply(conn, metadata):
+        inspector = inspect(conn)
+        for table in metadata.sorted_tables:
+            existing = {i["name"] for i in inspector.get_indexes(table.name)} if inspector.has_table(table.name) else set()
+            for index in table.indexes:
+                if index.name in names and index.name in existing:
+                    index.drop(conn)
+        create(conn, metadata)
+
+    return apply
+
+
+def _fill_keyset_columns(conn, metadata):
+    """Keyset pagination keys must be non-null: default old rows' missing order / created_at."""
+    for table in ("reels", "reel_batches"):
+        conn.exec_driver_sql(f'UPDATE "{table}" SET "order" = 0 WHERE "order" IS NULL')
+    for table in ("reels", "reel_batches", "feedback"):
+        conn.exec_driver_sql(f'UPDATE "{table}" SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL')
+    _rebuild_indexes(
+        "ix_feedback_user_type_created", "ix_feedback_user_created", "ix_reels_order", "ix_reel_batches_order",
+    )(conn, metadata)
+
+
+def _reel_feed_in_batch_order(conn, metadata):
+    """The reel feed key gained order_in_batch (authored order inside a batch): default its NULLs to 0 and
+    rebuild ix_reels_order with the column."""
+    conn.exec_driver_sql('UPDATE "reels" SET order_in_batch = 0 WHERE order_in_batch IS NULL')
+    _rebuild_indexes("ix_reels_order")(conn, metadata)
+
+
+def _require_compact_ids(conn, metadata):
+    """Ids became 16-byte UUIDv7 values. Rewriting every key and reference in place is not portable, so a
+    database that still holds the old text ids is copied instead (copy_with_new_ids / migrate_ids.py)."""
+    inspector = inspect(conn)
+    for table in metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        pk = table.c.id
+        if conn.dialect.name == "sqlite":
+            # Column types are not enforced: only the stored values tell old ids from new ones
+            legacy = conn.execute(
+                select(pk).where(func.typeof(type_coerce(pk, String)) != "blob").limit(1)
+            ).first() is not None
+        else:
+            declared = next(c["type"] for c in inspector.get_columns(table.name) if c["name"] == "id")
+            legacy = isinstance(declared, String)
+        if legacy:
+            raise RuntimeError(
+                f"Table {table.name} still uses text ids. Copy the database with "
+                "`python migrate_ids.py --target <new database URL>` and point DATABASE_URL at the copy."
+            )
+
+
+def _backfill_progress_counters(conn, metadata):
+    """Level completion reads user_level_counters, which only submissions made since they existed have
+    filled: rebuild them and user_item_completions from the attempt tables (progress_counters.py backfill
+    does the same through the ORM; it stays available for repairing drift later).
+    """
+    from app.services.progress import KINDS
+
+    completions = metadata.tables["user_item_completions"]
+    counters = metadata.tables["user_level_counters"]
+    expected = set()
+    for kind, spec in KINDS.items():
+        item, attempt = spec.item_model.__table__, spec.attempt_model.__table__
+        fk = attempt.c[spec.item_fk]
+        rows = conn.execute(select(attempt.c.user_id, item.c.level_id, fk).join(item, item.c.id == fk).distinct())
+        expected.update((user_id, level_id, kind, item_id) for user_id, level_id, item_id in rows)
+    counts = {}
+    for user_id, level_id, _kind, _item_id in expected:
+        counts[(user_id, level_id)] = counts.get((user_id, level_id), 0) + 1
+    conn.execute(completions.delete())
+    conn.execute(counters.delete())
+    if expected:
+        conn.execute(completions.insert(), [
+            {"user_id": u, "level_id": l, "item_type": k, "item_id": i} for u, l, k, i in expected
+        ])
+        conn.execute(counters.insert(), [
+            {"user_id": u, "level_id": l, "completed_items": n} for (u, l), n in counts.items()
+        ])
+
+
+def _remap(values: dict, id_columns, mapping: dict) -> dict | None:
+    """Row values with old ids replaced by new ones; None if a required reference has no target row."""
+    for c in id_columns:
+        old = values[c.name]
+        values[c.name] = mapping.get(old) if old is not None else None
+        if old is not None and values[c.name] is None and not c.nullable:
+            return None
+    return values
+
+
+def copy_with_new_ids(source, target, metadata, batch_size: int = 1000, log=None) -> dict:
+    """Copy every model table from the `source` engine (text ids) into `target`, whose schema must exist and
+    be empty. Each row gets a UUIDv7 id stamped with its created_at, so ids keep creation order, and every
+    reference (foreign keys and user_item_completions.item_id) is rewritten to match. Rows whose required
+    reference points at a missing row are dropped. Returns {table: rows copied, "dropped": n}.
+    Run migrate() on the target afterwards, as migrate_ids.py does: migration 5 then rebuilds the progress
+    counters from the copied attempts.
+    """
+    source_inspector = inspect(source)
+    tables = [t for t in metadata.sorted_tables if source_inspector.has_table(t.name)]
+    with target.connect() as conn:
+        for table in tables:
+            if conn.execute(select(func.count()).select_from(table)).scalar():
+                raise RuntimeError(f"Target table {table.name} is not empty")
+
+    def read(conn, table, columns):
+        order = table.c.created_at if "created_at" in table.c else table.c.id
+        cols = [type_coerce(c, String).label(c.name) if isinstance(c.type, CompactId) else c for c in columns]
+        return conn.execution_options(yield_per=batch_size).execute(select(*cols).order_by(order))
+
+    # Pass 1: new ids for every row of every table, so references resolve whatever the table order
+    mapping = {}
+    with source.connect() as conn:
+        for table in tables:
+            stamp = [table.c.created_at] if "created_at" in table.c else []
+            for row in read(conn, table, [table.c.id, *stamp]):
+                if row.id in mapping:
+                    raise RuntimeError(f"Id {row.id} occurs in more than one table")
+                mapping[row.id] = generate_id(row.created_at if stamp else None)
+
+    # Pass 2: copy rows in foreign-key order with every id column rewritten
+    stats = {"dropped": 0}
+    with source.connect() as src, target.begin() as dst:
+        for table in tables:
+            present = {c["name"] for c in source_inspector.get_columns(table.name)}
+            columns = [c for c in table.columns if c.name in present]
+            id_columns = [c for c in columns if isinstance(c.type, CompactId)]
+            copied, batch = 0, []
+            for row in read(src, table, columns):
+                values = _remap(dict(row._mapping), id_columns, mapping)
+                if values is None:
+                    stats["dropped"] += 1
+                    continue
+                batch.append(values)
+                copied += 1
+                if len(batch) >= batch_size:
+                    dst.execute(table.insert(), batch)
+                    batch = []
+            if batch:
+                dst.execute(table.insert(), batch)
+            stats[table.name] = copied
+            if log:
+                log(f"{table.name}: {copied} rows")
+    return stats
+
+
+MIGRATIONS = [
+    Migration(1, "add_missing_columns", _add_missing_columns),
+    Migration(2, "hot_lookup_indexes", _create_indexes(
+        "ix_feedback_user_type_created",
+        "ix_feedback_user_created",
+        "ix_reading_attempts_user_text",
+        "ix_reading_attempts_text",
+        "ix_listening_attempts_user_audio",
+        "ix_listening_attempts_audio",
+        "ix_writing_submissions_user_topic",
+        "ix_writing_submissions_topic",
+        "ix_speaking_attempts_user_exercise",
+        "ix_speaking_attempts_exercise",
+        "ix_reel_batch_attempts_user_batch",
+        "ix_levels_category_order",
+        "ix_reading_texts_level_order",
+        "ix_reading_questions_text_order",
+        "ix_listening_audios_level_order",
+        "ix_writing_topics_level_order",
+        "ix_speaking_exercises_level_order",
+        "ix_reels_batch_order",
+        "ix_reels_order",
+    )),
+    Migration(3, "keyset_pagination", _fill_keyset_columns),
+    Migration(4, "compact_ids", _require_compact_ids),
+    Migration(5, "progress_counters", _backfill_progress_counters),
+    Migration(6, "reel_feed_in_batch_order", _reel_feed_in_batch_order),
+]
+
+
+def applied_versions(engine) -> dict[int, datetime]:
+    _version_metadata.create_all(engine)
+    with engine.connect() as conn:
+        return {v: at for v, at in conn.execute(select(schema_version.c.version, schema_version.c.applied_at))}
+
+
+def pending(engine) -> list[Migration]:
+    done = applied_versions(engine)
+    return [m for m in MIGRATIONS if m.version not in done]
+
+
+def migrate(engine, metadata) -> list[int]:
+    """Apply pending steps in order, each in its own transaction. Returns the versions applied here."""
+    applied = []
+    for migration in pending(engine):
+        try:
+            with engine.begin() as conn:
+                migration.apply(conn, metadata)
+                conn.execute(schema_version.insert().values(
+                    version=migration.version, name=migration.name, applied_at=datetime.utcnow(),
+                ))
+        except IntegrityError:
+            # Another process recorded this version first; its step is idempotent with ours
+            logger.info("Migration %s already applied by another process", migration.version)
+            continue
+        logger.info("Applied migration %s (%s)", migration.version, migration.name)
+        applied.append(migration.version)
+    return applied
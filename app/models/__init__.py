@@ -2,17 +2,66 @@
 SQLAlchemy models for language learning app.
 """
 from app import db
-from datetime import datetime
+from datetime import datetime, timezone
+import os
+import time
 import uuid
 
-
-def generate_id():
-    return str(uuid.uuid4())[:25]
+from sqlalchemy.dialects import mysql, postgresql
+from sqlalchemy.types import LargeBinary, TypeDecorator
+
+# Matches nothing: ids that are not UUIDs (e.g. pre-UUIDv7 ids in old links) bind as this
+_NO_ID = uuid.UUID(int=0)
+
+
+def generate_id(at: datetime | None = None) -> str:
+    """UUIDv7 string: 48-bit Unix ms timestamp (now, or naive-UTC `at`) then 74 random bits, so ids sort by
+    creation time and new rows append to the right edge of the primary-key and foreign-key indexes."""
+    if at is None:
+        ms = time.time_ns() // 1_000_000
+    else:
+        ms = int((at if at.tzinfo else at.replace(tzinfo=timezone.utc)).timestamp() * 1000)
+    rand = int.from_bytes(os.urandom(10), "big")
+    value = (ms & (1 << 48) - 1) << 80 | 0x7 << 76 | (rand >> 68) << 64 | 0b10 << 62 | rand & (1 << 62) - 1
+    return str(uuid.UUID(int=value))
+
+
+class CompactId(TypeDecorator):
+    """Primary/foreign key holding a UUID string in Python and 16 bytes in the database: native uuid on
+    PostgreSQL, BINARY(16) on MySQL, a 16-byte BLOB elsewhere."""
+    impl = LargeBinary(16)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(postgresql.UUID(as_uuid=False))
+        if dialect.name in ("mysql", "mariadb"):
+            return dialect.type_descriptor(mysql.BINARY(16))
+        return dialect.type_descriptor(LargeBinary(16))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        try:
+            if isinstance(value, uuid.UUID):
+                parsed = value
+            elif isinstance(value, (bytes, memoryview)):
+                parsed = uuid.UUID(bytes=bytes(value))  # raw column value, e.g. from a text() query
+            else:
+                parsed = uuid.UUID(str(value))
+        except ValueError:
+            parsed = _NO_ID
+        return str(parsed) if dialect.name == "postgresql" else parsed.bytes
+
+    def process_result_value(self, value, dialect):
+        if value is None or isinstance(value, str):
+            return value
+        return str(uuid.UUID(bytes=bytes(value)))
 
 
 class User(db.Model):
     __tablename__ = "users"
-    id = db.Column(db.String(36), primary_key=True, default=generate_id)
+    id = db.Column(CompactId, primary_key=True, default=generate_id)
     email = db.Column(db.String(255), unique=True, nullable=False)
     password_hash = db.Column(db.String(255), nullable=False)
     name = db.Column(db.String(255))
@@ -32,7 +81,7 @@ class User(db.Model):
 
 class Category(db.Model):
     __tablename__ = "categories"
-    id = db.Column(db.String(36), primary_key=True, default=generate_id)
+    id = db.Column(CompactId, primary_key=True, default=generate_id)
     slug = db.Column(db.String(50), unique=True, nullable=False)
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text)
@@ -44,8 +93,8 @@ class Category(db.Model):
 
 class Level(db.Model):
     __tablename__ = "levels"
-    id = db.Column(db.String(36), primary_key=True, default=generate_id)
-    category_id = db.Column(db.String(36), db.ForeignKey("categories.id", ondelete="CASCADE"), nullable=False)
+    id = db.Column(CompactId, primary_key=True, default=generate_id)
+    category_id = db.Column(CompactId, db.ForeignKey("categories.id", ondelete="CASCADE"), nullable=False)
     order = db.Column(db.Integer, nullable=False)
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text)
@@ -57,13 +106,15 @@ class Level(db.Model):
     writing_topics = db.relationship("WritingTopic", back_populates="level", cascade="all, delete-orphan")
     speaking_exercises = db.relationship("SpeakingExercise", back_populates="level", cascade="all, delete-orphan")
 
+    __table_args__ = (db.Index("ix_levels_category_order", "category_id", "order"),)
+
 
 class UserLevelProgress(db.Model):
     __tablename__ = "user_level_progress"
-    id = db.Column(db.String(36), primary_key=True, default=generate_id)
-    user_id = db.Column(db.String(36), db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    category_id = db.Column(db.String(36), db.ForeignKey("categories.id", ondelete="CASCADE"), nullable=False)
-    level_id = db.Column(db.String(36), db.ForeignKey("levels.id", ondelete="CASCADE"), nullable=False)
+    id = db.Column(CompactId, primary_key=True, default=generate_id)
+    user_id = db.Column(CompactId, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    category_id = db.Column(CompactId, db.ForeignKey("categories.id", ondelete="CASCADE"), nullable=False)
+    level_id = db.Column(CompactId, db.ForeignKey("levels.id", ondelete="CASCADE"), nullable=False)
     completed = db.Column(db.Boolean, default=False)
     completed_at = db.Column(db.DateTime)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -75,37 +126,67 @@ class UserLevelProgress(db.Model):
     __table_args__ = (db.UniqueConstraint("user_id", "category_id", "level_id", name="uq_user_category_level"),)
 
 
+class UserItemCompletion(db.Model):
+    """One row per (user, item) the user has submitted at least once; item_type is the submission kind."""
+    __tablename__ = "user_item_completions"
+    id = db.Column(CompactId, primary_key=True, default=generate_id)
+    user_id = db.Column(CompactId, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    level_id = db.Column(CompactId, db.ForeignKey("levels.id", ondelete="CASCADE"), nullable=False)
+    item_type = db.Column(db.String(20), nullable=False)  # reading | listening | writing | speaking
+    item_id = db.Column(CompactId, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (db.UniqueConstraint("user_id", "item_type", "item_id", name="uq_user_item_completion"),)
+
+
+class UserLevelCounter(db.Model):
+    """Distinct completed items per (user, level), kept in step with user_item_completions."""
+    __tablename__ = "user_level_counters"
+    id = db.Column(CompactId, primary_key=True, default=generate_id)
+    user_id = db.Column(CompactId, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    level_id = db.Column(CompactId, db.ForeignKey("levels.id", ondelete="CASCADE"), nullable=False)
+    completed_items = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (db.UniqueConstraint("user_id", "level_id", name="uq_user_level_counter"),)
+
+
 # --- Reading ---
 class ReadingText(db.Model):
     __tablename__ = "reading_texts"
-    id = db.Column(db.String(36), primary_key=True, default=generate_id)
-    level_id = db.Column(db.String(36), db.ForeignKey("levels.id", ondelete="CASCADE"), nullable=False)
+    id = db.Column(CompactId, primary_key=True, default=generate_id)
+    level_id = db.Column(CompactId, db.ForeignKey("levels.id", ondelete="CASCADE"), nullable=False)
     title = db.Column(db.String(255), nullable=False)
     body = db.Column(db.Text, nullable=False)
     order = db.Column(db.Integer, default=0)
+    tts_audio_url = db.Column(db.String(500))  # pre-rendered body audio (prerender_tts.py)
 
     level = db.relationship("Level", back_populates="reading_texts")
-    questions = db.relationship("ReadingQuestion", back_populates="reading_text", cascade="all, delete-orphan")
+    questions = db.relationship("ReadingQuestion", back_populates="reading_text", cascade="all, delete-orphan", order_by="ReadingQuestion.order")
     attempts = db.relationship("ReadingAttempt", back_populates="reading_text", cascade="all, delete-orphan")
 
+    __table_args__ = (db.Index("ix_reading_texts_level_order", "level_id", "order"),)
+
 
 class ReadingQuestion(db.Model):
     __tablename__ = "reading_questions"
-    id = db.Column(db.String(36), primary_key=True, default=generate_id)
-    reading_text_id = db.Column(db.String(36), db.ForeignKey("reading_texts.id", ondelete="CASCADE"), nullable=False)
+    id = db.Column(CompactId, primary_key=True, default=generate_id)
+    reading_text_id = db.Column(CompactId, db.ForeignKey("reading_texts.id", ondelete="CASCADE"), nullable=False)
     question = db.Column(db.Text, nullable=False)
     options = db.Column(db.Text)  # JSON
     correct_answer = db.Column(db.String(500), nullable=False)
     order = db.Column(db.Integer, default=0)
+    tts_audio_url = db.Column(db.String(500))  # pre-rendered question audio
 
     reading_text = db.relationship("ReadingText", back_populates="questions")
 
+    __table_args__ = (db.Index("ix_reading_questions_text_order", "reading_text_id", "order"),)
+
 
 class ReadingAttempt(db.Model):
     __tablename__ = "reading_attempts"
-    id = db.Column(db.String(36), primary_key=True, default=generate_id)
-    user_id = db.Column(db.String(36), db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    reading_text_id = db.Column(db.String(36), db.ForeignKey("reading_texts.id", ondelete="CASCADE"), nullable=False)
+    id = db.Column(CompactId, primary_key=True, default=generate_id)
+    user_id = db.Column(CompactId, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    reading_text_id = db.Column(CompactId, db.ForeignKey("reading_texts.id", ondelete="CASCADE"), nullable=False)
     answers = db.Column(db.Text, nullable=False)  # JSON
     score = db.Column(db.Integer)
     completed_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -114,12 +195,17 @@ class ReadingAttempt(db.Model):
     reading_text = db.relationship("ReadingText", back_populates="attempts")
     feedback = db.relationship("Feedback", back_populates="reading_attempt", uselist=False, cascade="all, delete-orphan")
 
+    __table_args__ = (
+        db.Index("ix_reading_attempts_user_text", "user_id", "reading_text_id"),
+        db.Index("ix_reading_attempts_text", "reading_text_id"),
+    )
+
 
 # --- Listening ---
 class ListeningAudio(db.Model):
     __tablename__ = "listening_audios"
-    id = db.Column(db.String(36), primary_key=True, default=generate_id)
-    level_id = db.Column(db.String(36), db.ForeignKey("levels.id", ondelete="CASCADE"), nullable=False)
+    id = db.Column(CompactId, primary_key=True, default=generate_id)
+    level_id = db.Column(CompactId, db.ForeignKey("levels.id", ondelete="CASCADE"), nullable=False)
     title = db.Column(db.String(255), nullable=False)
     audio_url = db.Column(db.String(500), nullable=False)
     transcript = db.Column(db.Text)
@@ -129,12 +215,14 @@ class ListeningAudio(db.Model):
     level = db.relationship("Level", back_populates="listening_audios")
     attempts = db.relationship("ListeningAttempt", back_populates="audio", cascade="all, delete-orphan")
 
+    __table_args__ = (db.Index("ix_listening_audios_level_order", "level_id", "order"),)
+
 
 class ListeningAttempt(db.Model):
     __tablename__ = "listening_attempts"
-    id = db.Column(db.String(36), primary_key=True, default=generate_id)
-    user_id = db.Column(db.String(36), db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    listening_audio_id = db.Column(db.String(36), db.ForeignKey("listening_audios.id", ondelete="CASCADE"), nullable=False)
+    id = db.Column(CompactId, primary_key=True, default=generate_id)
+    user_id = db.Column(CompactId, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    listening_audio_id = db.Column(CompactId, db.ForeignKey("listening_audios.id", ondelete="CASCADE"), nullable=False)
     user_translation = db.Column(db.Text, nullable=False)
     completed_at = db.Column(db.DateTime, default=datetime.utcnow)
 
@@ -142,25 +230,33 @@ class ListeningAttempt(db.Model):
     audio = db.relationship("ListeningAudio", back_populates="attempts")
     feedback = db.relationship("Feedback", back_populates="listening_attempt", uselist=False, cascade="all, delete-orphan")
 
+    __table_args__ = (
+        db.Index("ix_listening_attempts_user_audio", "user_id", "listening_audio_id"),
+        db.Index("ix_listening_attempts_audio", "listening_audio_id"),
+    )
+
 
 # --- Writing ---
 class WritingTopic(db.Model):
     __tablename__ = "writing_topics"
-    id = db.Column(db.String(36), primary_key=True, default=generate_id)
-    level_id = db.Column(db.String(36), db.ForeignKey("levels.id", ondelete="CASCADE"), nullable=False)
+    id = db.Column(CompactId, primary_key=True, default=generate_id)
+    level_id = db.Column(CompactId, db.ForeignKey("levels.id", ondelete="CASCADE"), nullable=False)
     title = db.Column(db.String(255), nullable=False)
     prompt = db.Column(db.Text, nullable=False)
     order = db.Column(db.Integer, default=0)
+    tts_audio_url = db.Column(db.String(500))  # pre-rendered prompt audio
 
     level = db.relationship("Level", back_populates="writing_topics")
     submissions = db.relationship("WritingSubmission", back_populates="topic", cascade="all, delete-orphan")
 
+    __table_args__ = (db.Index("ix_writing_topics_level_order", "level_id", "order"),)
+
 
 class WritingSubmission(db.Model):
     __tablename__ = "writing_submissions"
-    id = db.Column(db.String(36), primary_key=True, default=generate_id)
-    user_id = db.Column(db.String(36), db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    writing_topic_id = db.Column(db.String(36), db.ForeignKey("writing_topics.id", ondelete="CASCADE"), nullable=False)
+    id = db.Column(CompactId, primary_key=True, default=generate_id)
+    user_id = db.Column(CompactId, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    writing_topic_id = db.Column(CompactId, db.ForeignKey("writing_topics.id", ondelete="CASCADE"), nullable=False)
     content = db.Column(db.Text, nullable=False)
     submitted_at = db.Column(db.DateTime, default=datetime.utcnow)
 
@@ -168,27 +264,35 @@ class WritingSubmission(db.Model):
     topic = db.relationship("WritingTopic", back_populates="submissions")
     feedback = db.relationship("Feedback", back_populates="writing_submission", uselist=False, cascade="all, delete-orphan")
 
+    __table_args__ = (
+        db.Index("ix_writing_submissions_user_topic", "user_id", "writing_topic_id"),
+        db.Index("ix_writing_submissions_topic", "writing_topic_id"),
+    )
+
 
 # --- Speaking ---
 class SpeakingExercise(db.Model):
     __tablename__ = "speaking_exercises"
-    id = db.Column(db.String(36), primary_key=True, default=generate_id)
-    level_id = db.Column(db.String(36), db.ForeignKey("levels.id", ondelete="CASCADE"), nullable=False)
+    id = db.Column(CompactId, primary_key=True, default=generate_id)
+    level_id = db.Column(CompactId, db.ForeignKey("levels.id", ondelete="CASCADE"), nullable=False)
     type = db.Column(db.String(50), nullable=False)  # read_aloud | conversation
     title = db.Column(db.String(255), nullable=False)
     prompt = db.Column(db.Text, nullable=False)
     sample_audio_url = db.Column(db.String(500))
     order = db.Column(db.Integer, default=0)
+    tts_audio_url = db.Column(db.String(500))  # pre-rendered prompt audio
 
     level = db.relationship("Level", back_populates="speaking_exercises")
     attempts = db.relationship("SpeakingAttempt", back_populates="exercise", cascade="all, delete-orphan")
 
+    __table_args__ = (db.Index("ix_speaking_exercises_level_order", "level_id", "order"),)
+
 
 class SpeakingAttempt(db.Model):
     __tablename__ = "speaking_attempts"
-    id = db.Column(db.String(36), primary_key=True, default=generate_id)
-    user_id = db.Column(db.String(36), db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    exercise_id = db.Column(db.String(36), db.ForeignKey("speaking_exercises.id", ondelete="CASCADE"), nullable=False)
+    id = db.Column(CompactId, primary_key=True, default=generate_id)
+    user_id = db.Column(CompactId, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    exercise_id = db.Column(CompactId, db.ForeignKey("speaking_exercises.id", ondelete="CASCADE"), nullable=False)
     audio_url = db.Column(db.String(500))
     transcript = db.Column(db.Text)
     completed_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -197,34 +301,44 @@ class SpeakingAttempt(db.Model):
     exercise = db.relationship("SpeakingExercise", back_populates="attempts")
     feedback = db.relationship("Feedback", back_populates="speaking_attempt", uselist=False, cascade="all, delete-orphan")
 
+    __table_args__ = (
+        db.Index("ix_speaking_attempts_user_exercise", "user_id", "exercise_id"),
+        db.Index("ix_speaking_attempts_exercise", "exercise_id"),
+    )
+
 
 # --- Feedback ---
 class Feedback(db.Model):
     __tablename__ = "feedback"
-    id = db.Column(db.String(36), primary_key=True, default=generate_id)
+    id = db.Column(CompactId, primary_key=True, default=generate_id)
     type = db.Column(db.String(20), nullable=False)
     content = db.Column(db.Text, nullable=False)
     scores = db.Column(db.Text)  # JSON
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
-    user_id = db.Column(db.String(36), db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    user_id = db.Column(CompactId, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     user = db.relationship("User", back_populates="feedback")
 
-    reading_attempt_id = db.Column(db.String(36), db.ForeignKey("reading_attempts.id", ondelete="CASCADE"), unique=True)
+    reading_attempt_id = db.Column(CompactId, db.ForeignKey("reading_attempts.id", ondelete="CASCADE"), unique=True)
     reading_attempt = db.relationship("ReadingAttempt", back_populates="feedback")
-    listening_attempt_id = db.Column(db.String(36), db.ForeignKey("listening_attempts.id", ondelete="CASCADE"), unique=True)
+    listening_attempt_id = db.Column(CompactId, db.ForeignKey("listening_attempts.id", ondelete="CASCADE"), unique=True)
     listening_attempt = db.relationship("ListeningAttempt", back_populates="feedback")
-    writing_submission_id = db.Column(db.String(36), db.ForeignKey("writing_submissions.id", ondelete="CASCADE"), unique=True)
+    writing_submission_id = db.Column(CompactId, db.ForeignKey("writing_submissions.id", ondelete="CASCADE"), unique=True)
     writing_submission = db.relationship("WritingSubmission", back_populates="feedback")
-    speaking_attempt_id = db.Column(db.String(36), db.ForeignKey("speaking_attempts.id", ondelete="CASCADE"), unique=True)
+    speaking_attempt_id = db.Column(CompactId, db.ForeignKey("speaking_attempts.id", ondelete="CASCADE"), unique=True)
     speaking_attempt = db.relationship("SpeakingAttempt", back_populates="feedback")
 
+    __table_args__ = (
+        db.Index("ix_feedback_user_type_created", "user_id", "type", "created_at", "id"),
+        db.Index("ix_feedback_user_created", "user_id", "created_at", "id"),
+    )
+
 
 # --- Reels ---
 class ReelBatch(db.Model):
     """A group of 5 short reels; after these, one question (crafted from the videos' audio)."""
     __tablename__ = "reel_batches"
-    id = db.Column(db.String(36), primary_key=True, default=generate_id)
+    id = db.Column(CompactId, primary_key=True, default=generate_id)
     title = db.Column(db.String(255))
     order = db.Column(db.Integer, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -233,12 +347,14 @@ class ReelBatch(db.Model):
     question = db.relationship("ReelBatchQuestion", back_populates="batch", uselist=False, cascade="all, delete-orphan")
     attempts = db.relationship("ReelBatchAttempt", back_populates="batch", cascade="all, delete-orphan")
 
+    __table_args__ = (db.Index("ix_reel_batches_order", "order", "created_at", "id"),)
+
 
 class ReelBatchQuestion(db.Model):
     """One question per batch, crafted from the audio of the 5 videos."""
     __tablename__ = "reel_batch_questions"
-    id = db.Column(db.String(36), primary_key=True, default=generate_id)
-    reel_batch_id = db.Column(db.String(36), db.ForeignKey("reel_batches.id", ondelete="CASCADE"), nullable=False, unique=True)
+    id = db.Column(CompactId, primary_key=True, default=generate_id)
+    reel_batch_id = db.Column(CompactId, db.ForeignKey("reel_batches.id", ondelete="CASCADE"), nullable=False, unique=True)
     question = db.Column(db.Text, nullable=False)
     options = db.Column(db.Text, nullable=False)  # JSON array of choices
     correct_answer = db.Column(db.String(500), nullable=False)
@@ -249,9 +365,9 @@ class ReelBatchQuestion(db.Model):
 class ReelBatchAttempt(db.Model):
     """Learner's answer to a batch question."""
     __tablename__ = "reel_batch_attempts"
-    id = db.Column(db.String(36), primary_key=True, default=generate_id)
-    user_id = db.Column(db.String(36), db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    reel_batch_id = db.Column(db.String(36), db.ForeignKey("reel_batches.id", ondelete="CASCADE"), nullable=False)
+    id = db.Column(CompactId, primary_key=True, default=generate_id)
+    user_id = db.Column(CompactId, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    reel_batch_id = db.Column(CompactId, db.ForeignKey("reel_batches.id", ondelete="CASCADE"), nullable=False)
     answer = db.Column(db.String(500), nullable=False)
     correct = db.Column(db.Boolean, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -259,10 +375,12 @@ class ReelBatchAttempt(db.Model):
     user = db.relationship("User", backref="reel_batch_attempts")
     batch = db.relationship("ReelBatch", back_populates="attempts")
 
+    __table_args__ = (db.Index("ix_reel_batch_attempts_user_batch", "user_id", "reel_batch_id"),)
+
 
 class Reel(db.Model):
     __tablename__ = "reels"
-    id = db.Column(db.String(36), primary_key=True, default=generate_id)
+    id = db.Column(CompactId, primary_key=True, default=generate_id)
     title = db.Column(db.String(255), nullable=False)
     description = db.Column(db.Text)
     video_url = db.Column(db.String(500), nullable=False)
@@ -272,17 +390,22 @@ class Reel(db.Model):
     order = db.Column(db.Integer, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     # Batch: creator uploads 5 reels per batch; question follows (crafted from audio)
-    batch_id = db.Column(db.String(36), db.ForeignKey("reel_batches.id", ondelete="SET NULL"))
-    order_in_batch = db.Column(db.Integer)  # 1-5 within batch
+    batch_id = db.Column(CompactId, db.ForeignKey("reel_batches.id", ondelete="SET NULL"))
+    order_in_batch = db.Column(db.Integer, default=0)  # 1-5 within batch, 0 when unset (feed keyset column)
 
     batch = db.relationship("ReelBatch", back_populates="reels")
     dubbings = db.relationship("ReelDubbing", back_populates="reel", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        db.Index("ix_reels_batch_order", "batch_id", "order_in_batch"),
+        db.Index("ix_reels_order", "order", "order_in_batch", "created_at", "id"),
+    )
+
 
 class ReelDubbing(db.Model):
     __tablename__ = "reel_dubbings"
-    id = db.Column(db.String(36), primary_key=True, default=generate_id)
-    reel_id = db.Column(db.String(36), db.ForeignKey("reels.id", ondelete="CASCADE"), nullable=False)
+    id = db.Column(CompactId, primary_key=True, default=generate_id)
+    reel_id = db.Column(CompactId, db.ForeignKey("reels.id", ondelete="CASCADE"), nullable=False)
     language = db.Column(db.String(10), nullable=False)
     audio_url = db.Column(db.String(500), nullable=False)
     transcript = db.Column(db.Text)
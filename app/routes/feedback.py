@@ -5,6 +5,7 @@ import json
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.models import Feedback
+from app.services.pagination import NEXT_CURSOR_HEADER, InvalidCursor, keyset_page, page_size
 
 feedback_bp = Blueprint("feedback", __name__)
 
@@ -13,13 +14,20 @@ feedback_bp = Blueprint("feedback", __name__)
 @feedback_bp.route("/", methods=["GET"])
 @jwt_required()
 def list_feedback():
+    """Newest first, one page per request (?limit=, ?cursor= from the X-Next-Cursor header)."""
     user_id = get_jwt_identity()
     type_filter = request.args.get("type")
+    query = Feedback.query.filter_by(user_id=user_id)
     if type_filter and type_filter in ("reading", "listening", "writing", "speaking"):
-        items = Feedback.query.filter_by(user_id=user_id, type=type_filter).order_by(Feedback.created_at.desc()).limit(100).all()
-    else:
-        items = Feedback.query.filter_by(user_id=user_id).order_by(Feedback.created_at.desc()).limit(100).all()
-    return jsonify([
+        query = query.filter_by(type=type_filter)
+    try:
+        items, next_cursor = keyset_page(
+            query, (Feedback.created_at, Feedback.id), request.args.get("cursor"),
+            page_size(request.args.get("limit")), descending=True,
+        )
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
+    response = jsonify([
         {
             "id": f.id,
             "type": f.type,
@@ -29,6 +37,9 @@ def list_feedback():
         }
         for f in items
     ])
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return response
 
 
 @feedback_bp.route("/reading/<attempt_id>", methods=["GET"])
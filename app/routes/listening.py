@@ -1,12 +1,11 @@
 """
 Listening: audio → translate. Submit translation, get feedback, track level completion.
 """
-from datetime import datetime
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app import db
-from app.models import ListeningAudio, ListeningAttempt, UserLevelProgress
-from app.services.feedback import create_feedback, generate_listening_feedback
+from app.models import ListeningAudio, ListeningAttempt
+from app.services.feedback import generate_listening_feedback
+from app.services.submissions import record_submission
 
 listening_bp = Blueprint("listening", __name__)
 
@@ -39,36 +38,7 @@ def submit_listening(audio_id):
         listening_audio_id=audio_id,
         user_translation=user_translation,
     )
-    db.session.add(attempt)
-    db.session.commit()
-
     feedback_content = generate_listening_feedback(user_translation, audio.transcript)
-    create_feedback(
-        user_id=user_id,
-        type="listening",
-        content=feedback_content,
-        listening_attempt_id=attempt.id,
-    )
-
-    level_id = audio.level_id
-    category_id = audio.level.category_id
-    all_audio_ids = [a.id for a in ListeningAudio.query.filter_by(level_id=level_id).all()]
-    count = ListeningAttempt.query.filter(
-        ListeningAttempt.user_id == user_id,
-        ListeningAttempt.listening_audio_id.in_(all_audio_ids),
-    ).count()
-    if count >= len(all_audio_ids):
-        existing = UserLevelProgress.query.filter_by(
-            user_id=user_id, category_id=category_id, level_id=level_id
-        ).first()
-        if existing:
-            existing.completed = True
-            existing.completed_at = datetime.utcnow()
-        else:
-            db.session.add(UserLevelProgress(
-                user_id=user_id, category_id=category_id, level_id=level_id,
-                completed=True, completed_at=datetime.utcnow(),
-            ))
-        db.session.commit()
+    record_submission("listening", user_id, audio, attempt, feedback_content)
 
     return jsonify({"attemptId": attempt.id, "feedback": feedback_content}), 201
@@ -2,10 +2,17 @@
 Serve the frontend HTML pages (dashboard, lessons, profile).
 """
 from flask import Blueprint, render_template
+from app.services.catalog import get_catalog
 
 pages_bp = Blueprint("pages", __name__)
 
 
+def _reading_level_id(order):
+    """Id of the reading level shown as Level <order>; the lesson page loads its pre-rendered prompt audio."""
+    category = get_catalog().by_slug("reading")
+    return next((l["id"] for l in category["levels"] if l["order"] == order), None) if category else None
+
+
 @pages_bp.route("/", endpoint="index")
 def index():
     return render_template("index.html", title="Dashboard")
@@ -18,7 +25,8 @@ def lessons():
 
 @pages_bp.route("/lesson", endpoint="lesson")
 def lesson():
-    return render_template("lesson.html", title="Lesson", level_id=1, total_steps=5)
+    return render_template("lesson.html", title="Lesson", level_id=1, total_steps=5,
+                           reading_level_id=_reading_level_id(1))
 
 
 @pages_bp.route("/profile", endpoint="profile")
@@ -28,7 +36,8 @@ def profile():
 
 @pages_bp.route("/level/<int:level_id>", endpoint="level")
 def level(level_id):
-    return render_template("lesson.html", title="Lesson", level_id=level_id, total_steps=5)
+    return render_template("lesson.html", title="Lesson", level_id=level_id, total_steps=5,
+                           reading_level_id=_reading_level_id(level_id))
 
 
 @pages_bp.route("/leaderboard", endpoint="leaderboard")
@@ -2,53 +2,59 @@
 Reading: text-based quiz. Submit answers, get feedback, track level completion.
 """
 import json
-from datetime import datetime
 from flask import Blueprint, request, jsonify
+from sqlalchemy.orm import joinedload, selectinload
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app import db
-from app.models import ReadingText, ReadingQuestion, ReadingAttempt, UserLevelProgress
-from app.services.feedback import create_feedback, generate_reading_feedback
+from app.models import ReadingText, ReadingQuestion, ReadingAttempt
+from app.services.feedback import generate_reading_feedback
+from app.services.question_options import get_question_options
+from app.services.submissions import record_submission
 
 reading_bp = Blueprint("reading", __name__)
 
 
+def _question_to_json(q):
+    return {"id": q.id, "question": q.question, "options": get_question_options().get(q), "order": q.order,
+            "audioUrl": q.tts_audio_url}
+
+
 @reading_bp.route("/levels/<level_id>/texts", methods=["GET"])
 @jwt_required()
 def level_texts(level_id):
-    texts = ReadingText.query.filter_by(level_id=level_id).order_by(ReadingText.order).all()
-    out = []
-    for t in texts:
-        questions = ReadingQuestion.query.filter_by(reading_text_id=t.id).order_by(ReadingQuestion.order).all()
-        out.append({
+    # Two queries for the whole level: texts, then all their questions (ordered) in one IN query
+    texts = (
+        ReadingText.query.options(selectinload(ReadingText.questions))
+        .filter_by(level_id=level_id)
+        .order_by(ReadingText.order)
+        .all()
+    )
+    return jsonify([
+        {
             "id": t.id,
             "title": t.title,
             "body": t.body,
             "order": t.order,
-            "questions": [
-                {"id": q.id, "question": q.question, "options": json.loads(q.options) if q.options else None, "order": q.order}
-                for q in questions
-            ],
-        })
-    return jsonify(out)
+            "audioUrl": t.tts_audio_url,
+            "questions": [_question_to_json(q) for q in t.questions],
+        }
+        for t in texts
+    ])
 
 
 @reading_bp.route("/texts/<text_id>", methods=["GET"])
 @jwt_required()
 def get_text(text_id):
-    t = ReadingText.query.get(text_id)
+    t = ReadingText.query.options(joinedload(ReadingText.questions)).filter_by(id=text_id).first()
     if not t:
         return jsonify({"error": "Reading text not found"}), 404
-    questions = ReadingQuestion.query.filter_by(reading_text_id=t.id).order_by(ReadingQuestion.order).all()
     return jsonify({
         "id": t.id,
         "levelId": t.level_id,
         "title": t.title,
         "body": t.body,
         "order": t.order,
-        "questions": [
-            {"id": q.id, "question": q.question, "options": json.loads(q.options) if q.options else None, "order": q.order}
-            for q in questions
-        ],
+        "audioUrl": t.tts_audio_url,
+        "questions": [_question_to_json(q) for q in t.questions],
     })
 
 
@@ -84,40 +90,8 @@ def submit_reading(text_id):
         answers=json.dumps(answers),
         score=score,
     )
-    db.session.add(attempt)
-    db.session.commit()
-
     feedback_content = generate_reading_feedback(correct, total, wrong)
-    create_feedback(
-        user_id=user_id,
-        type="reading",
-        content=feedback_content,
-        reading_attempt_id=attempt.id,
-    )
-
-    level = text.level
-    category_id = level.category_id
-    level_id = level.id
-    all_text_ids = [t.id for t in ReadingText.query.filter_by(level_id=level_id).all()]
-    count_attempts = ReadingAttempt.query.filter(
-        ReadingAttempt.user_id == user_id,
-        ReadingAttempt.reading_text_id.in_(all_text_ids),
-    ).count()
-    if count_attempts >= len(all_text_ids):
-        from app.models import UserLevelProgress
-        existing = UserLevelProgress.query.filter_by(
-            user_id=user_id, category_id=category_id, level_id=level_id
-        ).first()
-        if existing:
-            existing.completed = True
-            from datetime import datetime
-            existing.completed_at = datetime.utcnow()
-        else:
-            db.session.add(UserLevelProgress(
-                user_id=user_id, category_id=category_id, level_id=level_id,
-                completed=True, completed_at=datetime.utcnow(),
-            ))
-        db.session.commit()
+    record_submission("reading", user_id, text, attempt, feedback_content)
 
     return jsonify({
         "attemptId": attempt.id,
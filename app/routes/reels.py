@@ -6,10 +6,13 @@ import json
 import os
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy.orm import joinedload, selectinload
 from werkzeug.utils import secure_filename
 
 from app import db
 from app.models import Reel, ReelDubbing, ReelBatch, ReelBatchQuestion, ReelBatchAttempt
+from app.services.media import shard_relpath
+from app.services.pagination import NEXT_CURSOR_HEADER, InvalidCursor, keyset_page, page_size
 
 reels_bp = Blueprint("reels", __name__)
 
@@ -20,6 +23,21 @@ def _allowed_file(filename):
     return "." in filename and filename.rsplit(".", 1)[-1].lower() in ALLOWED_VIDEO_EXTENSIONS
 
 
+# Reels with their dubbings, and batches with reels, dubbings and question, in a fixed number of
+# queries (one SELECT ... IN per relationship) instead of one per parent row
+REEL_LOAD = selectinload(Reel.dubbings)
+BATCH_LOAD = (selectinload(ReelBatch.reels).selectinload(Reel.dubbings), selectinload(ReelBatch.question))
+# Feed and batch listings page on (order[, order_in_batch], created_at, id); see app/services/pagination.py
+REEL_KEYS = (Reel.order, Reel.order_in_batch, Reel.created_at, Reel.id)
+BATCH_KEYS = (ReelBatch.order, ReelBatch.created_at, ReelBatch.id)
+
+
+def _with_cursor(response, next_cursor):
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return response
+
+
 def _reel_to_json(r):
     return {
         "id": r.id,
@@ -31,7 +49,7 @@ def _reel_to_json(r):
         "language": r.language,
         "order": r.order,
         "batchId": r.batch_id,
-        "orderInBatch": r.order_in_batch,
+        "orderInBatch": r.order_in_batch or None,
         "dubbings": [{"id": d.id, "language": d.language, "audioUrl": d.audio_url} for d in r.dubbings],
     }
 
@@ -52,12 +70,17 @@ def create_batch():
 
 @reels_bp.route("/batches", methods=["GET"])
 def list_batches():
-    """List all batches with their reels (ordered 1–5) and question if set."""
-    batches = ReelBatch.query.order_by(ReelBatch.order).all()
+    """One page of batches with their reels (ordered 1–5) and question if set (?limit=, ?cursor=)."""
+    try:
+        batches, next_cursor = keyset_page(
+            ReelBatch.query.options(*BATCH_LOAD), BATCH_KEYS,
+            request.args.get("cursor"), page_size(request.args.get("limit")),
+        )
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
     out = []
     for b in batches:
-        reels = Reel.query.filter_by(batch_id=b.id).order_by(Reel.order_in_batch).all()
-        q = ReelBatchQuestion.query.filter_by(reel_batch_id=b.id).first()
+        reels, q = b.reels, b.question
         out.append({
             "id": b.id,
             "title": b.title,
@@ -71,7 +94,7 @@ def list_batches():
                 "correctAnswer": q.correct_answer,
             } if q else None,
         })
-    return jsonify(out)
+    return _with_cursor(jsonify(out), next_cursor)
 
 
 @reels_bp.route("/upload", methods=["POST"])
@@ -91,21 +114,19 @@ def upload_reel():
     language = (request.form.get("language") or "en").strip()
     batch_id = request.form.get("batchId") or request.form.get("batch_id")
     order_in_batch = request.form.get("orderInBatch") or request.form.get("order_in_batch")
-    if order_in_batch is not None:
-        try:
-            order_in_batch = int(order_in_batch)
-        except ValueError:
-            order_in_batch = None
-
-    upload_dir = os.path.join(current_app.config.get("UPLOAD_FOLDER", "uploads"), "reels")
-    os.makedirs(upload_dir, exist_ok=True)
+    try:
+        order_in_batch = int(order_in_batch) if order_in_batch is not None else 0
+    except ValueError:
+        order_in_batch = 0  # stored as 0, not NULL: it is a feed keyset column
+
     ext = file.filename.rsplit(".", 1)[-1].lower()
     safe = secure_filename(file.filename) or "video"
     base = f"{safe.rsplit('.', 1)[0]}_{os.urandom(4).hex()}"
-    filename = f"{base}.{ext}"
-    filepath = os.path.join(upload_dir, filename)
+    relpath = shard_relpath("reels", f"{base}.{ext}")
+    filepath = os.path.join(current_app.config.get("UPLOAD_FOLDER", "uploads"), *relpath.split("/"))
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
     file.save(filepath)
-    video_url = f"/uploads/reels/{filename}"
+    video_url = f"/uploads/{relpath}"
 
     reel = Reel(
         title=title,
@@ -155,13 +176,20 @@ def set_batch_question(batch_id):
 @reels_bp.route("", methods=["GET"])
 @reels_bp.route("/", methods=["GET"])
 def list_reels():
-    reels = Reel.query.order_by(Reel.order, Reel.order_in_batch).all()
-    return jsonify([_reel_to_json(r) for r in reels])
+    """One page of the feed (?limit=, ?cursor=)."""
+    try:
+        reels, next_cursor = keyset_page(
+            Reel.query.options(REEL_LOAD), REEL_KEYS,
+            request.args.get("cursor"), page_size(request.args.get("limit")),
+        )
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
+    return _with_cursor(jsonify([_reel_to_json(r) for r in reels]), next_cursor)
 
 
 @reels_bp.route("/<reel_id>", methods=["GET"])
 def get_reel(reel_id):
-    reel = Reel.query.get(reel_id)
+    reel = Reel.query.options(joinedload(Reel.dubbings)).filter_by(id=reel_id).first()
     if not reel:
         return jsonify({"error": "Reel not found"}), 404
     out = _reel_to_json(reel)
@@ -172,11 +200,10 @@ def get_reel(reel_id):
 @reels_bp.route("/batches/<batch_id>", methods=["GET"])
 def get_batch(batch_id):
     """Get one batch with its 5 reels and the question (for learners)."""
-    batch = ReelBatch.query.get(batch_id)
+    batch = ReelBatch.query.options(*BATCH_LOAD).filter_by(id=batch_id).first()
     if not batch:
         return jsonify({"error": "Batch not found"}), 404
-    reels = Reel.query.filter_by(batch_id=batch_id).order_by(Reel.order_in_batch).all()
-    q = ReelBatchQuestion.query.filter_by(reel_batch_id=batch_id).first()
+    reels, q = batch.reels, batch.question
     return jsonify({
         "id": batch.id,
         "title": batch.title,
@@ -1,13 +1,64 @@
 """
 Inclusive mode: Text-to-Speech and Speech-to-Text.
 """
-from flask import Blueprint, request, jsonify
+import io
+import json
+from flask import Blueprint, Response, request, jsonify, send_file, stream_with_context
 from flask_jwt_extended import jwt_required
-from app.services.tts_stt import text_to_speech, speech_to_text
+from config import Config
+from app import db
+from app.models import ReadingQuestion
+from app.services.tts_stt import (
+    PayloadTooLargeError,
+    _infer_audio_suffix_from_url,
+    _load_audio_bytes,
+    get_single_flight,
+    match_options,
+    read_limited,
+    speech_to_text,
+    text_to_speech,
+    text_to_speech_stream,
+    transcribe_audio_bytes,
+)
+from app.services.stt_jobs import get_job_queue, QueueFullError
+from app.services.stt_cache import get_transcript_cache
+from app.services.tts_cache import get_tts_cache
+from app.services.minimax import get_minimax_client
+from app.services.media import get_media_index, relpath_from_url
+from app.services.question_options import get_question_options
+from app.services.stt_stream import get_stream_manager, StreamNotFoundError, StreamTooLargeError
+
+# Upper bound for ?wait= on the job status endpoint (long-poll)
+MAX_JOB_WAIT_SECONDS = 30
+# Read size for binary STT uploads
+UPLOAD_CHUNK_BYTES = 64 * 1024
+# Allowance on top of the audio itself for multipart headers and other JSON fields
+BODY_OVERHEAD_BYTES = 64 * 1024
 
 tts_stt_bp = Blueprint("tts_stt", __name__)
 
 
+@tts_stt_bp.before_request
+def _limit_body():
+    """Bound every request body here before werkzeug parses or spools it (request.files, get_json):
+    STT_MAX_UPLOAD_BYTES of audio, base64-encoded for JSON. A declared Content-Length is rejected up
+    front; a chunked body is read up to the limit (413 past it) and handed on with its Content-Length.
+    """
+    max_bytes = Config.STT_MAX_UPLOAD_BYTES
+    limit = (max_bytes * 4 // 3 if request.is_json else max_bytes) + BODY_OVERHEAD_BYTES
+    too_large = jsonify({"error": f"Audio exceeds {max_bytes} bytes"}), 413
+    if request.content_length is not None:
+        return too_large if request.content_length > limit else None
+    if request.environ.get("wsgi.input_terminated"):
+        wsgi_input = request.environ["wsgi.input"]
+        try:
+            body = read_limited(iter(lambda: wsgi_input.read(UPLOAD_CHUNK_BYTES), b""), limit)
+        except PayloadTooLargeError:
+            return too_large
+        request.environ.update({"wsgi.input": io.BytesIO(body), "CONTENT_LENGTH": str(len(body))})
+    return None
+
+
 @tts_stt_bp.route("/tts", methods=["POST"])
 @jwt_required()
 def tts():
@@ -15,6 +66,8 @@ def tts():
     text = (data.get("text") or "").strip()
     if not text:
         return jsonify({"error": "text required"}), 400
+    if data.get("stream") or request.args.get("stream") in ("1", "true"):
+        return _tts_stream(text, data)
     result = text_to_speech(
         text=text,
         language=data.get("language"),
@@ -25,18 +78,196 @@ def tts():
     return jsonify({"audioUrl": result.get("audioUrl")})
 
 
-@tts_stt_bp.route("/stt", methods=["POST"])
-def stt():
-    """Receive recorded audio, convert to text (Whisper), return transcript. Client uses it to auto-select the matching lesson option."""
-    data = request.get_json() or {}
-    audio = (data.get("audioUrlOrBase64") or "").strip()
-    if not audio:
-        return jsonify({"error": "audioUrlOrBase64 required"}), 400
-    result = speech_to_text(
-        audio_url_or_base64=audio,
+def _tts_stream(text, data):
+    """Chunked audio/mpeg relay of the provider stream (or the cached file). X-Audio-Url is where the
+    clip can be replayed from once the stream has completed.
+    """
+    result = text_to_speech_stream(
+        text=text,
         language=data.get("language"),
+        voice=data.get("voice"),
     )
+    if not result.get("success"):
+        return jsonify({"error": result.get("error", "TTS failed")}), 503
+    if result.get("path"):
+        resp = send_file(result["path"], mimetype="audio/mpeg", conditional=True)
+        get_media_index().touch(relpath_from_url(result["audioUrl"]))
+    else:
+        resp = Response(stream_with_context(result["chunks"]), mimetype="audio/mpeg")
+        resp.headers["Cache-Control"] = "no-store"
+        resp.headers["X-Accel-Buffering"] = "no"  # let nginx pass chunks through
+    resp.headers["X-Audio-Url"] = result["audioUrl"]
+    return resp
+
+
+def _read_binary_upload():
+    """Audio from a multipart/form-data ('audio' or 'file' field) or raw-body upload.
+    Returns (audio_bytes, suffix, error_response).
+    """
+    max_bytes = Config.STT_MAX_UPLOAD_BYTES
+    if request.content_length is not None and request.content_length > max_bytes:
+        return None, None, (jsonify({"error": f"Audio exceeds {max_bytes} bytes"}), 413)
+    if request.mimetype == "multipart/form-data":
+        file = request.files.get("audio") or request.files.get("file")
+        if not file:
+            return None, None, (jsonify({"error": "No audio file (use form key 'audio' or 'file')"}), 400)
+        stream, content_type, name = file.stream, file.mimetype, file.filename or ""
+    else:
+        stream, content_type, name = request.stream, request.mimetype, ""
+    try:
+        audio_bytes = read_limited(iter(lambda: stream.read(UPLOAD_CHUNK_BYTES), b""), max_bytes)
+    except PayloadTooLargeError as e:
+        return None, None, (jsonify({"error": str(e)}), 413)
+    if not audio_bytes:
+        return None, None, (jsonify({"error": "Empty audio body"}), 400)
+    return audio_bytes, _infer_audio_suffix_from_url(name, content_type), None
+
+
+@tts_stt_bp.route("/stt", methods=["POST"])
+def stt():
+    """Receive recorded audio, convert to text (Whisper), return transcript. Client uses it to auto-select the matching lesson option.
+    Body: JSON {audioUrlOrBase64, language}, multipart/form-data (audio file + language field),
+    or the raw audio bytes (application/octet-stream or audio/*, ?language=).
+    """
+    audio_bytes = suffix = None
+    if request.is_json:
+        data = request.get_json() or {}
+        audio = (data.get("audioUrlOrBase64") or "").strip()
+        if not audio:
+            return jsonify({"error": "audioUrlOrBase64 required"}), 400
+    else:
+        audio_bytes, suffix, error = _read_binary_upload()
+        if error:
+            return error
+        data = {**request.args.to_dict(), **request.form.to_dict()}
+        audio = audio_bytes
+    language = data.get("language")
+    if data.get("async") or request.args.get("mode") == "job":
+        # Job mode: enqueue for the Whisper worker pool and return immediately
+        try:
+            job = get_job_queue().submit(audio, language=language, suffix=suffix or ".webm")
+        except QueueFullError as e:
+            return jsonify({"error": str(e)}), 503, {"Retry-After": "2"}
+        out = job.to_json()
+        out["statusUrl"] = "/api/tts-stt/stt/jobs/" + job.id
+        return jsonify(out), 202
+    if audio_bytes is not None:
+        result = transcribe_audio_bytes(audio_bytes, suffix=suffix, language=language)
+    else:
+        result = speech_to_text(
+            audio_url_or_base64=audio,
+            language=language,
+        )
     if not result.get("success"):
         return jsonify({"error": result.get("error", "STT failed")}), 503
     # Return transcript so the lesson page can automatically select the matching answer option
     return jsonify({"text": result.get("text", "")})
+
+
+def _question_options(question_id):
+    q = db.session.get(ReadingQuestion, question_id)
+    if not q:
+        return None
+    return get_question_options().get(q) or []
+
+
+@tts_stt_bp.route("/stt/match", methods=["POST"])
+def stt_match():
+    """Score the learner's spoken answer against the candidate options instead of transcribing freely.
+    Body: JSON {audioUrlOrBase64, options | questionId, language}, or a multipart / raw-body upload with
+    `options` (JSON array) or `questionId` and `language` as form fields / query args.
+    Returns {option, index, confidence, scores}.
+    """
+    if request.is_json:
+        data = request.get_json() or {}
+        raw = (data.get("audioUrlOrBase64") or "").strip()
+        if not raw:
+            return jsonify({"error": "audioUrlOrBase64 required"}), 400
+        audio_bytes, suffix, error = _load_audio_bytes(raw)
+        if error:
+            return jsonify({"error": error}), 400
+        options = data.get("options")
+    else:
+        audio_bytes, suffix, error = _read_binary_upload()
+        if error:
+            return error
+        data = {**request.args.to_dict(), **request.form.to_dict()}
+        try:
+            options = json.loads(data["options"]) if data.get("options") else None
+        except ValueError:
+            return jsonify({"error": "options must be a JSON array"}), 400
+    if options is None and data.get("questionId"):
+        options = _question_options(data["questionId"])
+        if options is None:
+            return jsonify({"error": "Question not found"}), 404
+    if not isinstance(options, list) or not options:
+        return jsonify({"error": "options (array) or questionId required"}), 400
+    result = match_options(audio_bytes, suffix, options, language=data.get("language"))
+    if not result.get("success"):
+        return jsonify({"error": result.get("error", "STT match failed")}), 503
+    result.pop("success")
+    return jsonify(result)
+
+
+@tts_stt_bp.route("/stt/jobs/<job_id>", methods=["GET"])
+def stt_job(job_id):
+    """Status of an STT job. Pass ?wait=<seconds> to long-poll until the transcript is ready."""
+    try:
+        wait = min(float(request.args.get("wait", 0)), MAX_JOB_WAIT_SECONDS)
+    except ValueError:
+        return jsonify({"error": "wait must be a number"}), 400
+    job = get_job_queue().get(job_id, wait=wait)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_json())
+
+
+@tts_stt_bp.route("/stt/stream", methods=["POST"])
+def stt_stream_open():
+    """Start a streaming transcription. Then POST raw recorder chunks to /stt/stream/<id> and finish."""
+    data = request.get_json(silent=True) or {}
+    stream = get_stream_manager().open(language=data.get("language"))
+    return jsonify({"streamId": stream.id}), 201
+
+
+@tts_stt_bp.route("/stt/stream/<stream_id>", methods=["POST"])
+def stt_stream_chunk(stream_id):
+    """Append one audio chunk (raw body, e.g. audio/webm). Returns the partial transcript so far.
+    The chunk and the whole recording are limited to STT_MAX_UPLOAD_BYTES (413; the stream is dropped).
+    """
+    max_bytes = Config.STT_MAX_UPLOAD_BYTES
+    if request.content_length is not None and request.content_length > max_bytes:
+        return jsonify({"error": f"Audio exceeds {max_bytes} bytes"}), 413
+    try:
+        chunk = read_limited(iter(lambda: request.stream.read(UPLOAD_CHUNK_BYTES), b""), max_bytes)
+        return jsonify(get_stream_manager().append(stream_id, chunk))
+    except (PayloadTooLargeError, StreamTooLargeError) as e:
+        return jsonify({"error": str(e)}), 413
+    except StreamNotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+
+
+@tts_stt_bp.route("/stt/stream/<stream_id>/finish", methods=["POST"])
+def stt_stream_finish(stream_id):
+    """Close the stream: transcribe the remaining audio and return the full transcript.
+    Optional JSON {options: [...]} also returns the best-matching answer option as `match`.
+    """
+    data = request.get_json(silent=True) or {}
+    options = data.get("options")
+    if options is not None and not isinstance(options, list):
+        return jsonify({"error": "options must be an array"}), 400
+    try:
+        return jsonify(get_stream_manager().finish(stream_id, options=options))
+    except StreamNotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+
+
+@tts_stt_bp.route("/stats", methods=["GET"])
+def stats():
+    """Cache counters for sizing (per web process)."""
+    return jsonify({
+        "sttCache": get_transcript_cache().stats(),
+        "ttsCache": get_tts_cache().stats(),
+        "minimax": get_minimax_client().stats(),
+        "singleFlight": get_single_flight().stats(),
+    })
@@ -1,12 +1,11 @@
 """
 Writing: topic → essay. Submit content, get feedback, track level completion.
 """
-from datetime import datetime
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app import db
-from app.models import WritingTopic, WritingSubmission, UserLevelProgress
-from app.services.feedback import create_feedback, generate_writing_feedback
+from app.models import WritingTopic, WritingSubmission
+from app.services.feedback import generate_writing_feedback
+from app.services.submissions import record_submission
 
 writing_bp = Blueprint("writing", __name__)
 
@@ -16,7 +15,7 @@ writing_bp = Blueprint("writing", __name__)
 def level_topics(level_id):
     topics = WritingTopic.query.filter_by(level_id=level_id).order_by(WritingTopic.order).all()
     return jsonify([
-        {"id": t.id, "title": t.title, "prompt": t.prompt, "order": t.order}
+        {"id": t.id, "title": t.title, "prompt": t.prompt, "order": t.order, "audioUrl": t.tts_audio_url}
         for t in topics
     ])
 
@@ -39,36 +38,7 @@ def submit_writing(topic_id):
         writing_topic_id=topic_id,
         content=content,
     )
-    db.session.add(submission)
-    db.session.commit()
-
     feedback_content = generate_writing_feedback(topic.prompt, content)
-    create_feedback(
-        user_id=user_id,
-        type="writing",
-        content=feedback_content,
-        writing_submission_id=submission.id,
-    )
-
-    level_id = topic.level_id
-    category_id = topic.level.category_id
-    all_topic_ids = [t.id for t in WritingTopic.query.filter_by(level_id=level_id).all()]
-    count = WritingSubmission.query.filter(
-        WritingSubmission.user_id == user_id,
-        WritingSubmission.writing_topic_id.in_(all_topic_ids),
-    ).count()
-    if count >= len(all_topic_ids):
-        existing = UserLevelProgress.query.filter_by(
-            user_id=user_id, category_id=category_id, level_id=level_id
-        ).first()
-        if existing:
-            existing.completed = True
-            existing.completed_at = datetime.utcnow()
-        else:
-            db.session.add(UserLevelProgress(
-                user_id=user_id, category_id=category_id, level_id=level_id,
-                completed=True, completed_at=datetime.utcnow(),
-            ))
-        db.session.commit()
+    record_submission("writing", user_id, topic, submission, feedback_content)
 
     return jsonify({"submissionId": submission.id, "feedback": feedback_content}), 201
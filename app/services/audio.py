@@ -0,0 +1,146 @@
+"""
+Audio decoding for STT: container bytes → 16 kHz mono float32 PCM (what Whisper consumes).
+- Stream path: bytes are piped to ffmpeg over stdin and PCM is read from stdout; nothing touches disk.
+- File path: fallback for containers ffmpeg cannot read from a pipe (e.g. MP4/M4A with the index at the end).
+Also a cheap energy-based voice activity detector used to split and trim the PCM.
+"""
+import logging
+import os
+import subprocess
+import tempfile
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+# Containers that need a seekable input; skip the pipe attempt for these.
+_UNSTREAMABLE_SUFFIXES = {".m4a", ".mp4", ".mov"}
+
+
+class AudioDecodeError(Exception):
+    """ffmpeg could not decode the input."""
+
+
+def _ffmpeg_pcm(input_arg: str, stdin_bytes: bytes | None = None, sr: int = SAMPLE_RATE) -> np.ndarray:
+    cmd = [
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-threads", "0",
+        "-i", input_arg,
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sr),
+        "pipe:1",
+    ]
+    try:
+        proc = subprocess.run(cmd, input=stdin_bytes, capture_output=True, check=False)
+    except FileNotFoundError as e:
+        raise AudioDecodeError("ffmpeg not found on PATH") from e
+    if proc.returncode != 0 or not proc.stdout:
+        raise AudioDecodeError(proc.stderr.decode("utf-8", "replace").strip() or "ffmpeg produced no audio")
+    return np.frombuffer(proc.stdout, np.int16).astype(np.float32) / 32768.0
+
+
+def decode_pcm_stream(audio_bytes: bytes, sr: int = SAMPLE_RATE) -> np.ndarray:
+    """Decode in memory: bytes → ffmpeg stdin → PCM on stdout."""
+    return _ffmpeg_pcm("pipe:0", stdin_bytes=audio_bytes, sr=sr)
+
+
+def decode_pcm_file(audio_bytes: bytes, suffix: str = ".webm", sr: int = SAMPLE_RATE) -> np.ndarray:
+    """Decode via a temp file (seekable input)."""
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
+        tmp.write(audio_bytes)
+        tmp_path = tmp.name
+    try:
+        return _ffmpeg_pcm(tmp_path, sr=sr)
+    finally:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+
+def decode_pcm(audio_bytes: bytes, suffix: str = ".webm", sr: int = SAMPLE_RATE) -> np.ndarray:
+    """Decode container bytes to float32 PCM, preferring the in-memory path."""
+    if suffix.lower() not in _UNSTREAMABLE_SUFFIXES:
+        try:
+            return decode_pcm_stream(audio_bytes, sr=sr)
+        except AudioDecodeError as e:
+            logger.info("Audio stream decode failed (suffix=%s), retrying from temp file: %s", suffix, e)
+    return decode_pcm_file(audio_bytes, suffix=suffix, sr=sr)
+
+
+def duration_seconds(pcm: np.ndarray, sr: int = SAMPLE_RATE) -> float:
+    return len(pcm) / float(sr)
+
+
+# --- Energy-based voice activity (cheap, no model) ---
+FRAME_MS = 30
+# Only frames at or below this level can be silence. If the quietest tenth of a clip is louder, the clip has
+# no pauses and nothing is trimmed (a relative threshold alone would cut its quiet phonemes and soft endings).
+SILENCE_CEILING_DB = -45.0
+
+
+def frame_energies_db(pcm: np.ndarray, sr: int = SAMPLE_RATE, frame_ms: int = FRAME_MS) -> np.ndarray:
+    """RMS level per frame in dBFS."""
+    frame = int(sr * frame_ms / 1000)
+    n = len(pcm) // frame
+    if n == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = pcm[: n * frame].reshape(n, frame)
+    rms = np.sqrt(np.mean(frames * frames, axis=1) + 1e-12)
+    return 20 * np.log10(rms)
+
+
+def speech_mask(pcm: np.ndarray, sr: int = SAMPLE_RATE, frame_ms: int = FRAME_MS) -> np.ndarray:
+    """True for frames that look like speech: well above the clip's own noise floor, or simply too loud to be
+    silence (SILENCE_CEILING_DB)."""
+    db = frame_energies_db(pcm, sr, frame_ms)
+    if len(db) == 0:
+        return np.zeros(0, dtype=bool)
+    noise_floor = np.percentile(db, 10)
+    if noise_floor > SILENCE_CEILING_DB:
+        return np.ones(len(db), dtype=bool)
+    threshold = min(max(noise_floor + 12.0, -50.0), SILENCE_CEILING_DB)
+    return db > threshold
+
+
+def speech_segments(pcm: np.ndarray, sr: int = SAMPLE_RATE, min_silence_s: float = 0.5,
+                    frame_ms: int = FRAME_MS) -> list[tuple[int, int]]:
+    """Speech regions as (start_sample, end_sample), split wherever silence lasts >= min_silence_s."""
+    mask = speech_mask(pcm, sr, frame_ms)
+    frame = int(sr * frame_ms / 1000)
+    gap_frames = max(1, int(min_silence_s * 1000 / frame_ms))
+    segments = []
+    start = None
+    silent_run = 0
+    for i, is_speech in enumerate(mask):
+        if is_speech:
+            if start is None:
+                start = i
+            silent_run = 0
+        elif start is not None:
+            silent_run += 1
+            if silent_run >= gap_frames:
+                segments.append((start * frame, (i - silent_run + 1) * frame))
+                start = None
+                silent_run = 0
+    if start is not None:
+        segments.append((start * frame, (len(mask) - silent_run) * frame))
+    return segments
+
+
+def trim_silence(pcm: np.ndarray, sr: int = SAMPLE_RATE, max_pause_s: float = 0.6, keep_pause_s: float = 0.3,
+                 pad_s: float = 0.15) -> np.ndarray:
+    """Drop leading/trailing silence and shorten internal pauses longer than max_pause_s to keep_pause_s.
+    Each speech region keeps pad_s of context on both sides. Audio with no detectable speech is returned as is.
+    """
+    segments = speech_segments(pcm, sr, min_silence_s=max_pause_s)
+    if not segments:
+        return pcm
+    pad = int(pad_s * sr)
+    pause = np.zeros(int(keep_pause_s * sr), dtype=pcm.dtype)
+    pieces = []
+    for i, (start, end) in enumerate(segments):
+        if i:
+            pieces.append(pause)
+        pieces.append(pcm[max(0, start - pad): min(len(pcm), end + pad)])
+    return np.concatenate(pieces)
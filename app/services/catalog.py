@@ -0,0 +1,130 @@
+"""
+In-process cache of the category -> level tree.
+The tree only changes when content is edited, so it is built in one query and kept until a commit that
+touched a Category or Level invalidates it (after_flush marks the session, after_commit drops the tree).
+Other worker processes do not see that event, so entries also expire after CATALOG_CACHE_TTL seconds.
+Bulk Query.update()/delete() on these models bypasses the ORM events; call invalidate() after them.
+Cached dicts are shared between requests: copy before adding per-user fields.
+"""
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from config import Config
+from app import db
+from app.models import Category, Level, UserLevelProgress
+
+_CATALOG_MODELS = (Category, Level)
+
+
+class CatalogCache:
+    def __init__(self, ttl_s: float):
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self._entries = {}  # engine url -> (built_at, categories, by_slug)
+        self._generation = 0
+        self.counters = {"hits": 0, "builds": 0, "invalidations": 0}
+
+    def categories(self) -> list[dict]:
+        """[{id, slug, name, description, order, levels: [{id, order, name, description}]}] in display order."""
+        return self._entry()[0]
+
+    def by_slug(self, slug: str) -> dict | None:
+        return self._entry()[1].get(slug)
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self.counters["invalidations"] += 1
+
+    def _entry(self):
+        key = str(db.engine.url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and time.monotonic() - entry[0] < self.ttl_s:
+                self.counters["hits"] += 1
+                return entry[1:]
+            generation = self._generation
+        categories = self._build()
+        by_slug = {c["slug"]: c for c in categories}
+        with self._lock:
+            self.counters["builds"] += 1
+            # Don't store a tree read before an invalidation that happened while we were building it
+            if generation == self._generation:
+                self._entries[key] = (time.monotonic(), categories, by_slug)
+        return categories, by_slug
+
+    def _build(self) -> list[dict]:
+        rows = (
+            db.session.query(Category, Level)
+            .outerjoin(Level, Level.category_id == Category.id)
+            .order_by(Category.order, Level.order)
+            .all()
+        )
+        categories, seen = [], {}
+        for c, level in rows:
+            entry = seen.get(c.id)
+            if entry is None:
+                entry = seen[c.id] = {
+                    "id": c.id,
+                    "slug": c.slug,
+                    "name": c.name,
+                    "description": c.description,
+                    "order": c.order,
+                    "levels": [],
+                }
+                categories.append(entry)
+            if level is not None:
+                entry["levels"].append({
+                    "id": level.id,
+                    "order": level.order,
+                    "name": level.name,
+                    "description": level.description,
+                })
+        return categories
+
+
+def user_progress_map(user_id: str | None) -> dict:
+    """level_id -> (completed, completed_at) for the user; one narrow query."""
+    if not user_id:
+        return {}
+    rows = (
+        db.session.query(UserLevelProgress.level_id, UserLevelProgress.completed, UserLevelProgress.completed_at)
+        .filter(UserLevelProgress.user_id == user_id)
+        .all()
+    )
+    return {level_id: (bool(completed), completed_at) for level_id, completed, completed_at in rows}
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_catalog_dirty(session, flush_context):
+    if any(isinstance(obj, _CATALOG_MODELS) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info["catalog_dirty"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    if session.info.pop("catalog_dirty", False):
+        get_catalog().invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_on_rollback(session):
+    session.info.pop("catalog_dirty", None)
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog() -> CatalogCache:
+    global _catalog
+    if _catalog is not None:
+        return _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = CatalogCache(Config.CATALOG_CACHE_TTL)
+        return _catalog
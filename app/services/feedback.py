@@ -24,7 +24,9 @@ def create_feedback(
     listening_attempt_id: str | None = None,
     writing_submission_id: str | None = None,
     speaking_attempt_id: str | None = None,
+    commit: bool = True,
 ) -> Feedback:
+    """Add a Feedback row. With commit=False it is left in the session for the caller's transaction."""
     f = Feedback(
         user_id=user_id,
         type=type,
@@ -36,7 +38,8 @@ def create_feedback(
         speaking_attempt_id=speaking_attempt_id,
     )
     db.session.add(f)
-    db.session.commit()
+    if commit:
+        db.session.commit()
     return f
 
 
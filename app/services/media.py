@@ -0,0 +1,236 @@
+"""
+Media janitor for UPLOAD_FOLDER.
+- MediaIndex: last-access times for served files (/uploads touches are buffered in memory and flushed
+  in batches to a SQLite index kept outside UPLOAD_FOLDER).
+- collect(): once the folder exceeds MEDIA_QUOTA_BYTES, deletes the least recently used files until it is
+  back under the low watermark. Files referenced from the database (reels, dubbings, listening audio,
+  speaking samples and attempts, pre-rendered TTS) are never evicted. Abandoned .part files are removed.
+- shard_relpath(): new files go to <dir>/ab/cd/<name> so no single directory grows to 100k entries.
+Runs from media_janitor.py or as a background thread (MEDIA_JANITOR_INTERVAL); a lock file keeps
+sweeps from several worker processes from overlapping.
+"""
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import unquote, urlsplit
+
+from config import Config
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process sweep lock
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+UPLOADS_URL_PREFIX = "/uploads/"
+# Evict down to this fraction of the quota so a full folder is not swept on every write
+LOW_WATERMARK = 0.9
+# Partial writes older than this are leftovers from a crashed or abandoned write
+PART_MAX_AGE_SECONDS = 3600
+# Buffered touches are flushed once this many are pending or FLUSH_INTERVAL_SECONDS have passed
+FLUSH_BATCH = 256
+FLUSH_INTERVAL_SECONDS = 30
+
+
+def shard_relpath(directory: str, name: str, key: str | None = None) -> str:
+    """<directory>/<h[:2]>/<h[2:4]>/<name>, h = key (already a hex digest) or sha256(name)."""
+    h = key or hashlib.sha256(name.encode("utf-8")).hexdigest()
+    return f"{directory}/{h[:2]}/{h[2:4]}/{name}"
+
+
+def relpath_from_url(url: str | None) -> str | None:
+    """'uploads/...'-relative path for one of our /uploads URLs (absolute or root-relative), else None."""
+    path = urlsplit(url or "").path
+    if not path.startswith(UPLOADS_URL_PREFIX):
+        return None
+    return unquote(path[len(UPLOADS_URL_PREFIX):]) or None
+
+
+def referenced_relpaths() -> set[str]:
+    """Upload paths referenced from the database. Needs an app context."""
+    from app import db
+    from app.models import (
+        ListeningAudio, ReadingQuestion, ReadingText, Reel, ReelDubbing,
+        SpeakingAttempt, SpeakingExercise, WritingTopic,
+    )
+
+    columns = [
+        Reel.video_url, Reel.thumbnail_url, ReelDubbing.audio_url, ListeningAudio.audio_url,
+        SpeakingExercise.sample_audio_url, SpeakingAttempt.audio_url,
+        ReadingText.tts_audio_url, ReadingQuestion.tts_audio_url,
+        SpeakingExercise.tts_audio_url, WritingTopic.tts_audio_url,
+    ]
+    out = set()
+    for column in columns:
+        for (url,) in db.session.query(column).filter(column.isnot(None)):
+            relpath = relpath_from_url(url)
+            if relpath:
+                out.add(relpath)
+    return out
+
+
+class MediaIndex:
+    def __init__(self, index_path: str):
+        self.index_path = index_path
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._last_flush = time.monotonic()
+        self._conn = sqlite3.connect(index_path, check_same_thread=False, timeout=5)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS media_access (relpath TEXT PRIMARY KEY, last_access REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def touch(self, relpath: str):
+        with self._lock:
+            self._pending[relpath] = time.time()
+            due = len(self._pending) >= FLUSH_BATCH or time.monotonic() - self._last_flush >= FLUSH_INTERVAL_SECONDS
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+            if pending:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO media_access (relpath, last_access) VALUES (?, ?)", pending.items()
+                )
+                self._conn.commit()
+
+    def last_access(self) -> dict[str, float]:
+        self.flush()
+        with self._lock:
+            return dict(self._conn.execute("SELECT relpath, last_access FROM media_access"))
+
+    def forget(self, relpaths):
+        with self._lock:
+            self._conn.executemany("DELETE FROM media_access WHERE relpath = ?", [(r,) for r in relpaths])
+            self._conn.commit()
+
+
+class MediaJanitor:
+    def __init__(self, upload_folder: str, index: MediaIndex, quota_bytes: int):
+        self.upload_folder = os.path.abspath(upload_folder)
+        self.index = index
+        self.quota_bytes = quota_bytes
+
+    def collect(self, dry_run: bool = False) -> dict:
+        """One sweep; needs an app context (DB references). With dry_run nothing is deleted."""
+        referenced = referenced_relpaths()
+        accessed = self.index.last_access()
+        now = time.time()
+        stats = {"files": 0, "bytes": 0, "referenced": 0, "evicted": 0, "evictedBytes": 0,
+                 "partsRemoved": 0, "quotaBytes": self.quota_bytes, "dryRun": dry_run}
+        candidates, seen = [], set()
+        for dirpath, _dirnames, filenames in os.walk(self.upload_folder):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                if name.endswith(".part"):
+                    if now - st.st_mtime > PART_MAX_AGE_SECONDS:
+                        stats["partsRemoved"] += 1
+                        if not dry_run:
+                            self._unlink(path)
+                    continue
+                relpath = os.path.relpath(path, self.upload_folder).replace(os.sep, "/")
+                seen.add(relpath)
+                stats["files"] += 1
+                stats["bytes"] += st.st_size
+                if relpath in referenced:
+                    stats["referenced"] += 1
+                    continue
+                candidates.append((max(accessed.get(relpath, 0), st.st_mtime), relpath, path, st.st_size))
+
+        total, evicted = stats["bytes"], []
+        if self.quota_bytes > 0 and total > self.quota_bytes:
+            target = self.quota_bytes * LOW_WATERMARK
+            for _last, relpath, path, size in sorted(candidates):
+                if total <= target:
+                    break
+                if not dry_run and not self._unlink(path):
+                    continue
+                total -= size
+                evicted.append(relpath)
+                stats["evictedBytes"] += size
+            if total > self.quota_bytes:
+                logger.warning("Media janitor: %s bytes still in use after eviction; referenced files exceed the quota", total)
+        stats["evicted"] = len(evicted)
+        if not dry_run:
+            self.index.forget(evicted + [r for r in accessed if r not in seen])
+        logger.info("Media janitor: %s", stats)
+        return stats
+
+    def _unlink(self, path: str) -> bool:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            logger.exception("Media janitor: could not delete %s", path)
+            return False
+        return True
+
+    def run_exclusive(self, dry_run: bool = False) -> dict | None:
+        """collect() unless another process is already sweeping (returns None then)."""
+        if fcntl is None:
+            return self.collect(dry_run)
+        with open(self.index.index_path + ".lock", "a+b") as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return None
+            try:
+                return self.collect(dry_run)
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def start_background_janitor(app, interval_s: float) -> threading.Thread:
+    """Daemon thread that sweeps every `interval_s` seconds inside `app`'s context."""
+
+    def loop():
+        while True:
+            time.sleep(interval_s)
+            try:
+                with app.app_context():
+                    get_media_janitor().run_exclusive()
+            except Exception:
+                logger.exception("Media janitor sweep failed")
+
+    thread = threading.Thread(target=loop, name="media-janitor", daemon=True)
+    thread.start()
+    return thread
+
+
+_index = None
+_janitor = None
+_media_lock = threading.Lock()
+
+
+def get_media_index() -> MediaIndex:
+    global _index
+    if _index is not None:
+        return _index
+    with _media_lock:
+        if _index is None:
+            _index = MediaIndex(Config.MEDIA_INDEX)
+        return _index
+
+
+def get_media_janitor() -> MediaJanitor:
+    global _janitor
+    if _janitor is not None:
+        return _janitor
+    index = get_media_index()
+    with _media_lock:
+        if _janitor is None:
+            _janitor = MediaJanitor(Config.UPLOAD_FOLDER, index, Config.MEDIA_QUOTA_BYTES)
+        return _janitor
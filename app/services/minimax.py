@@ -0,0 +1,211 @@
+"""
+MiniMax text-to-audio client.
+- One pooled keep-alive session per process (no TCP+TLS handshake per call).
+- Separate connect / read timeouts.
+- Bounded retries with full-jitter exponential backoff on connection errors, timeouts, 429 and 5xx.
+- Circuit breaker: once the recent error rate crosses a threshold, calls fail fast for a cooldown
+  instead of tying up request threads on a slow provider; one probe call then decides whether to close.
+"""
+import json
+import logging
+import random
+import threading
+import time
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class MiniMaxError(Exception):
+    """MiniMax call failed (after retries)."""
+
+
+class CircuitOpenError(MiniMaxError):
+    """MiniMax calls are short-circuited while the breaker is open."""
+
+
+class CircuitBreaker:
+    def __init__(self, window: int, failure_ratio: float, min_calls: int, cooldown_s: float):
+        self.failure_ratio = failure_ratio
+        self.min_calls = min_calls
+        self.cooldown_s = cooldown_s
+        self._results = deque(maxlen=window)  # True = success
+        self._opened_at = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state_locked()
+
+    def _state_locked(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.cooldown_s:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self._state_locked()
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record(self, success: bool):
+        with self._lock:
+            if self._opened_at is not None:
+                self._probe_in_flight = False
+                if success:
+                    self._opened_at = None
+                    self._results.clear()
+                else:
+                    self._opened_at = time.monotonic()
+                return
+            self._results.append(success)
+            failures = self._results.count(False)
+            if len(self._results) >= self.min_calls and failures / len(self._results) >= self.failure_ratio:
+                self._opened_at = time.monotonic()
+                logger.warning("MiniMax circuit opened: %s/%s recent calls failed", failures, len(self._results))
+
+
+class MiniMaxClient:
+    def __init__(self, api_key: str, url: str, connect_timeout: float, read_timeout: float,
+                 max_retries: int, backoff_base: float, breaker: CircuitBreaker, pool_size: int = 16):
+        self.api_key = api_key
+        self.url = url
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.breaker = breaker
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.counters = {"calls": 0, "retries": 0, "failures": 0, "shortCircuited": 0}
+
+    def _headers(self) -> dict:
+        return {"Content-Type": "application/json", "Authorization": "Bearer " + self.api_key}
+
+    def _backoff(self, attempt: int):
+        time.sleep(random.uniform(0, self.backoff_base * (2 ** attempt)))
+
+    def post(self, payload: dict, stream: bool = False) -> requests.Response:
+        """POST with retries and the circuit breaker. Returns a 2xx response (caller closes it when streaming)."""
+        if not self.breaker.allow():
+            self.counters["shortCircuited"] += 1
+            raise CircuitOpenError("TTS provider unavailable (circuit open); try again shortly.")
+        self.counters["calls"] += 1
+        healthy = False
+        try:
+            last_error = None
+            for attempt in range(self.max_retries + 1):
+                if attempt:
+                    self.counters["retries"] += 1
+                    self._backoff(attempt - 1)
+                try:
+                    resp = self.session.post(self.url, json=payload, headers=self._headers(), timeout=self.timeout, stream=stream)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    last_error = e
+                    continue
+                if resp.status_code in RETRYABLE_STATUS:
+                    last_error = requests.HTTPError(f"{resp.status_code} from MiniMax", response=resp)
+                    resp.close()
+                    continue
+                healthy = True  # 4xx is our request's fault, not provider health
+                try:
+                    resp.raise_for_status()
+                except requests.HTTPError as e:
+                    resp.close()
+                    raise MiniMaxError(str(e)) from e
+                return resp
+            self.counters["failures"] += 1
+            raise MiniMaxError(str(last_error))
+        except requests.RequestException as e:
+            # Not retried (bad URL, redirect loop, broken response) but still a failed call
+            self.counters["failures"] += 1
+            raise MiniMaxError(str(e)) from e
+        finally:
+            # Always settle the call, so a half-open probe cannot leave the breaker stuck
+            self.breaker.record(healthy)
+
+    def t2a(self, payload: dict) -> dict:
+        """Non-streaming text-to-audio call; returns the decoded JSON body."""
+        resp = self.post(payload)
+        try:
+            return resp.json()
+        except ValueError as e:
+            raise MiniMaxError("Invalid MiniMax response: " + str(e)) from e
+
+    def t2a_stream(self, payload: dict):
+        """Streaming text-to-audio call ("stream": true). Yields audio bytes as the provider sends them.
+        The provider answers with server-sent events carrying hex audio; the closing event (status 2)
+        repeats the whole clip, so it is only used when no chunk arrived before it.
+        """
+        resp = self.post({**payload, "stream": True}, stream=True)
+        received = False
+        try:
+            for line in resp.iter_lines():
+                if not line or not line.startswith(b"data:"):
+                    continue
+                try:
+                    event = json.loads(line[5:].strip())
+                except ValueError as e:
+                    raise MiniMaxError("Invalid MiniMax stream event: " + str(e)) from e
+                data = event.get("data") or {}
+                audio_hex = data.get("audio")
+                if not audio_hex or (data.get("status") == 2 and received):
+                    continue
+                try:
+                    chunk = bytes.fromhex(audio_hex)
+                except ValueError as e:
+                    raise MiniMaxError("Invalid audio hex: " + str(e)) from e
+                received = True
+                yield chunk
+        except requests.RequestException as e:
+            raise MiniMaxError(str(e)) from e
+        finally:
+            resp.close()
+        if not received:
+            raise MiniMaxError("No audio in response.")
+
+    def stats(self) -> dict:
+        return {**self.counters, "circuit": self.breaker.state}
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_minimax_client() -> MiniMaxClient:
+    global _client
+    if _client is not None:
+        return _client
+    with _client_lock:
+        if _client is None:
+            _client = MiniMaxClient(
+                api_key=Config.MINIMAX_API_KEY,
+                url=Config.MINIMAX_T2A_URL,
+                connect_timeout=Config.MINIMAX_CONNECT_TIMEOUT,
+                read_timeout=Config.MINIMAX_READ_TIMEOUT,
+                max_retries=Config.MINIMAX_MAX_RETRIES,
+                backoff_base=0.2,
+                breaker=CircuitBreaker(
+                    window=20,
+                    failure_ratio=Config.MINIMAX_BREAKER_FAILURE_RATIO,
+                    min_calls=5,
+                    cooldown_s=Config.MINIMAX_BREAKER_COOLDOWN,
+                ),
+            )
+        return _client
@@ -0,0 +1,70 @@
+"""
+Keyset (cursor) pagination for listings.
+A page is `WHERE (k1, k2, ...) > (last row's keys) ORDER BY k1, k2, ... LIMIT n` (or < / DESC), so each page
+is one index range seek and costs the same at any depth, unlike OFFSET. The last key must be unique (id) so
+ties on the leading keys are neither skipped nor repeated. Cursors are opaque to clients: urlsafe base64 of
+the JSON key values. Routes keep returning a JSON list and put the next cursor in the X-Next-Cursor header
+(absent on the last page).
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from sqlalchemy import DateTime, literal, tuple_
+
+from config import Config
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values) -> str:
+    plain = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(plain, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, columns) -> list:
+    """Key values for `columns` from a cursor made by encode_cursor; raises InvalidCursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise InvalidCursor("Invalid cursor")
+        return [
+            datetime.fromisoformat(v) if isinstance(c.type, DateTime) and v is not None else v
+            for c, v in zip(columns, values)
+        ]
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+
+
+def page_size(requested) -> int:
+    """?limit= clamped to 1..MAX_PAGE_SIZE; PAGE_SIZE when missing or not a number."""
+    try:
+        size = int(requested)
+    except (TypeError, ValueError):
+        return Config.PAGE_SIZE
+    return max(1, min(size, Config.MAX_PAGE_SIZE))
+
+
+def keyset_page(query, columns, cursor: str | None, limit: int, descending: bool = False):
+    """(rows, next cursor or None) for `query` ordered by `columns` (all ascending or all descending).
+    Key columns must be non-null. Raises InvalidCursor for a malformed cursor.
+    """
+    key = tuple_(*columns)
+    if cursor:
+        # Typed binds, so key columns with a custom type (CompactId) convert the cursor values too
+        after = tuple_(*(literal(v, c.type) for c, v in zip(columns, decode_cursor(cursor, columns))))
+        query = query.filter(key < after if descending else key > after)
+    query = query.order_by(*(c.desc() if descending else c.asc() for c in columns))
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, c.key) for c in columns)
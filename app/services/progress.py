@@ -0,0 +1,210 @@
+"""
+Materialized level progress.
+- user_item_completions: one row per (user, item) ever submitted, inserted with ON CONFLICT DO NOTHING.
+- user_level_counters: distinct completed items per (user, level), bumped only when that insert adds a row.
+- LevelItemCounts: in-process cache of items per level, dropped when a commit touches lesson items.
+Completion is then `counter >= item count`, independent of attempt history. Migration 5 fills both tables
+from the attempt tables on upgrade; rebuild() recomputes them to repair drift after content deletes
+(CLI: progress_counters.py).
+"""
+import threading
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
+from config import Config
+from app import db
+from app.models import (
+    ListeningAttempt,
+    ListeningAudio,
+    ReadingAttempt,
+    ReadingText,
+    SpeakingAttempt,
+    SpeakingExercise,
+    UserItemCompletion,
+    UserLevelCounter,
+    WritingSubmission,
+    WritingTopic,
+)
+
+
+@dataclass(frozen=True)
+class SubmissionKind:
+    item_model: type
+    attempt_model: type
+    item_fk: str  # attempt column pointing at the item
+    feedback_fk: str  # Feedback column pointing at the attempt
+
+
+KINDS = {
+    "reading": SubmissionKind(ReadingText, ReadingAttempt, "reading_text_id", "reading_attempt_id"),
+    "listening": SubmissionKind(ListeningAudio, ListeningAttempt, "listening_audio_id", "listening_attempt_id"),
+    "writing": SubmissionKind(WritingTopic, WritingSubmission, "writing_topic_id", "writing_submission_id"),
+    "speaking": SubmissionKind(SpeakingExercise, SpeakingAttempt, "exercise_id", "speaking_attempt_id"),
+}
+_ITEM_MODELS = tuple(k.item_model for k in KINDS.values())
+
+
+def dialect_insert(model):
+    """(insert construct with conflict clauses, dialect name); the construct is None on dialects without one."""
+    name = db.session.get_bind().dialect.name
+    if name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    elif name in ("mysql", "mariadb"):
+        from sqlalchemy.dialects.mysql import insert
+    else:
+        return None, name
+    return insert(model), name
+
+
+def mark_item_completed(kind: str, user_id: str, level_id: str, item_id: str) -> int:
+    """Record that the user has done this item; returns the user's distinct completed items in the level.
+    Runs in the caller's transaction (no commit).
+    """
+    values = {"user_id": user_id, "level_id": level_id, "item_type": kind, "item_id": item_id}
+    stmt, dialect = dialect_insert(UserItemCompletion)
+    if stmt is None:
+        added = not UserItemCompletion.query.filter_by(user_id=user_id, item_type=kind, item_id=item_id).first()
+        if added:
+            db.session.add(UserItemCompletion(**values))
+    else:
+        stmt = stmt.values(**values)
+        if dialect in ("mysql", "mariadb"):
+            stmt = stmt.prefix_with("IGNORE")
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=["user_id", "item_type", "item_id"])
+        added = db.session.execute(stmt).rowcount == 1
+    if added:
+        _increment_counter(user_id, level_id)
+    return db.session.query(UserLevelCounter.completed_items).filter_by(user_id=user_id, level_id=level_id).scalar() or 0
+
+
+def _increment_counter(user_id: str, level_id: str):
+    stmt, dialect = dialect_insert(UserLevelCounter)
+    if stmt is None:
+        counter = UserLevelCounter.query.filter_by(user_id=user_id, level_id=level_id).first()
+        if counter:
+            counter.completed_items += 1
+        else:
+            db.session.add(UserLevelCounter(user_id=user_id, level_id=level_id, completed_items=1))
+        db.session.flush()
+        return
+    stmt = stmt.values(user_id=user_id, level_id=level_id, completed_items=1)
+    bumped = UserLevelCounter.__table__.c.completed_items + 1
+    if dialect in ("mysql", "mariadb"):
+        stmt = stmt.on_duplicate_key_update(completed_items=bumped)
+    else:
+        stmt = stmt.on_conflict_do_update(index_elements=["user_id", "level_id"], set_={"completed_items": bumped})
+    db.session.execute(stmt)
+
+
+class LevelItemCounts:
+    def __init__(self, ttl_s: float):
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self._counts = {}  # (engine url, kind, level_id) -> (fetched_at, count)
+
+    def get(self, kind: str, level_id: str) -> int:
+        key = (str(db.engine.url), kind, level_id)
+        with self._lock:
+            hit = self._counts.get(key)
+        if hit and time.monotonic() - hit[0] < self.ttl_s:
+            return hit[1]
+        item = KINDS[kind].item_model
+        count = db.session.query(func.count(item.id)).filter(item.level_id == level_id).scalar()
+        with self._lock:
+            self._counts[key] = (time.monotonic(), count)
+        return count
+
+    def invalidate(self):
+        with self._lock:
+            self._counts.clear()
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_items_dirty(session, flush_context):
+    if any(isinstance(obj, _ITEM_MODELS) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info["items_dirty"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    if session.info.pop("items_dirty", False):
+        get_level_item_counts().invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_on_rollback(session):
+    session.info.pop("items_dirty", None)
+
+
+def _expected_completions() -> set[tuple[str, str, str, str]]:
+    """(user_id, level_id, kind, item_id) for every distinct item with at least one attempt."""
+    out = set()
+    for kind, spec in KINDS.items():
+        item, attempt = spec.item_model, spec.attempt_model
+        fk = getattr(attempt, spec.item_fk)
+        rows = db.session.query(attempt.user_id, item.level_id, fk).join(item, item.id == fk).distinct()
+        out.update((user_id, level_id, kind, item_id) for user_id, level_id, item_id in rows)
+    return out
+
+
+def rebuild(fix: bool = False) -> dict:
+    """Compare the materialized tables with the attempt tables; with fix=True replace them and commit.
+    Returns counts of missing/extra completion rows and mismatched counters (before any fix).
+    """
+    expected = _expected_completions()
+    stored = {
+        (c.user_id, c.level_id, c.item_type, c.item_id)
+        for c in db.session.query(UserItemCompletion.user_id, UserItemCompletion.level_id,
+                                  UserItemCompletion.item_type, UserItemCompletion.item_id)
+    }
+    expected_counts = {}
+    for user_id, level_id, _kind, _item_id in expected:
+        expected_counts[(user_id, level_id)] = expected_counts.get((user_id, level_id), 0) + 1
+    stored_counts = {
+        (user_id, level_id): n
+        for user_id, level_id, n in db.session.query(
+            UserLevelCounter.user_id, UserLevelCounter.level_id, UserLevelCounter.completed_items
+        )
+    }
+    report = {
+        "completions": len(expected),
+        "missingCompletions": len(expected - stored),
+        "extraCompletions": len(stored - expected),
+        "counters": len(expected_counts),
+        "mismatchedCounters": sum(
+            1 for key in expected_counts.keys() | stored_counts.keys()
+            if expected_counts.get(key, 0) != stored_counts.get(key, 0)
+        ),
+    }
+    report["consistent"] = not (report["missingCompletions"] or report["extraCompletions"] or report["mismatchedCounters"])
+    if fix and not report["consistent"]:
+        db.session.query(UserItemCompletion).delete()
+        db.session.query(UserLevelCounter).delete()
+        db.session.add_all(
+            UserItemCompletion(user_id=u, level_id=l, item_type=k, item_id=i) for u, l, k, i in expected
+        )
+        db.session.add_all(
+            UserLevelCounter(user_id=u, level_id=l, completed_items=n) for (u, l), n in expected_counts.items()
+        )
+        db.session.commit()
+    return report
+
+
+_item_counts = None
+_item_counts_lock = threading.Lock()
+
+
+def get_level_item_counts() -> LevelItemCounts:
+    global _item_counts
+    if _item_counts is not None:
+        return _item_counts
+    with _item_counts_lock:
+        if _item_counts is None:
+            _item_counts = LevelItemCounts(Config.CATALOG_CACHE_TTL)
+        return _item_counts
@@ -0,0 +1,88 @@
+"""
+In-process cache of decoded ReadingQuestion.options, keyed by question id.
+Keying on the stored JSON would hash the whole string on every request; the id is enough because a commit
+that touched the question drops its entry (after_flush marks the session, after_commit invalidates, as in
+catalog.py). Other worker processes do not see that event, so entries also expire after CATALOG_CACHE_TTL.
+Bulk Query.update()/delete() on ReadingQuestion bypasses the ORM events; call invalidate() after them.
+Values are json.loads results shared between requests: do not mutate them.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from config import Config
+from app.models import ReadingQuestion
+
+MAX_ENTRIES = 4096
+
+
+class QuestionOptionsCache:
+    def __init__(self, ttl_s: float, max_entries: int = MAX_ENTRIES):
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # question id -> (stored at, decoded options)
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0}
+
+    def get(self, question):
+        """Decoded options of a loaded ReadingQuestion (None when empty), as json.loads returns them."""
+        with self._lock:
+            entry = self._entries.get(question.id)
+            if entry and time.monotonic() - entry[0] < self.ttl_s:
+                self._entries.move_to_end(question.id)
+                self.counters["hits"] += 1
+                return entry[1]
+            self.counters["misses"] += 1
+        options = json.loads(question.options) if question.options else None
+        with self._lock:
+            self._entries[question.id] = (time.monotonic(), options)
+            self._entries.move_to_end(question.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return options
+
+    def invalidate(self, question_ids=None):
+        """Drop the given questions, or everything."""
+        with self._lock:
+            if question_ids is None:
+                self._entries.clear()
+                return
+            for question_id in question_ids:
+                self._entries.pop(question_id, None)
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_questions_dirty(session, flush_context):
+    ids = {obj.id for obj in (*session.new, *session.dirty, *session.deleted) if isinstance(obj, ReadingQuestion)}
+    if ids:
+        session.info.setdefault("dirty_question_ids", set()).update(ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    ids = session.info.pop("dirty_question_ids", None)
+    if ids:
+        get_question_options().invalidate(ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_on_rollback(session):
+    session.info.pop("dirty_question_ids", None)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_question_options() -> QuestionOptionsCache:
+    global _cache
+    if _cache is not None:
+        return _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = QuestionOptionsCache(Config.CATALOG_CACHE_TTL)
+        return _cache
@@ -0,0 +1,108 @@
+"""
+Content-addressed transcript cache for STT.
+Key = sha256(Whisper model name, language, audio bytes). Two tiers:
+- in-process LRU (STT_CACHE_SIZE entries),
+- optional SQLite file (STT_CACHE_DB) shared by worker processes and kept across restarts.
+"""
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+def transcript_key(audio_bytes: bytes, language: str | None, model_name: str) -> str:
+    h = hashlib.sha256()
+    h.update(f"{model_name}\0{language or 'auto'}\0".encode("utf-8"))
+    h.update(audio_bytes)
+    return h.hexdigest()
+
+
+class TranscriptCache:
+    def __init__(self, max_entries: int, db_path: str | None = None):
+        self.max_entries = max_entries
+        self.db_path = db_path or None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self.counters = {"memoryHits": 0, "diskHits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        if self.db_path:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=5)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS transcripts (key TEXT PRIMARY KEY, text TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+
+    def get(self, key: str, count: bool = True) -> str | None:
+        """Cached transcript or None. count=False leaves the hit/miss counters alone (a re-check)."""
+        with self._lock:
+            text = self._entries.get(key)
+            if text is not None:
+                self._entries.move_to_end(key)
+                if count:
+                    self.counters["memoryHits"] += 1
+                return text
+            if self._conn is not None:
+                row = self._conn.execute("SELECT text FROM transcripts WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    if count:
+                        self.counters["diskHits"] += 1
+                    self._remember_locked(key, row[0])
+                    return row[0]
+            if count:
+                self.counters["misses"] += 1
+            return None
+
+    def put(self, key: str, text: str):
+        with self._lock:
+            self.counters["stores"] += 1
+            self._remember_locked(key, text)
+            if self._conn is not None:
+                try:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO transcripts (key, text, created_at) VALUES (?, ?, ?)",
+                        (key, text, time.time()),
+                    )
+                    self._conn.commit()
+                except sqlite3.Error:
+                    logger.exception("STT cache: disk write failed")
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.counters["memoryHits"] + self.counters["diskHits"] + self.counters["misses"]
+            hits = lookups - self.counters["misses"]
+            return {
+                **self.counters,
+                "entries": len(self._entries),
+                "maxEntries": self.max_entries,
+                "diskEnabled": self._conn is not None,
+                "hitRate": round(hits / lookups, 4) if lookups else None,
+            }
+
+    def _remember_locked(self, key: str, text: str):
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = text
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.counters["evictions"] += 1
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_transcript_cache() -> TranscriptCache:
+    global _cache
+    if _cache is not None:
+        return _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TranscriptCache(Config.STT_CACHE_SIZE, Config.STT_CACHE_DB)
+        return _cache
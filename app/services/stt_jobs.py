@@ -0,0 +1,180 @@
+"""
+Asynchronous STT jobs (job mode for POST /api/tts-stt/stt).
+A fixed-size pool of worker processes, each holding a preloaded Whisper model, drains a bounded queue.
+The web tier only enqueues and returns a job id; clients poll (or long-poll) the job for the transcript.
+"""
+import logging
+import multiprocessing
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Finished jobs are kept this long so clients can still fetch the result.
+JOB_RETENTION_SECONDS = 600
+
+
+class QueueFullError(Exception):
+    """Raised when the STT job queue already holds STT_QUEUE_MAX pending jobs."""
+
+
+def _init_worker():
+    """Runs once in each worker process: load the Whisper model before the first job arrives."""
+    from app.services.tts_stt import _get_whisper_model
+    _get_whisper_model()
+
+
+def _run_job(audio: str | bytes, language: str | None, suffix: str = ".webm") -> dict:
+    """`audio` is a URL / base64 string (JSON uploads) or raw container bytes (binary uploads)."""
+    from app.services.tts_stt import speech_to_text, transcribe_audio_bytes
+    if isinstance(audio, (bytes, bytearray)):
+        return transcribe_audio_bytes(bytes(audio), suffix=suffix, language=language)
+    return speech_to_text(audio, language=language)
+
+
+class SttJob:
+    def __init__(self, job_id: str):
+        self.id = job_id
+        self.status = "queued"  # queued | running | done | error
+        self.text = None
+        self.error = None
+        self.created_at = time.monotonic()
+        self.finished_at = None
+        self.done = threading.Event()
+        self.future = None
+
+    def to_json(self) -> dict:
+        out = {"jobId": self.id, "status": self.status}
+        if self.status == "done":
+            out["text"] = self.text
+        elif self.status == "error":
+            out["error"] = self.error
+        return out
+
+
+class SttJobQueue:
+    """Bounded STT job queue backed by a process pool.
+    `executor` and `func` can be swapped (e.g. a thread pool and a fake transcriber in tests).
+    """
+
+    def __init__(self, workers: int, max_pending: int, timeout: float, executor=None, func=None):
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._func = func or _run_job
+        if executor is None:
+            # spawn, not fork: the web process is multi-threaded and torch does not survive fork well
+            executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        self._executor = executor
+        self._jobs = {}
+        self._in_flight = 0  # submitted jobs whose future has not finished, timed-out ones included
+        self._lock = threading.RLock()
+
+    def pending_count(self) -> int:
+        """Jobs queued or holding a worker. A timed-out job counts until its worker is actually free."""
+        with self._lock:
+            return self._in_flight
+
+    def submit(self, audio: str | bytes, language: str | None = None, suffix: str = ".webm") -> SttJob:
+        with self._lock:
+            self._sweep_locked()
+            if self._in_flight >= self.max_pending:
+                raise QueueFullError("STT queue is full, try again shortly.")
+            self._in_flight += 1
+            pending = self._in_flight
+            job = SttJob(uuid.uuid4().hex)
+            self._jobs[job.id] = job
+        try:
+            job.future = self._executor.submit(self._func, audio, language, suffix)
+        except Exception:
+            with self._lock:
+                self._in_flight -= 1
+                del self._jobs[job.id]
+            raise
+        job.future.add_done_callback(lambda f, job=job: self._finish(job, f))
+        logger.info("STT job queued: id=%s pending=%s", job.id, pending)
+        return job
+
+    def get(self, job_id: str, wait: float = 0) -> SttJob | None:
+        """Return the job, optionally blocking up to `wait` seconds for it to finish (long-poll)."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        if wait > 0 and not job.done.is_set():
+            remaining = self.timeout - (time.monotonic() - job.created_at)
+            job.done.wait(max(0.0, min(wait, remaining)))
+        self._check_timeout(job)
+        if job.status == "queued" and job.future is not None and job.future.running():
+            job.status = "running"
+        return job
+
+    def shutdown(self, wait: bool = False):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _finish(self, job: SttJob, future):
+        try:
+            result = future.result()
+        except Exception as e:  # includes CancelledError and BrokenProcessPool
+            logger.exception("STT job failed: id=%s", job.id)
+            result = {"success": False, "error": str(e) or type(e).__name__}
+        with self._lock:
+            self._in_flight -= 1
+            if job.done.is_set():
+                return  # already timed out; late result is dropped
+            if result.get("success"):
+                job.status = "done"
+                job.text = result.get("text", "")
+            else:
+                job.status = "error"
+                job.error = result.get("error", "STT failed")
+            job.finished_at = time.monotonic()
+            job.done.set()
+        logger.info("STT job finished: id=%s status=%s secs=%.2f", job.id, job.status, job.finished_at - job.created_at)
+
+    def _check_timeout(self, job: SttJob):
+        with self._lock:
+            if job.done.is_set() or time.monotonic() - job.created_at < self.timeout:
+                return
+            job.status = "error"
+            job.error = "STT job timed out."
+            job.finished_at = time.monotonic()
+            job.done.set()
+        if job.future is not None:
+            # Only succeeds while still queued. A running worker finishes and its result is ignored; the job
+            # keeps its slot in pending_count() until then, so STT_QUEUE_MAX still bounds the real load.
+            job.future.cancel()
+        logger.warning("STT job timed out: id=%s", job.id)
+
+    def _sweep_locked(self):
+        now = time.monotonic()
+        for job in list(self._jobs.values()):
+            self._check_timeout(job)
+            if job.finished_at is not None and now - job.finished_at > JOB_RETENTION_SECONDS:
+                del self._jobs[job.id]
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> SttJobQueue:
+    """Process-wide job queue, created (and its worker pool started) on first use."""
+    global _queue
+    if _queue is not None:
+        return _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = SttJobQueue(
+                workers=Config.STT_WORKERS,
+                max_pending=Config.STT_QUEUE_MAX,
+                timeout=Config.STT_JOB_TIMEOUT,
+            )
+        return _queue
@@ -0,0 +1,204 @@
+"""
+Streaming STT: the browser uploads recorder chunks while the learner is still speaking.
+Chunks re-decode the growing container (webm/ogg decode fine from a prefix), split the PCM on voice
+activity and send every segment that has closed (followed by enough silence) to Whisper in the background.
+A prefix cannot be decoded piecewise, so re-decodes are throttled to geometric growth of the buffer
+(REDECODE_GROWTH): total decode work stays linear in the recording length instead of quadratic.
+Partial transcripts come back on every chunk; finish() only has to transcribe the tail.
+A stream's buffer is capped at STT_MAX_UPLOAD_BYTES, like a one-shot upload.
+Streams live in this process's memory, so a multi-process deployment needs sticky routing per stream.
+"""
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from config import Config
+from app.services.audio import SAMPLE_RATE, AudioDecodeError, decode_pcm_stream, speech_segments, trim_silence
+
+logger = logging.getLogger(__name__)
+
+# Silence that closes a segment, and context kept on either side of it for Whisper
+SEGMENT_GAP_SECONDS = 0.5
+SEGMENT_PAD_SECONDS = 0.2
+# Force a cut inside uninterrupted speech so every segment fits one Whisper window
+MAX_SEGMENT_SECONDS = 25
+# Idle streams are dropped after this long
+STREAM_IDLE_SECONDS = 120
+# Re-decode once the buffer has grown by this fraction since the last decode
+REDECODE_GROWTH = 0.25
+
+
+class StreamNotFoundError(Exception):
+    pass
+
+
+class StreamTooLargeError(Exception):
+    pass
+
+
+class SttStream:
+    def __init__(self, language: str | None):
+        self.id = uuid.uuid4().hex
+        self.language = language
+        self.buffer = bytearray()
+        self.pcm = None  # last decode of the buffer
+        self.decoded_bytes = 0  # buffer length at that decode
+        self.committed = 0  # PCM samples already handed to Whisper
+        self.segments = []  # futures, in audio order
+        self.last_activity = time.monotonic()
+        self.lock = threading.Lock()
+
+    def partial_text(self) -> str:
+        """Transcripts of the leading segments that have finished, in order."""
+        texts = []
+        for f in self.segments:
+            if not f.done():
+                break
+            if f.exception() is None and f.result():
+                texts.append(f.result())
+        return " ".join(texts)
+
+
+class SttStreamManager:
+    def __init__(self, workers: int, transcribe=None, score=None):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="stt-stream")
+        self._transcribe = transcribe
+        self._score = score
+        self._streams = {}
+        self._lock = threading.Lock()
+
+    def _transcribe_pcm(self, pcm, language):
+        if self._transcribe is not None:
+            return self._transcribe(pcm, language)
+        from app.services.tts_stt import _transcribe_pcm
+        return _transcribe_pcm(pcm, language)
+
+    def _score_options(self, pcm, options, language):
+        if self._score is not None:
+            return self._score(pcm, options, language)
+        from app.services.tts_stt import score_options
+        return score_options(pcm, options, language)
+
+    def open(self, language: str | None = None) -> SttStream:
+        stream = SttStream((language or "id").strip() or None)
+        with self._lock:
+            self._sweep_idle()
+            self._streams[stream.id] = stream
+        return stream
+
+    def _sweep_idle(self):
+        """Drop streams idle for STREAM_IDLE_SECONDS. Caller holds self._lock."""
+        now = time.monotonic()
+        for sid, s in list(self._streams.items()):
+            if now - s.last_activity > STREAM_IDLE_SECONDS:
+                del self._streams[sid]
+
+    def get(self, stream_id: str) -> SttStream:
+        with self._lock:
+            self._sweep_idle()
+            stream = self._streams.get(stream_id)
+        if stream is None:
+            raise StreamNotFoundError("Stream not found")
+        return stream
+
+    def append(self, stream_id: str, chunk: bytes) -> dict:
+        """Add a chunk and return the partial transcript. Raises StreamTooLargeError (and drops the
+        stream) once the recording exceeds STT_MAX_UPLOAD_BYTES.
+        """
+        stream = self.get(stream_id)
+        max_bytes = Config.STT_MAX_UPLOAD_BYTES
+        with stream.lock:
+            stream.last_activity = time.monotonic()
+            if len(stream.buffer) + len(chunk) > max_bytes:
+                with self._lock:
+                    self._streams.pop(stream_id, None)
+                raise StreamTooLargeError(f"Audio exceeds {max_bytes} bytes")
+            stream.buffer.extend(chunk)
+            pcm = None
+            if len(stream.buffer) >= stream.decoded_bytes * (1 + REDECODE_GROWTH):
+                pcm = self._decode(stream)
+            if pcm is not None:
+                self._submit_closed_segments(stream, pcm, final=False)
+            return {"streamId": stream.id, "partial": stream.partial_text(), "final": False}
+
+    def finish(self, stream_id: str, options: list[str] | None = None) -> dict:
+        """Transcribe the tail and return the full text. With `options`, also score them against the
+        whole recording (see tts_stt.match_options) and return the best one as `match`.
+        """
+        from app.services.tts_stt import best_option
+        stream = self.get(stream_id)
+        with self._lock:
+            self._streams.pop(stream_id, None)
+        with stream.lock:
+            pcm = self._decode(stream)
+            if pcm is not None:
+                self._submit_closed_segments(stream, pcm, final=True)
+            texts = []
+            for f in stream.segments:
+                try:
+                    text = f.result()
+                except Exception:
+                    logger.exception("STT stream %s: segment failed", stream.id)
+                    continue
+                if text:
+                    texts.append(text)
+            out = {"streamId": stream.id, "text": " ".join(texts), "final": True}
+            options = [str(o) for o in options or [] if str(o).strip()]
+            if options and pcm is not None and len(pcm):
+                try:
+                    if Config.STT_VAD_ENABLED:
+                        pcm = trim_silence(pcm)
+                    out["match"] = best_option(options, self._score_options(pcm, options, stream.language))
+                except Exception:
+                    logger.exception("STT stream %s: option match failed", stream.id)
+        return out
+
+    def _decode(self, stream: SttStream):
+        """PCM of the whole buffer; reuses the last decode when no bytes arrived since."""
+        if not stream.buffer:
+            return None
+        if stream.decoded_bytes == len(stream.buffer):
+            return stream.pcm
+        try:
+            stream.pcm = decode_pcm_stream(bytes(stream.buffer))
+            stream.decoded_bytes = len(stream.buffer)
+            return stream.pcm
+        except AudioDecodeError as e:
+            # The first chunks may not contain a complete header yet
+            logger.debug("STT stream %s: decode not ready (%s)", stream.id, e)
+            return None
+
+    def _submit_closed_segments(self, stream: SttStream, pcm, final: bool):
+        gap = int(SEGMENT_GAP_SECONDS * SAMPLE_RATE)
+        pad = int(SEGMENT_PAD_SECONDS * SAMPLE_RATE)
+        max_len = MAX_SEGMENT_SECONDS * SAMPLE_RATE
+        for start, end in speech_segments(pcm, min_silence_s=SEGMENT_GAP_SECONDS):
+            if end <= stream.committed:
+                continue
+            start = max(start, stream.committed)
+            closed = final or len(pcm) - end >= gap
+            if not closed and end - start < max_len:
+                break  # still speaking; wait for more audio
+            if not closed:
+                end = start + max_len
+            seg_start = max(stream.committed, start - pad)
+            seg_end = min(len(pcm), end + pad)
+            stream.segments.append(self._executor.submit(self._transcribe_pcm, pcm[seg_start:seg_end], stream.language))
+            stream.committed = seg_end
+            logger.info("STT stream %s: segment %.2f-%.2fs queued", stream.id, seg_start / SAMPLE_RATE, seg_end / SAMPLE_RATE)
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_stream_manager() -> SttStreamManager:
+    global _manager
+    if _manager is not None:
+        return _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = SttStreamManager(Config.STT_STREAM_WORKERS)
+        return _manager
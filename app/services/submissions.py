@@ -0,0 +1,71 @@
+"""
+Shared submit pipeline for reading, listening, writing and speaking.
+Attempt, feedback and level progress are written in one transaction (one commit per submit). A level is
+complete once the user's distinct-item counter (app/services/progress.py) reaches the level's item count;
+completion is an INSERT ... ON CONFLICT upsert on uq_user_category_level, so concurrent submits for the
+same level cannot both try to insert the progress row.
+"""
+from datetime import datetime
+
+from app import db
+from app.models import Level, UserLevelProgress
+from app.services.feedback import create_feedback
+from app.services.progress import KINDS, dialect_insert, get_level_item_counts, mark_item_completed
+
+
+def record_submission(kind: str, user_id: str, item, attempt, feedback_content: str, scores: dict | None = None) -> bool:
+    """Add `attempt` and its feedback, bump the user's distinct-item counter, mark the level complete once
+    every item in it has an attempt, and commit once. Returns whether the level is complete.
+    Rolls back and re-raises on error.
+    """
+    spec = KINDS[kind]
+    try:
+        db.session.add(attempt)
+        db.session.flush()  # assigns attempt.id for the feedback row
+        create_feedback(
+            user_id=user_id,
+            type=kind,
+            content=feedback_content,
+            scores=scores,
+            commit=False,
+            **{spec.feedback_fk: attempt.id},
+        )
+        completed_items = mark_item_completed(kind, user_id, item.level_id, item.id)
+        total = get_level_item_counts().get(kind, item.level_id)
+        completed = bool(total) and completed_items >= total
+        if completed:
+            category_id = db.session.query(Level.category_id).filter(Level.id == item.level_id).scalar()
+            upsert_level_completion(user_id, category_id, item.level_id)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return completed
+
+
+def upsert_level_completion(user_id: str, category_id: str, level_id: str, completed_at: datetime | None = None):
+    """Insert or update the user's progress row as completed, without a read-then-write race.
+    Uses ON CONFLICT (PostgreSQL, SQLite) or ON DUPLICATE KEY (MySQL); other dialects fall back to
+    select-then-write. Does not commit.
+    """
+    completed_at = completed_at or datetime.utcnow()
+    values = {"user_id": user_id, "category_id": category_id, "level_id": level_id,
+              "completed": True, "completed_at": completed_at}
+    stmt, dialect = dialect_insert(UserLevelProgress)
+    if stmt is not None:
+        stmt = stmt.values(**values)
+        if dialect in ("mysql", "mariadb"):
+            stmt = stmt.on_duplicate_key_update(completed=True, completed_at=stmt.inserted.completed_at)
+        else:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["user_id", "category_id", "level_id"],
+                set_={"completed": True, "completed_at": stmt.excluded.completed_at},
+            )
+        db.session.execute(stmt)
+    else:
+        existing = UserLevelProgress.query.filter_by(user_id=user_id, category_id=category_id, level_id=level_id).first()
+        if existing:
+            existing.completed = True
+            existing.completed_at = completed_at
+        else:
+            db.session.add(UserLevelProgress(**values))
@@ -0,0 +1,148 @@
+"""
+Content-addressed TTS audio cache.
+Key = sha256 of the MiniMax request that shapes the audio (model, text, language, voice_setting, audio_setting),
+so an identical prompt maps to the same /uploads/tts/<k[:2]>/<k[2:4]>/<key>.mp3 and never reaches MiniMax twice.
+A SQLite index (TTS_CACHE_INDEX, kept outside UPLOAD_FOLDER so it is never served) maps keys to files.
+The cache does not evict: the media janitor (app/services/media.py) owns the UPLOAD_FOLDER quota, so audio
+that lesson rows still reference (tts_audio_url) is never deleted. Entries whose file the janitor removed
+are dropped on the next lookup and rendered again.
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from config import Config
+from app.services.media import shard_relpath
+
+logger = logging.getLogger(__name__)
+
+
+def tts_cache_key(payload: dict, language: str | None = None) -> str:
+    material = {
+        "model": payload.get("model"),
+        "text": payload.get("text"),
+        "language": language,
+        "voice_setting": payload.get("voice_setting"),
+        "audio_setting": payload.get("audio_setting"),
+    }
+    return hashlib.sha256(json.dumps(material, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class TtsCache:
+    def __init__(self, upload_folder: str, index_path: str, url_prefix: str = "/uploads/"):
+        self.upload_folder = os.path.abspath(upload_folder)
+        self.url_prefix = url_prefix
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(index_path, check_same_thread=False, timeout=5)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tts_entries ("
+            " key TEXT PRIMARY KEY, relpath TEXT NOT NULL, size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.commit()
+        self.counters = {"hits": 0, "misses": 0, "stores": 0}
+
+    def relpath_for(self, key: str) -> str:
+        return shard_relpath("tts", key + ".mp3", key)
+
+    def url_for(self, relpath: str) -> str:
+        return self.url_prefix + relpath
+
+    def path_for(self, relpath: str) -> str:
+        return os.path.join(self.upload_folder, *relpath.split("/"))
+
+    def lookup(self, key: str, count: bool = True) -> str | None:
+        """URL of the cached audio, or None. Entries whose file has gone missing are dropped.
+        count=False leaves the hit/miss counters alone (a re-check of a lookup that was already counted).
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT relpath FROM tts_entries WHERE key = ?", (key,)).fetchone()
+            if row is not None and not os.path.isfile(self.path_for(row[0])):
+                self._conn.execute("DELETE FROM tts_entries WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+            if row is None:
+                if count:
+                    self.counters["misses"] += 1
+                return None
+            if count:
+                self.counters["hits"] += 1
+            return self.url_for(row[0])
+
+    def store(self, key: str, audio_bytes: bytes) -> str:
+        """Write the audio under its content key and return its URL. Raises OSError if the write fails."""
+        relpath = self.relpath_for(key)
+        path = self.path_for(relpath)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+        with open(tmp_path, "wb") as f:
+            f.write(audio_bytes)
+        os.replace(tmp_path, path)  # atomic: readers never see a half-written file
+        self.register(key, relpath, len(audio_bytes))
+        return self.url_for(relpath)
+
+    def tee(self, key: str, chunks):
+        """Yield `chunks` unchanged while writing them to the cache file for `key`.
+        The entry is registered only once the stream has been fully written; a stream that fails or is
+        abandoned by the client leaves nothing behind.
+        """
+        relpath = self.relpath_for(key)
+        path = self.path_for(relpath)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+        size, complete = 0, False
+        f = open(tmp_path, "wb")
+        try:
+            for chunk in chunks:
+                f.write(chunk)
+                size += len(chunk)
+                yield chunk
+            complete = True
+        finally:
+            f.close()
+            if complete and size:
+                os.replace(tmp_path, path)
+                self.register(key, relpath, size)
+            else:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+
+    def register(self, key: str, relpath: str, size: int):
+        """Record a file that is already in place under UPLOAD_FOLDER."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tts_entries (key, relpath, size, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, relpath, size, now, now),
+            )
+            self._conn.commit()
+            self.counters["stores"] += 1
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM tts_entries").fetchone()[0]
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM tts_entries").fetchone()
+            return {**self.counters, "entries": entries, "bytes": total}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_tts_cache() -> TtsCache:
+    global _cache
+    if _cache is not None:
+        return _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TtsCache(Config.UPLOAD_FOLDER, Config.TTS_CACHE_INDEX)
+        return _cache
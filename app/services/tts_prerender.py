@@ -0,0 +1,98 @@
+"""
+Bulk TTS pre-rendering for lesson content (CLI: prerender_tts.py).
+Audio URLs are content-addressed (tts_cache_key), so an item is done when its tts_audio_url points at the
+file for its current text's key and that file exists; editing the text changes the key and the item is
+rendered again. Rendering runs in a bounded thread pool; only the calling thread touches the session,
+committing every `commit_every` results so an interrupted run resumes where it stopped.
+"""
+import logging
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from app import db
+from app.models import ReadingQuestion, ReadingText, SpeakingExercise, WritingTopic
+from app.services.media import relpath_from_url
+from app.services.minimax import get_minimax_client
+from app.services.tts_cache import get_tts_cache, tts_cache_key
+from app.services.tts_stt import _tts_payload, text_to_speech
+
+logger = logging.getLogger(__name__)
+
+# target name -> (model, text column); rendered with the default voice and no language, like the lesson page
+TARGETS = {
+    "reading_text": (ReadingText, "body"),
+    "reading_question": (ReadingQuestion, "question"),
+    "speaking_exercise": (SpeakingExercise, "prompt"),
+    "writing_topic": (WritingTopic, "prompt"),
+}
+
+
+def audio_key(text: str) -> str:
+    return tts_cache_key(_tts_payload(text, None))
+
+
+def _is_rendered(url: str | None, key: str) -> bool:
+    # Compare by key, not the full URL: entries cached before sharding still live at tts/<key>.mp3
+    relpath = relpath_from_url(url)
+    if not relpath or relpath.rsplit("/", 1)[-1] != key + ".mp3":
+        return False
+    return os.path.isfile(get_tts_cache().path_for(relpath))
+
+
+def pending_items(targets=None) -> list[tuple[str, str, str]]:
+    """(target, id, text) for every item whose stored audio is missing or stale."""
+    items = []
+    for name in targets or TARGETS:
+        model, field = TARGETS[name]
+        rows = db.session.query(model.id, getattr(model, field), model.tts_audio_url).order_by(model.id)
+        for row_id, text, url in rows:
+            text = (text or "").strip()
+            if text and not _is_rendered(url, audio_key(text)):
+                items.append((name, row_id, text))
+    return items
+
+
+def prerender(targets=None, workers: int = 4, commit_every: int = 20, limit: int | None = None) -> dict:
+    """Render missing audio with at most `workers` MiniMax calls in flight. Stops early (leaving the rest
+    for the next run) if the MiniMax circuit opens. Returns {"pending", "rendered", "failed", "stopped"}.
+    """
+    items = pending_items(targets)
+    if limit is not None:
+        items = items[:limit]
+    stats = {"pending": len(items), "rendered": 0, "failed": 0, "stopped": False}
+    todo = iter(items)
+    uncommitted = 0
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tts-prerender") as pool:
+        in_flight = {}
+
+        def fill():
+            while len(in_flight) < workers and not stats["stopped"]:
+                item = next(todo, None)
+                if item is None:
+                    return
+                in_flight[pool.submit(text_to_speech, item[2])] = item
+
+        fill()
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, row_id, _text = in_flight.pop(future)
+                result = future.result()
+                if not result.get("success"):
+                    stats["failed"] += 1
+                    logger.warning("TTS prerender: %s %s failed: %s", name, row_id, result.get("error"))
+                    continue
+                model, _field = TARGETS[name]
+                model.query.filter_by(id=row_id).update({"tts_audio_url": result["audioUrl"]})
+                stats["rendered"] += 1
+                uncommitted += 1
+                if uncommitted >= commit_every:
+                    db.session.commit()
+                    uncommitted = 0
+            if get_minimax_client().breaker.state == "open":
+                if not stats["stopped"]:
+                    logger.warning("TTS prerender: MiniMax circuit open; stopping after in-flight items")
+                stats["stopped"] = True
+            fill()
+    db.session.commit()
+    return stats
@@ -1,17 +1,35 @@
 """
 Text-to-Speech and Speech-to-Text (inclusive mode).
-- TTS: MiniMax when MINIMAX_API_KEY is set.
+- TTS: MiniMax when MINIMAX_API_KEY is set (whole clip as a cached URL, or streamed chunk by chunk).
 - STT: Local Whisper (openai-whisper) for voice answers in lessons; no API key required.
 """
 import base64
+import hashlib
+import itertools
 import logging
+import math
 import os
+import queue
 import re
-import tempfile
 import threading
-import uuid
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from urllib.parse import unquote, urlsplit
 import requests
+from flask import has_request_context, request
+from requests.adapters import HTTPAdapter
+from werkzeug.security import safe_join
 from config import Config
+from app.services.audio import SAMPLE_RATE, AudioDecodeError, decode_pcm, duration_seconds, trim_silence
+from app.services.stt_cache import get_transcript_cache, transcript_key
+from app.services.tts_cache import get_tts_cache, tts_cache_key
+from app.services.minimax import MiniMaxError, get_minimax_client
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-flight stays per process
+    fcntl = None
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +38,10 @@ _whisper_model = None
 _whisper_lock = threading.Lock()
 
 
+def _whisper_model_name() -> str:
+    return getattr(Config, "WHISPER_MODEL", None) or os.environ.get("WHISPER_MODEL") or "base"
+
+
 def _get_whisper_model():
     """Load and cache the local Whisper model. Thread-safe."""
     global _whisper_model
@@ -29,19 +51,231 @@ def _get_whisper_model():
         if _whisper_model is not None:
             return _whisper_model
         import whisper
-        model_name = getattr(Config, "WHISPER_MODEL", None) or os.environ.get("WHISPER_MODEL") or "base"
+        model_name = _whisper_model_name()
         logger.info("Loading local Whisper model: %s", model_name)
         _whisper_model = whisper.load_model(model_name)
         return _whisper_model
 
 
-MINIMAX_T2A_URL = "https://api.minimax.io/v1/t2a_v2"
+# --- Micro-batching: concurrent short clips share one batched encoder/decoder pass ---
+# Whisper's context is 30 s; longer clips go through model.transcribe (sliding window) instead.
+WHISPER_MAX_BATCH_SAMPLES = 30 * SAMPLE_RATE
+# model.transcribe's defaults: the batched greedy pass applies the same silence and fallback checks
+NO_SPEECH_THRESHOLD = 0.6
+LOGPROB_THRESHOLD = -1.0
+COMPRESSION_RATIO_THRESHOLD = 2.4
 
 
-def text_to_speech(text: str, language: str | None = None, voice: str | None = None) -> dict:
-    if not Config.MINIMAX_API_KEY:
-        return {"success": False, "error": "TTS not configured. Set MINIMAX_API_KEY."}
-    payload = {
+def _whisper_transcribe(pcm, language: str | None) -> str:
+    result = _get_whisper_model().transcribe(pcm, language=language, fp16=False)
+    return (result.get("text") or "").strip()
+
+
+def _batch_result_text(result, retranscribe) -> str:
+    """Text of one greedy DecodingResult, judged as model.transcribe judges its first try: silence gives "",
+    a repetitive or low-confidence result is redone by `retranscribe()` (transcribe's temperature fallback).
+    """
+    if result.no_speech_prob > NO_SPEECH_THRESHOLD:
+        return "" if result.avg_logprob < LOGPROB_THRESHOLD else (result.text or "").strip()
+    if result.compression_ratio > COMPRESSION_RATIO_THRESHOLD or result.avg_logprob < LOGPROB_THRESHOLD:
+        return retranscribe()
+    return (result.text or "").strip()
+
+
+def _whisper_decode_batch(pcms: list, language: str | None) -> list[str]:
+    """One batched pass: pad/trim each clip to 30 s, stack log-mels, decode greedily. Clips whose result
+    fails transcribe's checks are re-run through model.transcribe, so batching does not change quality.
+    """
+    import torch
+    import whisper
+    model = _get_whisper_model()
+    n_mels = getattr(model.dims, "n_mels", 80)
+    mel = torch.stack([
+        whisper.log_mel_spectrogram(whisper.pad_or_trim(p), n_mels) for p in pcms
+    ]).to(model.device)
+    options = whisper.DecodingOptions(language=language, fp16=False, without_timestamps=True)
+    return [
+        _batch_result_text(r, lambda p=p: _whisper_transcribe(p, language))
+        for p, r in zip(pcms, whisper.decode(model, mel, options))
+    ]
+
+
+class _BatchItem:
+    __slots__ = ("pcm", "language", "future")
+
+    def __init__(self, pcm, language):
+        self.pcm = pcm
+        self.language = language
+        self.future = Future()
+
+
+class WhisperBatcher:
+    """Collects clips arriving within `window_s` (up to `max_batch`) and runs them as one batch.
+    Callers block on their own future; one scheduler thread owns all batched inference.
+    """
+
+    def __init__(self, window_s: float, max_batch: int, decode_batch=_whisper_decode_batch):
+        self.window_s = window_s
+        self.max_batch = max_batch
+        self._decode_batch = decode_batch
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self.counters = {"batches": 0, "items": 0, "maxBatchSeen": 0}
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self.counters)
+
+    def transcribe(self, pcm, language: str | None) -> str:
+        self._ensure_started()
+        item = _BatchItem(pcm, language)
+        self._queue.put(item)
+        return item.future.result()
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="whisper-batcher", daemon=True)
+                self._thread.start()
+
+    def _collect(self) -> list:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window_s
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            with self._lock:
+                self.counters["batches"] += 1
+                self.counters["items"] += len(batch)
+                self.counters["maxBatchSeen"] = max(self.counters["maxBatchSeen"], len(batch))
+            # DecodingOptions carries one language, so split the batch per language
+            by_language = {}
+            for item in batch:
+                by_language.setdefault(item.language, []).append(item)
+            for language, items in by_language.items():
+                try:
+                    texts = self._decode_batch([i.pcm for i in items], language)
+                    for item, text in zip(items, texts):
+                        item.future.set_result(text)
+                except Exception as e:
+                    logger.exception("STT batch failed: size=%s", len(items))
+                    for item in items:
+                        if not item.future.done():
+                            item.future.set_exception(e)
+
+
+_batcher = None
+_batcher_lock = threading.Lock()
+
+
+def _get_batcher() -> WhisperBatcher | None:
+    """Process-wide batcher, or None when batching is disabled (STT_BATCH_MAX_SIZE <= 1)."""
+    global _batcher
+    if Config.STT_BATCH_MAX_SIZE <= 1:
+        return None
+    if _batcher is not None:
+        return _batcher
+    with _batcher_lock:
+        if _batcher is None:
+            _batcher = WhisperBatcher(Config.STT_BATCH_WINDOW_MS / 1000.0, Config.STT_BATCH_MAX_SIZE)
+        return _batcher
+
+
+def _transcribe_pcm(pcm, language: str | None) -> str:
+    batcher = _get_batcher()
+    if batcher is not None and len(pcm) <= WHISPER_MAX_BATCH_SAMPLES:
+        return batcher.transcribe(pcm, language)
+    return _whisper_transcribe(pcm, language)
+
+
+class SingleFlight:
+    """Coalesce identical concurrent calls: the first caller for a key runs the work and the duplicates
+    that arrive while it is in flight wait for and share its result. Results are not kept afterwards
+    (the TTS and transcript caches do that).
+    With `lock_dir`, the leader also holds an flock on <lock_dir>/<key>.lock, so leaders in other worker
+    processes queue behind it and find the result in the shared cache when they get the lock.
+    """
+
+    def __init__(self, lock_dir: str | None = None):
+        self.lock_dir = lock_dir if lock_dir and fcntl is not None else None
+        self._calls = {}  # key -> Future
+        self._lock = threading.Lock()
+        self.counters = {"leaders": 0, "coalesced": 0}
+        if self.lock_dir:
+            os.makedirs(self.lock_dir, exist_ok=True)
+
+    def do(self, key: str, fn):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+                self.counters["leaders"] += 1
+            else:
+                self.counters["coalesced"] += 1
+        if not leader:
+            return future.result()
+        try:
+            with self._process_lock(key):
+                result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    @contextmanager
+    def _process_lock(self, key: str):
+        if not self.lock_dir:
+            yield
+            return
+        name = hashlib.sha256(key.encode("utf-8")).hexdigest() + ".lock"
+        with open(os.path.join(self.lock_dir, name), "a+b") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self.counters, "inFlight": len(self._calls), "crossProcess": bool(self.lock_dir)}
+
+
+_single_flight = None
+_single_flight_lock = threading.Lock()
+
+
+def get_single_flight() -> SingleFlight:
+    global _single_flight
+    if _single_flight is not None:
+        return _single_flight
+    with _single_flight_lock:
+        if _single_flight is None:
+            _single_flight = SingleFlight(Config.SINGLE_FLIGHT_LOCK_DIR)
+        return _single_flight
+
+
+def _tts_payload(text: str, voice: str | None) -> dict:
+    return {
         "model": "speech-2.8-hd",
         "text": text,
         "stream": False,
@@ -59,18 +293,31 @@ def text_to_speech(text: str, language: str | None = None, voice: str | None = N
         },
         "output_format": "hex",
     }
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": "Bearer " + Config.MINIMAX_API_KEY,
-    }
+
+
+def text_to_speech(text: str, language: str | None = None, voice: str | None = None) -> dict:
+    if not Config.MINIMAX_API_KEY:
+        return {"success": False, "error": "TTS not configured. Set MINIMAX_API_KEY."}
+    payload = _tts_payload(text, voice)
+    cache = get_tts_cache()
+    cache_key = tts_cache_key(payload, language)
+    cached_url = cache.lookup(cache_key)
+    if cached_url:
+        logger.info("TTS cache hit: key=%s", cache_key[:12])
+        return {"success": True, "audioUrl": cached_url}
+    return get_single_flight().do("tts:" + cache_key, lambda: _render_tts(payload, cache, cache_key))
+
+
+def _render_tts(payload: dict, cache, cache_key: str) -> dict:
+    # Re-check: another thread or worker process may have rendered it while we waited for the flight lock.
+    # The caller's lookup already counted this request.
+    cached_url = cache.lookup(cache_key, count=False)
+    if cached_url:
+        return {"success": True, "audioUrl": cached_url}
     try:
-        resp = requests.post(MINIMAX_T2A_URL, json=payload, headers=headers, timeout=30)
-        resp.raise_for_status()
-        data = resp.json()
-    except requests.RequestException as e:
+        data = get_minimax_client().t2a(payload)
+    except MiniMaxError as e:
         return {"success": False, "error": str(e)}
-    except ValueError as e:
-        return {"success": False, "error": "Invalid MiniMax response: " + str(e)}
 
     audio_hex = (data.get("data") or {}).get("audio")
     if not audio_hex:
@@ -81,21 +328,52 @@ def text_to_speech(text: str, language: str | None = None, voice: str | None = N
     except (TypeError, ValueError) as e:
         return {"success": False, "error": "Invalid audio hex: " + str(e)}
 
-    upload_dir = os.path.abspath(Config.UPLOAD_FOLDER)
-    tts_dir = os.path.join(upload_dir, "tts")
-    os.makedirs(tts_dir, exist_ok=True)
-    filename = uuid.uuid4().hex + ".mp3"
-    filepath = os.path.join(tts_dir, filename)
     try:
-        with open(filepath, "wb") as f:
-            f.write(audio_bytes)
+        audio_url = cache.store(cache_key, audio_bytes)
     except OSError as e:
         return {"success": False, "error": "Failed to save audio: " + str(e)}
-
-    audio_url = "/uploads/tts/" + filename
     return {"success": True, "audioUrl": audio_url}
 
 
+def text_to_speech_stream(text: str, language: str | None = None, voice: str | None = None) -> dict:
+    """Streaming variant of text_to_speech for low time-to-first-audio.
+    On a cache hit returns {"success", "audioUrl", "path"}; otherwise {"success", "audioUrl", "chunks"}, where
+    `chunks` yields MP3 bytes as MiniMax produces them and writes them to the cache file at `audioUrl`
+    on the way through. The first chunk is awaited here so provider errors surface before any bytes are sent.
+    """
+    if not Config.MINIMAX_API_KEY:
+        return {"success": False, "error": "TTS not configured. Set MINIMAX_API_KEY."}
+    payload = _tts_payload(text, voice)
+    cache = get_tts_cache()
+    cache_key = tts_cache_key(payload, language)
+    cached_url = cache.lookup(cache_key)
+    if cached_url:
+        logger.info("TTS cache hit: key=%s", cache_key[:12])
+        return {"success": True, "audioUrl": cached_url, "path": cache.path_for(cache.relpath_for(cache_key))}
+
+    started = time.perf_counter()
+    chunks = get_minimax_client().t2a_stream(payload)
+    try:
+        first = next(chunks)
+    except MiniMaxError as e:
+        return {"success": False, "error": str(e)}
+    logger.info("TTS stream: first audio after %.0fms (key=%s)", (time.perf_counter() - started) * 1000, cache_key[:12])
+    return {
+        "success": True,
+        "audioUrl": cache.url_for(cache.relpath_for(cache_key)),
+        "chunks": cache.tee(cache_key, itertools.chain([first], chunks)),
+    }
+
+UPLOADS_URL_PREFIX = "/uploads/"
+STT_FETCH_CONNECT_TIMEOUT = 5
+STT_FETCH_READ_TIMEOUT = 30
+
+# Shared keep-alive session for remote audio fetches (connection reuse across requests)
+_http = requests.Session()
+_http.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+_http.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
+
 def _infer_audio_suffix_from_url(url: str, content_type: str | None) -> str:
     """Infer file suffix for Whisper from URL path or Content-Type."""
     if content_type:
@@ -121,17 +399,54 @@ def _infer_audio_suffix_from_url(url: str, content_type: str | None) -> str:
     return ".webm"
 
 
-def speech_to_text(audio_url_or_base64: str, language: str | None = None) -> dict:
-    """Transcribe audio to text using local Whisper (openai-whisper).
-    Accepts either a remote audio URL (http/https) or base64 audio (optionally with data URL prefix).
-    Default language is Indonesian (id). No API key required.
-    """
-    raw = (audio_url_or_base64 or "").strip()
-    if not raw:
-        logger.warning("STT: no audio data provided")
-        return {"success": False, "error": "No audio data provided."}
+class PayloadTooLargeError(Exception):
+    """Audio upload or download exceeded its byte limit."""
+
+
+def read_limited(chunks, max_bytes: int) -> bytes:
+    """Join byte chunks into one buffer, stopping with PayloadTooLargeError past max_bytes."""
+    buf = bytearray()
+    for chunk in chunks:
+        if not chunk:
+            continue
+        buf.extend(chunk)
+        if len(buf) > max_bytes:
+            raise PayloadTooLargeError(f"Audio exceeds {max_bytes} bytes")
+    return bytes(buf)
 
-    is_url = raw.startswith("http://") or raw.startswith("https://")
+
+def _local_upload_path(url: str) -> str | None:
+    """Filesystem path for URLs that point back at our own /uploads/ route, else None."""
+    parts = urlsplit(url)
+    if not parts.path.startswith(UPLOADS_URL_PREFIX):
+        return None
+    if parts.scheme:
+        local_hosts = {h.strip().lower() for h in Config.LOCAL_UPLOAD_HOSTS.split(",") if h.strip()}
+        if has_request_context():
+            local_hosts.add(request.host.lower())
+        if parts.netloc.lower() not in local_hosts and (parts.hostname or "").lower() not in local_hosts:
+            return None
+    path = safe_join(os.path.abspath(Config.UPLOAD_FOLDER), unquote(parts.path[len(UPLOADS_URL_PREFIX):]))
+    if path is None or not os.path.isfile(path):
+        return None
+    return path
+
+
+def _fetch_remote_audio(url: str) -> tuple[bytes, str]:
+    """Streamed download over the shared keep-alive session, cut off past STT_MAX_FETCH_BYTES."""
+    with _http.get(url, stream=True, timeout=(STT_FETCH_CONNECT_TIMEOUT, STT_FETCH_READ_TIMEOUT)) as resp:
+        resp.raise_for_status()
+        declared = int(resp.headers.get("Content-Length") or 0)
+        if declared > Config.STT_MAX_FETCH_BYTES:
+            raise PayloadTooLargeError(f"Audio exceeds {Config.STT_MAX_FETCH_BYTES} bytes")
+        content_type = (resp.headers.get("Content-Type") or "").split(";")[0].strip()
+        audio_bytes = read_limited(resp.iter_content(chunk_size=64 * 1024), Config.STT_MAX_FETCH_BYTES)
+    return audio_bytes, content_type
+
+
+def _load_audio_bytes(raw: str) -> tuple[bytes | None, str, str | None]:
+    """Resolve a URL (absolute, or relative /uploads/...) or base64/data-URL string to (audio_bytes, suffix, error)."""
+    is_url = raw.startswith("http://") or raw.startswith("https://") or raw.startswith(UPLOADS_URL_PREFIX)
     logger.info(
         "STT input: len=%s is_url=%s preview=%s",
         len(raw),
@@ -143,16 +458,32 @@ def speech_to_text(audio_url_or_base64: str, language: str | None = None) -> dic
     suffix = ".webm"
 
     if is_url:
-        try:
-            resp = requests.get(raw, timeout=30)
-            resp.raise_for_status()
-            audio_bytes = resp.content
-            content_type = (resp.headers.get("Content-Type") or "").split(";")[0].strip()
-            suffix = _infer_audio_suffix_from_url(raw, content_type)
-            logger.info("STT URL fetched: bytes=%s content_type=%s suffix=%s", len(audio_bytes), content_type, suffix)
-        except requests.RequestException as e:
-            logger.exception("STT URL fetch failed: %s", raw)
-            return {"success": False, "error": "Failed to fetch audio URL: " + str(e)}
+        t0 = time.perf_counter()
+        local_path = _local_upload_path(raw)
+        if local_path:
+            try:
+                if os.path.getsize(local_path) > Config.STT_MAX_FETCH_BYTES:
+                    return None, suffix, f"Audio exceeds {Config.STT_MAX_FETCH_BYTES} bytes"
+                with open(local_path, "rb") as f:
+                    audio_bytes = f.read()
+            except OSError as e:
+                return None, suffix, "Failed to read uploaded audio: " + str(e)
+            suffix = _infer_audio_suffix_from_url(local_path, None)
+            logger.info("STT URL read locally: bytes=%s suffix=%s fetch_ms=%.1f",
+                        len(audio_bytes), suffix, (time.perf_counter() - t0) * 1000)
+        elif not raw.startswith(UPLOADS_URL_PREFIX):
+            try:
+                audio_bytes, content_type = _fetch_remote_audio(raw)
+                suffix = _infer_audio_suffix_from_url(raw, content_type)
+                logger.info("STT URL fetched: bytes=%s content_type=%s suffix=%s fetch_ms=%.1f",
+                            len(audio_bytes), content_type, suffix, (time.perf_counter() - t0) * 1000)
+            except PayloadTooLargeError as e:
+                return None, suffix, str(e)
+            except requests.RequestException as e:
+                logger.exception("STT URL fetch failed: %s", raw)
+                return None, suffix, "Failed to fetch audio URL: " + str(e)
+        else:
+            return None, suffix, "Uploaded audio not found."
     else:
         # Strip data URL prefix if present (e.g. data:audio/webm;base64,)
         b64 = re.sub(r"^data:audio/[^;]+;base64,", "", raw)
@@ -162,35 +493,151 @@ def speech_to_text(audio_url_or_base64: str, language: str | None = None) -> dic
             audio_bytes = base64.b64decode(b64, validate=False)
         except Exception as e:
             logger.exception("STT base64 decode failed")
-            return {"success": False, "error": "Invalid base64: " + str(e)}
+            return None, suffix, "Invalid base64: " + str(e)
         if raw.strip().lower().startswith("data:audio/"):
             match = re.search(r"^data:audio/([^;]+);", raw.strip().lower())
             if match:
                 ext = match.group(1).split("/")[-1].strip()
                 if ext in ("webm", "mp3", "wav", "ogg", "m4a", "mp4"):
                     suffix = "." + ext
+    return audio_bytes, suffix, None
+
 
+def transcribe_audio_bytes(audio_bytes: bytes, suffix: str = ".webm", language: str | None = None) -> dict:
+    """Decode container bytes to PCM in memory and run local Whisper on the array."""
     if not audio_bytes:
         logger.warning("STT: empty audio after decode/fetch")
         return {"success": False, "error": "Empty audio data."}
+    lang = (language or "id").strip() or None
+    cache = get_transcript_cache()
+    cache_key = transcript_key(audio_bytes, lang, _whisper_model_name())
+    cached = cache.get(cache_key)
+    if cached is not None:
+        logger.info("STT cache hit: key=%s text_len=%s", cache_key[:12], len(cached))
+        return {"success": True, "text": cached}
+    return get_single_flight().do(
+        "stt:" + cache_key, lambda: _transcribe_uncached(audio_bytes, suffix, lang, cache, cache_key)
+    )
+
+
+def _transcribe_uncached(audio_bytes: bytes, suffix: str, lang: str | None, cache, cache_key: str) -> dict:
+    # Re-check: a coalesced leader in another worker process may have just stored it (STT_CACHE_DB).
+    # The caller's get already counted this request.
+    cached = cache.get(cache_key, count=False)
+    if cached is not None:
+        return {"success": True, "text": cached}
     logger.info("STT audio_bytes=%s suffix=%s sending to local Whisper", len(audio_bytes), suffix)
 
     try:
-        with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
-            tmp.write(audio_bytes)
-            tmp_path = tmp.name
-        try:
-            model = _get_whisper_model()
-            lang = (language or "id").strip() or None
-            result = model.transcribe(tmp_path, language=lang, fp16=False)
-            text = (result.get("text") or "").strip()
-            logger.info("STT success: text_len=%s", len(text))
-            return {"success": True, "text": text}
-        finally:
-            try:
-                os.unlink(tmp_path)
-            except OSError:
-                pass
+        t0 = time.perf_counter()
+        pcm = decode_pcm(audio_bytes, suffix=suffix)
+        original_secs = duration_seconds(pcm)
+        if Config.STT_VAD_ENABLED:
+            pcm = trim_silence(pcm)
+        t1 = time.perf_counter()
+        text = _transcribe_pcm(pcm, lang)
+        logger.info(
+            "STT success: text_len=%s audio_secs=%.2f trimmed_secs=%.2f decode_ms=%.1f transcribe_ms=%.1f",
+            len(text), original_secs, duration_seconds(pcm), (t1 - t0) * 1000, (time.perf_counter() - t1) * 1000,
+        )
+        cache.put(cache_key, text)
+        return {"success": True, "text": text}
+    except AudioDecodeError as e:
+        logger.warning("STT audio decode failed: %s", e)
+        return {"success": False, "error": "Could not decode audio: " + str(e)}
     except Exception as e:
         logger.exception("STT Whisper failed")
         return {"success": False, "error": str(e)}
+
+
+def speech_to_text(audio_url_or_base64: str, language: str | None = None) -> dict:
+    """Transcribe audio to text using local Whisper (openai-whisper).
+    Accepts either a remote audio URL (http/https) or base64 audio (optionally with data URL prefix).
+    Default language is Indonesian (id). No API key required.
+    """
+    raw = (audio_url_or_base64 or "").strip()
+    if not raw:
+        logger.warning("STT: no audio data provided")
+        return {"success": False, "error": "No audio data provided."}
+
+    audio_bytes, suffix, error = _load_audio_bytes(raw)
+    if error:
+        return {"success": False, "error": error}
+    return transcribe_audio_bytes(audio_bytes, suffix=suffix, language=language)
+
+
+def score_options(pcm, options: list[str], language: str | None = None) -> list[float]:
+    """Teacher-forced log-likelihood of each option as the transcript of `pcm` (first 30 s), per token
+    (see length_normalized). The audio is encoded once; all options are scored in one batched decoder pass.
+    """
+    import torch
+    import whisper
+    from whisper.tokenizer import get_tokenizer
+
+    model = _get_whisper_model()
+    tokenizer_kwargs = {"language": language or "en", "task": "transcribe"}
+    if hasattr(model, "num_languages"):
+        tokenizer_kwargs["num_languages"] = model.num_languages
+    tokenizer = get_tokenizer(model.is_multilingual, **tokenizer_kwargs)
+    prefix = list(tokenizer.sot_sequence_including_notimestamps)
+    seqs = [prefix + tokenizer.encode(" " + opt.strip()) + [tokenizer.eot] for opt in options]
+
+    tokens = torch.full((len(seqs), max(map(len, seqs))), tokenizer.eot, dtype=torch.long)
+    for i, seq in enumerate(seqs):
+        tokens[i, : len(seq)] = torch.tensor(seq)
+    n_mels = getattr(model.dims, "n_mels", 80)
+    mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(pcm), n_mels).unsqueeze(0).to(model.device)
+    with torch.no_grad():
+        audio_features = model.embed_audio(mel)
+        logits = model.logits(tokens.to(model.device), audio_features.expand(len(seqs), -1, -1))
+        logprobs = torch.log_softmax(logits.float(), dim=-1)
+    scores = []
+    for i, seq in enumerate(seqs):
+        # position j predicts token j + 1; score the option tokens and the closing EOT
+        target = torch.tensor(seq[len(prefix):], device=logprobs.device)
+        picked = logprobs[i, len(prefix) - 1: len(seq) - 1].gather(-1, target.unsqueeze(-1))
+        scores.append(length_normalized(picked.squeeze(-1).tolist()))
+    return scores
+
+
+def length_normalized(token_logprobs: list[float]) -> float:
+    """Mean log-probability of an option's tokens. Summed log-likelihood drops with every extra token,
+    so it would favour a one-word distractor over the full correct sentence.
+    """
+    return sum(token_logprobs) / len(token_logprobs) if token_logprobs else float("-inf")
+
+
+def match_options(audio_bytes: bytes, suffix: str, options: list[str], language: str | None = None) -> dict:
+    """Pick the option the learner said. Much cheaper than open decoding for short multiple-choice answers."""
+    options = [str(o) for o in options if str(o).strip()]
+    if not options:
+        return {"success": False, "error": "options required"}
+    if not audio_bytes:
+        return {"success": False, "error": "Empty audio data."}
+    lang = (language or "id").strip() or None
+    try:
+        pcm = decode_pcm(audio_bytes, suffix=suffix)
+        if Config.STT_VAD_ENABLED:
+            pcm = trim_silence(pcm)
+        scores = score_options(pcm, options, lang)
+    except AudioDecodeError as e:
+        return {"success": False, "error": "Could not decode audio: " + str(e)}
+    except Exception as e:
+        logger.exception("STT option match failed")
+        return {"success": False, "error": str(e)}
+    return {"success": True, **best_option(options, scores)}
+
+
+def best_option(options: list[str], scores: list[float]) -> dict:
+    """Posterior over the options (uniform prior) from their per-token log-likelihoods."""
+    top = max(scores)
+    weights = [math.exp(s - top) for s in scores]
+    total = sum(weights)
+    best = scores.index(top)
+    logger.info("STT option match: best=%r confidence=%.3f", options[best], weights[best] / total)
+    return {
+        "option": options[best],
+        "index": best,
+        "confidence": round(weights[best] / total, 4),
+        "scores": [round(s, 3) for s in scores],
+    }
@@ -0,0 +1,45 @@
+"""
+SQLite connection profile, applied by create_app() through the engine's connect event (SQLITE_PROFILE).
+- journal_mode=WAL: readers no longer block the writer (or each other), and a commit appends to the WAL
+  instead of rewriting pages through a rollback journal.
+- synchronous=NORMAL: in WAL mode, fsync at checkpoints rather than on every commit; a power cut can lose
+  the last commits but never corrupts the database.
+- busy_timeout: a writer waits for the lock instead of failing at once with "database is locked".
+- foreign_keys=ON: SQLite ignores FOREIGN KEY clauses (and their ON DELETE CASCADE / SET NULL) without it.
+- cache_size / mmap_size: a larger page cache per connection, and reads served from a memory map.
+No-op for other databases.
+"""
+from sqlalchemy import event
+
+from config import Config
+
+
+def sqlite_pragmas() -> list[str]:
+    return [
+        "journal_mode=WAL",
+        "synchronous=NORMAL",
+        f"busy_timeout={Config.SQLITE_BUSY_TIMEOUT_MS}",
+        "foreign_keys=ON",
+        f"cache_size=-{Config.SQLITE_CACHE_SIZE_KB}",  # negative = KiB rather than pages
+        f"mmap_size={Config.SQLITE_MMAP_SIZE}",
+    ]
+
+
+def apply_sqlite_profile(engine, pragmas=None) -> bool:
+    """Run `pragmas` (default sqlite_pragmas()) on every new connection of a SQLite engine.
+    Call before the engine's first connection. Returns whether the engine is SQLite.
+    """
+    if engine.dialect.name != "sqlite":
+        return False
+    pragmas = sqlite_pragmas() if pragmas is None else list(pragmas)
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(f"PRAGMA {pragma}")
+        finally:
+            cursor.close()
+
+    return True
@@ -0,0 +1,98 @@
+"""
+Benchmark: an attempt table (reading_attempts shape: id, user_id, reading_text_id, answers, completed_at plus
+the (user_id, reading_text_id) and (reading_text_id) indexes) filled with the old random 25-character text
+ids vs 16-byte UUIDv7 blobs (app.models.generate_id / CompactId). Reports insert throughput (overall and for
+the last tenth, once the indexes are large) and the on-disk size of the table and each index (dbstat).
+Uses throwaway SQLite files with the app's SQLite profile.
+Run: python benchmarks/bench_compact_ids.py [--rows 1000000] [--batch 10000] [--users 20000] [--texts 2000]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.models import generate_id  # noqa: E402
+from app.sqlite_profile import sqlite_pragmas  # noqa: E402
+
+SCHEMA = """
+CREATE TABLE reading_attempts (
+    id {t} NOT NULL PRIMARY KEY,
+    user_id {t} NOT NULL,
+    reading_text_id {t} NOT NULL,
+    answers TEXT NOT NULL,
+    completed_at DATETIME
+);
+CREATE INDEX ix_reading_attempts_user_text ON reading_attempts (user_id, reading_text_id);
+CREATE INDEX ix_reading_attempts_text ON reading_attempts (reading_text_id);
+"""
+
+FORMATS = {
+    # name: (column type, new id)
+    "text25": ("VARCHAR(36)", lambda: str(uuid.uuid4())[:25]),
+    "uuid7": ("BLOB", lambda: uuid.UUID(generate_id()).bytes),
+}
+
+
+def run(path: str, fmt: str, rows: int, batch: int, users: int, texts: int) -> dict:
+    column_type, new_id = FORMATS[fmt]
+    conn = sqlite3.connect(path)
+    for pragma in sqlite_pragmas():
+        conn.execute(f"PRAGMA {pragma}")
+    conn.executescript(SCHEMA.format(t=column_type))
+    user_ids = [new_id() for _ in range(users)]
+    text_ids = [new_id() for _ in range(texts)]
+    rng = random.Random(0)
+    timings = []
+    for start in range(0, rows, batch):
+        n = min(batch, rows - start)
+        values = [(new_id(), rng.choice(user_ids), rng.choice(text_ids), '{"q1": "a"}') for _ in range(n)]
+        t0 = time.perf_counter()
+        with conn:
+            conn.executemany(
+                "INSERT INTO reading_attempts (id, user_id, reading_text_id, answers, completed_at) "
+                "VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)", values,
+            )
+        timings.append((n, time.perf_counter() - t0))
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    sizes = dict(conn.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name"))
+    conn.close()
+    tail = timings[-max(1, len(timings) // 10):]
+    return {
+        "rows/s": rows / sum(s for _, s in timings),
+        "tail rows/s": sum(n for n, _ in tail) / sum(s for _, s in tail),
+        "sizes": sizes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=10_000)
+    parser.add_argument("--users", type=int, default=20_000)
+    parser.add_argument("--texts", type=int, default=2_000)
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in FORMATS:
+            results[fmt] = run(os.path.join(tmp, f"{fmt}.db"), fmt, args.rows, args.batch, args.users, args.texts)
+
+    mib = 1024 * 1024
+    print(f"{args.rows} rows, batches of {args.batch}")
+    print(f"{'ids':<8}{'rows/s':>12}{'tail rows/s':>14}")
+    for fmt, r in results.items():
+        print(f"{fmt:<8}{r['rows/s']:>12.0f}{r['tail rows/s']:>14.0f}")
+    print(f"\n{'MiB':<36}" + "".join(f"{fmt:>10}" for fmt in results))
+    names = sorted({n for r in results.values() for n in r["sizes"]})
+    for name in names:
+        print(f"{name:<36}" + "".join(f"{r['sizes'].get(name, 0) / mib:>10.1f}" for r in results.values()))
+
+
+if __name__ == "__main__":
+    main()
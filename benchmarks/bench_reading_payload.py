@@ -0,0 +1,98 @@
+"""
+Benchmark: GET /api/reading/levels/<id>/texts for a synthetic level (default 50 texts x 5 questions)
+— the old per-text question query + json.loads path vs the eager-loaded endpoint with options cached per question id.
+Uses a throwaway SQLite database; reports latency and SQL statements per request. The old path is timed
+without the HTTP round trip through the test client, so its numbers are a lower bound.
+Run: python benchmarks/bench_reading_payload.py [--texts 50] [--questions 5] [--iterations 50]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app import create_app, db  # noqa: E402
+from app.models import Category, Level, ReadingQuestion, ReadingText  # noqa: E402
+
+
+def seed(texts: int, questions: int) -> str:
+    category = Category(slug="reading", name="Reading", order=1)
+    level = Level(category=category, order=1, name="Level 1")
+    db.session.add_all([category, level])
+    for t in range(texts):
+        text = ReadingText(level=level, title=f"Text {t}", body="Lorem ipsum " * 40, order=t)
+        text.questions = [
+            ReadingQuestion(question=f"Question {t}.{q}?", options=json.dumps([f"opt {i}" for i in range(4)]),
+                            correct_answer="opt 0", order=q)
+            for q in range(questions)
+        ]
+        db.session.add(text)
+    db.session.commit()
+    return level.id
+
+
+def old_payload(level_id):
+    """The pre-change endpoint body: one question query per text, options decoded every time."""
+    out = []
+    for t in ReadingText.query.filter_by(level_id=level_id).order_by(ReadingText.order).all():
+        qs = ReadingQuestion.query.filter_by(reading_text_id=t.id).order_by(ReadingQuestion.order).all()
+        out.append({
+            "id": t.id, "title": t.title, "body": t.body, "order": t.order,
+            "questions": [{"id": q.id, "question": q.question, "options": json.loads(q.options) if q.options else None,
+                           "order": q.order} for q in qs],
+        })
+    return json.dumps(out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--texts", type=int, default=50)
+    parser.add_argument("--questions", type=int, default=5)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        class BenchConfig:
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            JWT_SECRET_KEY = "bench-jwt-secret-0123456789abcdef"
+            UPLOAD_FOLDER = os.path.join(tmp, "uploads")
+
+        app = create_app(BenchConfig)
+        client = app.test_client()
+        with app.app_context():
+            level_id = seed(args.texts, args.questions)
+            headers = {"Authorization": "Bearer " + create_access_token(identity="bench-user")}
+            engine = db.engine
+        statements = []
+        event.listen(engine, "before_cursor_execute", lambda *a: statements.append(1))
+
+        def old():
+            with app.test_request_context():
+                old_payload(level_id)
+                db.session.remove()
+
+        def new():
+            assert client.get(f"/api/reading/levels/{level_id}/texts", headers=headers).status_code == 200
+
+        print(f"level: {args.texts} texts x {args.questions} questions, {args.iterations} iterations")
+        print(f"{'path':<10}{'p50 ms':>10}{'mean ms':>10}{'queries':>10}")
+        for label, fn in (("old", old), ("new", new)):
+            fn()  # warm up
+            samples = []
+            for _ in range(args.iterations):
+                statements.clear()
+                t0 = time.perf_counter()
+                fn()
+                samples.append((time.perf_counter() - t0) * 1000)
+            print(f"{label:<10}{statistics.median(samples):>10.2f}{statistics.mean(samples):>10.2f}{len(statements):>10}")
+
+
+if __name__ == "__main__":
+    main()
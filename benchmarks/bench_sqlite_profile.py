@@ -0,0 +1,104 @@
+"""
+Benchmark: concurrent POST /api/writing/topics/<id>/submit against a file SQLite database, with the engine's
+default settings vs the SQLite profile (app/sqlite_profile.py: WAL, synchronous=NORMAL, busy_timeout, ...).
+Each worker is a separate process with its own app and connection pool, like gunicorn workers, submitting
+for its own user. Reports throughput, latency and failed submits ("database is locked" surfaces as a 500).
+Run: python benchmarks/bench_sqlite_profile.py [--workers 8] [--submits 100] [--topics 20]
+"""
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+
+from app import create_app, db  # noqa: E402
+from app.models import Category, Level, User, WritingTopic  # noqa: E402
+
+
+def bench_config(db_path: str, profile: bool):
+    class BenchConfig:
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{db_path}"
+        JWT_SECRET_KEY = "bench-jwt-secret-0123456789abcdef"
+        UPLOAD_FOLDER = os.path.join(os.path.dirname(db_path), "uploads")
+        SQLITE_PROFILE = profile
+
+    return BenchConfig
+
+
+def seed(workers: int, topics: int) -> tuple[list[str], list[str]]:
+    category = Category(slug="writing", name="Writing", order=1)
+    level = Level(category=category, order=1, name="Level 1")
+    items = [WritingTopic(level=level, title=f"Topic {i}", prompt="Describe your day.", order=i) for i in range(topics)]
+    users = [User(email=f"bench{w}@example.com", password_hash="x") for w in range(workers)]
+    db.session.add_all([category, level, *items, *users])
+    db.session.commit()
+    return [u.id for u in users], [t.id for t in items]
+
+
+def worker(args):
+    db_path, profile, user_id, topic_ids, submits, start_at = args
+    app = create_app(bench_config(db_path, profile))
+    client = app.test_client()
+    with app.app_context():
+        headers = {"Authorization": "Bearer " + create_access_token(identity=user_id)}
+    time.sleep(max(0.0, start_at - time.time()))  # start all workers together
+    latencies, errors = [], 0
+    for i in range(submits):
+        topic_id = topic_ids[i % len(topic_ids)]
+        t0 = time.perf_counter()
+        res = client.post(f"/api/writing/topics/{topic_id}/submit", json={"content": "Today I " * 50}, headers=headers)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        if res.status_code != 201:
+            errors += 1
+    return latencies, errors
+
+
+def run(profile: bool, workers: int, submits: int, topics: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        app = create_app(bench_config(db_path, profile))
+        with app.app_context():
+            user_ids, topic_ids = seed(workers, topics)
+            journal = db.session.execute(db.text("PRAGMA journal_mode")).scalar()
+            db.session.remove()
+            db.engine.dispose()
+        start_at = time.time() + 1.0
+        jobs = [(db_path, profile, user_ids[w], topic_ids, submits, start_at) for w in range(workers)]
+        with multiprocessing.get_context("fork").Pool(workers) as pool:
+            t0 = time.time()
+            results = pool.map(worker, jobs)
+            elapsed = time.time() - max(t0, start_at)
+    latencies = [ms for lat, _ in results for ms in lat]
+    errors = sum(e for _, e in results)
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "journal": journal,
+        "throughput": (len(latencies) - errors) / elapsed,
+        "p50": quantiles[49],
+        "p95": quantiles[94],
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--submits", type=int, default=100, help="submits per worker")
+    parser.add_argument("--topics", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{args.workers} worker processes x {args.submits} submits")
+    print(f"{'profile':<10}{'journal':>10}{'submits/s':>12}{'p50 ms':>10}{'p95 ms':>10}{'errors':>8}")
+    for label, profile in (("default", False), ("sqlite", True)):
+        r = run(profile, args.workers, args.submits, args.topics)
+        print(f"{label:<10}{r['journal']:>10}{r['throughput']:>12.1f}{r['p50']:>10.2f}{r['p95']:>10.2f}{r['errors']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark: Whisper micro-batching — throughput vs p95 latency for different batch windows.
+Fires Poisson arrivals of short clips from client threads at WhisperBatcher and reports per window.
+Run: python benchmarks/bench_stt_batching.py [--rate 8] [--requests 64] [--windows 0,10,25,50,100]
+     python benchmarks/bench_stt_batching.py --fake   # no Whisper needed: simulated batched cost
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.services.audio import SAMPLE_RATE  # noqa: E402
+from app.services.tts_stt import WhisperBatcher, _whisper_decode_batch  # noqa: E402
+
+
+def fake_decode_batch(fixed_ms: float, per_item_ms: float):
+    """Batched cost model: one fixed encoder/decoder setup plus a smaller per-clip increment."""
+    lock = threading.Lock()  # one inference at a time, like the real scheduler thread
+
+    def decode(pcms, language):
+        with lock:
+            time.sleep((fixed_ms + per_item_ms * len(pcms)) / 1000.0)
+        return ["" for _ in pcms]
+    return decode
+
+
+def run(window_ms: float, max_batch: int, decode_batch, rate: float, n_requests: int, clip_secs: float):
+    batcher = WhisperBatcher(window_ms / 1000.0, max_batch, decode_batch=decode_batch)
+    rng = random.Random(42)
+    pcm = (np.random.default_rng(0).standard_normal(int(clip_secs * SAMPLE_RATE)) * 0.05).astype(np.float32)
+    latencies = []
+    lock = threading.Lock()
+
+    def client():
+        t0 = time.perf_counter()
+        batcher.transcribe(pcm, "id")
+        with lock:
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+    threads = []
+    start = time.perf_counter()
+    for _ in range(n_requests):
+        t = threading.Thread(target=client)
+        t.start()
+        threads.append(t)
+        time.sleep(rng.expovariate(rate))
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+    avg_batch = batcher.counters["items"] / max(1, batcher.counters["batches"])
+    return n_requests / elapsed, statistics.median(latencies), p95, avg_batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rate", type=float, default=8.0, help="arrivals per second")
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--windows", default="0,10,25,50,100", help="batch windows in ms")
+    parser.add_argument("--max-batch", type=int, default=8)
+    parser.add_argument("--clip-secs", type=float, default=4.0)
+    parser.add_argument("--fake", action="store_true", help="simulate the model instead of loading Whisper")
+    parser.add_argument("--fake-fixed-ms", type=float, default=120.0)
+    parser.add_argument("--fake-per-item-ms", type=float, default=30.0)
+    args = parser.parse_args()
+
+    decode = fake_decode_batch(args.fake_fixed_ms, args.fake_per_item_ms) if args.fake else _whisper_decode_batch
+    if not args.fake:
+        _whisper_decode_batch([np.zeros(SAMPLE_RATE, dtype=np.float32)], "id")  # load model + warm up
+
+    print(f"{'window ms':>10}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'avg batch':>11}")
+    for window in [float(w) for w in args.windows.split(",")]:
+        max_batch = 1 if window == 0 else args.max_batch
+        rps, p50, p95, avg_batch = run(window, max_batch, decode, args.rate, args.requests, args.clip_secs)
+        print(f"{window:>10.0f}{rps:>10.2f}{p50:>10.1f}{p95:>10.1f}{avg_batch:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
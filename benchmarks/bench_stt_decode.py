@@ -0,0 +1,79 @@
+"""
+Benchmark: in-memory (ffmpeg stdin → PCM) vs temp-file audio decode for STT.
+Generates 5 s webm/mp3/wav fixtures with ffmpeg unless --fixtures points at a folder of real clips.
+Run: python benchmarks/bench_stt_decode.py [--iterations 30] [--fixtures DIR]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.services.audio import decode_pcm_file, decode_pcm_stream  # noqa: E402
+
+FIXTURE_FORMATS = {
+    ".webm": ["-c:a", "libopus"],
+    ".mp3": ["-c:a", "libmp3lame"],
+    ".wav": ["-c:a", "pcm_s16le"],
+}
+
+
+def make_fixtures(folder: str, seconds: int = 5) -> list[str]:
+    paths = []
+    for suffix, codec in FIXTURE_FORMATS.items():
+        path = os.path.join(folder, "speech_like" + suffix)
+        subprocess.run(
+            ["ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
+             "-f", "lavfi", "-i", f"sine=frequency=220:duration={seconds}",
+             "-f", "lavfi", "-i", f"anoisesrc=amplitude=0.05:duration={seconds}",
+             "-filter_complex", "amix=inputs=2", "-ar", "48000", "-ac", "1", *codec, path],
+            check=True,
+        )
+        paths.append(path)
+    return paths
+
+
+def time_ms(fn, iterations: int) -> list[float]:
+    samples = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--fixtures", help="folder with .webm/.mp3/.wav clips (default: generate)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.fixtures:
+            paths = [os.path.join(args.fixtures, f) for f in sorted(os.listdir(args.fixtures))
+                     if os.path.splitext(f)[1] in FIXTURE_FORMATS]
+        else:
+            paths = make_fixtures(tmp)
+
+        print(f"{'fixture':<24}{'path':<8}{'p50 ms':>10}{'p95 ms':>10}{'mean ms':>10}")
+        for path in paths:
+            suffix = os.path.splitext(path)[1]
+            with open(path, "rb") as f:
+                data = f.read()
+            for label, fn in (
+                ("stream", lambda: decode_pcm_stream(data)),
+                ("file", lambda: decode_pcm_file(data, suffix=suffix)),
+            ):
+                fn()  # warm-up
+                samples = sorted(time_ms(fn, args.iterations))
+                p95 = samples[max(0, int(len(samples) * 0.95) - 1)]
+                print(f"{os.path.basename(path):<24}{label:<8}{statistics.median(samples):>10.2f}"
+                      f"{p95:>10.2f}{statistics.mean(samples):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark: TTS provider tail latency — bare requests.post (old path) vs the pooled MiniMax client
+(connect/read timeouts, jittered retries, circuit breaker) against the local fake MiniMax with injected slowness.
+Run: python benchmarks/bench_tts_client.py [--calls 200] [--concurrency 16] [--slow-ratio 0.2] [--slow-delay 5]
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, _root)
+sys.path.insert(0, os.path.join(_root, "tests"))
+
+from app.services.minimax import CircuitBreaker, MiniMaxClient, MiniMaxError  # noqa: E402
+from fake_minimax import FakeMiniMax  # noqa: E402
+
+
+def percentile(sorted_samples, pct):
+    return sorted_samples[max(0, int(len(sorted_samples) * pct) - 1)]
+
+
+def run(label, call, calls, concurrency):
+    latencies, errors = [], 0
+    lock = threading.Lock()
+
+    def one(i):
+        nonlocal errors
+        t0 = time.perf_counter()
+        ok = call({"text": f"prompt {i}"})
+        with lock:
+            latencies.append((time.perf_counter() - t0) * 1000)
+            errors += 0 if ok else 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(calls)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    print(f"{label:<10}{calls / elapsed:>8.1f}{statistics.median(latencies):>10.0f}{percentile(latencies, 0.95):>10.0f}"
+          f"{percentile(latencies, 0.99):>10.0f}{latencies[-1]:>10.0f}{errors:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--delay", type=float, default=0.05, help="normal provider latency (s)")
+    parser.add_argument("--slow-ratio", type=float, default=0.2)
+    parser.add_argument("--slow-delay", type=float, default=5.0)
+    parser.add_argument("--read-timeout", type=float, default=1.0)
+    args = parser.parse_args()
+
+    with FakeMiniMax(delay=args.delay, slow_ratio=args.slow_ratio, slow_delay=args.slow_delay) as server:
+        def naive(payload):
+            try:
+                resp = requests.post(server.url, json=payload, timeout=30)
+                resp.raise_for_status()
+                return True
+            except requests.RequestException:
+                return False
+
+        client = MiniMaxClient(
+            api_key="bench", url=server.url, connect_timeout=1, read_timeout=args.read_timeout,
+            max_retries=2, backoff_base=0.05,
+            breaker=CircuitBreaker(window=20, failure_ratio=0.5, min_calls=5, cooldown_s=2),
+        )
+
+        def pooled(payload):
+            try:
+                client.t2a(payload)
+                return True
+            except MiniMaxError:
+                return False
+
+        print(f"{'client':<10}{'req/s':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'errors':>8}")
+        run("naive", naive, args.calls, args.concurrency)
+        run("pooled", pooled, args.calls, args.concurrency)
+        print("pooled client counters:", client.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,29 @@ class Config:
     # database URI for SQLAlchemy
     SQLALCHEMY_DATABASE_URI = os.environ.get("DATABASE_URL") or "sqlite:///app.db"
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Connection pool (unset = SQLAlchemy default): pool size, extra connections beyond it, seconds before a
+    # connection is replaced, seconds to wait for one; pre-ping (1 = on) tests connections on checkout
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        key: cast(os.environ[name])
+        for key, name, cast in (
+            ("pool_size", "DB_POOL_SIZE", int),
+            ("max_overflow", "DB_MAX_OVERFLOW", int),
+            ("pool_recycle", "DB_POOL_RECYCLE", int),
+            ("pool_timeout", "DB_POOL_TIMEOUT", float),
+            ("pool_pre_ping", "DB_POOL_PRE_PING", lambda v: v == "1"),
+        )
+        if os.environ.get(name)
+    }
+    # Read replica for read-only GET endpoints (empty = primary only), and how long a client's reads stay
+    # on the primary after it writes, in seconds (0 = never)
+    SQLALCHEMY_REPLICA_URI = os.environ.get("DATABASE_REPLICA_URL") or ""
+    DB_REPLICA_STICKY_SECONDS = float(os.environ.get("DB_REPLICA_STICKY_SECONDS") or 5)
+    # SQLite connection profile (1 = on; ignored for other databases): WAL journal, synchronous=NORMAL,
+    # foreign keys, busy timeout (ms), page cache (KiB) and memory-mapped I/O (bytes) per connection
+    SQLITE_PROFILE = os.environ.get("SQLITE_PROFILE", "1") == "1"
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS") or 5000)
+    SQLITE_CACHE_SIZE_KB = int(os.environ.get("SQLITE_CACHE_SIZE_KB") or 64 * 1024)
+    SQLITE_MMAP_SIZE = int(os.environ.get("SQLITE_MMAP_SIZE") or 256 * 1024 * 1024)
     # secret key to stay logged in
     JWT_SECRET_KEY = os.environ.get("JWT_SECRET") or SECRET_KEY
     JWT_ACCESS_TOKEN_EXPIRES = 7 * 24 * 3600  # 7 days
@@ -22,7 +45,48 @@ class Config:
     OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY") or ""
     # MiniMax API key for TTS (text-to-audio)
     MINIMAX_API_KEY = os.environ.get("MINIMAX_API_KEY") or ""
+    MINIMAX_T2A_URL = os.environ.get("MINIMAX_T2A_URL") or "https://api.minimax.io/v1/t2a_v2"
+    # MiniMax client: timeouts (s), retries, and circuit breaker (open at this failure ratio, for cooldown s)
+    MINIMAX_CONNECT_TIMEOUT = float(os.environ.get("MINIMAX_CONNECT_TIMEOUT") or 3)
+    MINIMAX_READ_TIMEOUT = float(os.environ.get("MINIMAX_READ_TIMEOUT") or 15)
+    MINIMAX_MAX_RETRIES = int(os.environ.get("MINIMAX_MAX_RETRIES") or 2)
+    MINIMAX_BREAKER_FAILURE_RATIO = float(os.environ.get("MINIMAX_BREAKER_FAILURE_RATIO") or 0.5)
+    MINIMAX_BREAKER_COOLDOWN = float(os.environ.get("MINIMAX_BREAKER_COOLDOWN") or 30)
+    # TTS audio cache: SQLite index (outside UPLOAD_FOLDER); its files count toward MEDIA_QUOTA_BYTES
+    TTS_CACHE_INDEX = os.environ.get("TTS_CACHE_INDEX") or "tts_cache.sqlite"
     # Local Whisper model for STT: tiny, base, small, medium, large-v2, large-v3
     WHISPER_MODEL = os.environ.get("WHISPER_MODEL") or "base"
+    # Largest accepted STT upload (multipart / raw body), in bytes
+    STT_MAX_UPLOAD_BYTES = int(os.environ.get("STT_MAX_UPLOAD_BYTES") or 25 * 1024 * 1024)
+    # Largest audio file STT will download from a URL, in bytes
+    STT_MAX_FETCH_BYTES = int(os.environ.get("STT_MAX_FETCH_BYTES") or 25 * 1024 * 1024)
+    # Hosts whose /uploads/... URLs are read straight from UPLOAD_FOLDER instead of over HTTP
+    LOCAL_UPLOAD_HOSTS = os.environ.get("LOCAL_UPLOAD_HOSTS") or "localhost,127.0.0.1"
+    # STT job mode: worker processes (one Whisper model each), max queued jobs, per-job timeout in seconds
+    STT_WORKERS = int(os.environ.get("STT_WORKERS") or 2)
+    STT_QUEUE_MAX = int(os.environ.get("STT_QUEUE_MAX") or 32)
+    STT_JOB_TIMEOUT = float(os.environ.get("STT_JOB_TIMEOUT") or 120)
+    # Trim leading/trailing silence and squeeze long pauses before Whisper (1 = on; off by default)
+    STT_VAD_ENABLED = os.environ.get("STT_VAD_ENABLED", "0") == "1"
+    # STT micro-batching: clips arriving within the window share one Whisper pass (max size <= 1 = off)
+    STT_BATCH_WINDOW_MS = float(os.environ.get("STT_BATCH_WINDOW_MS") or 20)
+    STT_BATCH_MAX_SIZE = int(os.environ.get("STT_BATCH_MAX_SIZE") or 8)
+    # Streaming STT: threads transcribing closed segments while the learner is still recording
+    STT_STREAM_WORKERS = int(os.environ.get("STT_STREAM_WORKERS") or 4)
+    # Directory for cross-process single-flight lock files (empty = coalesce within each process only)
+    SINGLE_FLIGHT_LOCK_DIR = os.environ.get("SINGLE_FLIGHT_LOCK_DIR") or ""
+    # STT transcript cache: in-process LRU size (0 = off) and optional SQLite file for a persistent tier
+    STT_CACHE_SIZE = int(os.environ.get("STT_CACHE_SIZE") or 512)
+    STT_CACHE_DB = os.environ.get("STT_CACHE_DB") or ""
+    # Category/level tree cache lifetime in seconds (commits in this process invalidate it immediately)
+    CATALOG_CACHE_TTL = float(os.environ.get("CATALOG_CACHE_TTL") or 60)
+    # Keyset-paginated listings (feedback, reels, batches): default and maximum items per page (?limit=)
+    PAGE_SIZE = int(os.environ.get("PAGE_SIZE") or 50)
+    MAX_PAGE_SIZE = int(os.environ.get("MAX_PAGE_SIZE") or 200)
     # folder for uploaded files
     UPLOAD_FOLDER = os.environ.get("UPLOAD_DIR") or "uploads"
+    # Media janitor: byte quota for UPLOAD_FOLDER (0 = no limit), access index (outside UPLOAD_FOLDER),
+    # and background sweep interval in seconds (0 = only via media_janitor.py)
+    MEDIA_QUOTA_BYTES = int(os.environ.get("MEDIA_QUOTA_BYTES") or 10 * 1024 * 1024 * 1024)
+    MEDIA_INDEX = os.environ.get("MEDIA_INDEX") or "media_index.sqlite"
+    MEDIA_JANITOR_INTERVAL = int(os.environ.get("MEDIA_JANITOR_INTERVAL") or 0)
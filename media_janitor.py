@@ -0,0 +1,36 @@
+"""
+Sweep UPLOAD_FOLDER: remove abandoned partial writes and, above MEDIA_QUOTA_BYTES, evict the least recently
+used files that no database row references.
+Run: python media_janitor.py [--dry-run] [--quota BYTES]   (e.g. hourly from cron, or set MEDIA_JANITOR_INTERVAL)
+"""
+import argparse
+import json
+import logging
+import sys
+
+from app import create_app
+from app.services.media import get_media_janitor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="report what would be deleted")
+    parser.add_argument("--quota", type=int, default=None, help="override MEDIA_QUOTA_BYTES for this run")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    app = create_app()
+    with app.app_context():
+        janitor = get_media_janitor()
+        if args.quota is not None:
+            janitor.quota_bytes = args.quota
+        stats = janitor.run_exclusive(dry_run=args.dry_run)
+    if stats is None:
+        print("another sweep is already running")
+        return 1
+    print(json.dumps(stats, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
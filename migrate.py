@@ -0,0 +1,31 @@
+"""
+Show or apply schema migrations (app/migrations.py). create_app() already applies pending ones on start;
+run this to check a database or upgrade it before rolling out new workers.
+Run: python migrate.py status    (exit 1 if migrations are pending)
+     python migrate.py upgrade
+"""
+import argparse
+import sys
+
+from app import create_app, db
+from app.migrations import MIGRATIONS, applied_versions, migrate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["status", "upgrade"])
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        if args.command == "upgrade":
+            migrate(db.engine, db.metadata)
+        done = applied_versions(db.engine)
+    for m in MIGRATIONS:
+        state = done[m.version].isoformat(timespec="seconds") if m.version in done else "pending"
+        print(f"{m.version:>4}  {m.name:<30} {state}")
+    return 1 if any(m.version not in done for m in MIGRATIONS) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,38 @@
+"""
+Copy a database that still uses the old 25-character text ids into a new database with 16-byte UUIDv7 ids
+(app/migrations.py: copy_with_new_ids). The source is left untouched; afterwards point DATABASE_URL at the
+target. Issued login tokens carry the old user ids, so users sign in again after the switch.
+Run: python migrate_ids.py --target sqlite:///app_v2.db [--source sqlite:///app.db] [--batch-size 1000]
+"""
+import argparse
+import json
+import sys
+
+from sqlalchemy import create_engine
+
+from config import Config
+from app import db
+import app.models  # noqa: F401 - register models on db.metadata
+from app.migrations import copy_with_new_ids, migrate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", default=Config.SQLALCHEMY_DATABASE_URI, help="default: DATABASE_URL")
+    parser.add_argument("--target", required=True, help="new, empty database URL")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    if args.source == args.target:
+        parser.error("--target must be a different database")
+
+    source, target = create_engine(args.source), create_engine(args.target)
+    db.metadata.create_all(target)
+    stats = copy_with_new_ids(source, target, db.metadata, batch_size=args.batch_size,
+                              log=lambda line: print(line, file=sys.stderr))
+    migrate(target, db.metadata)
+    print(json.dumps(stats, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+"""
+Pre-render TTS audio for reading texts and questions, speaking prompts and writing topics, and store
+the URLs on the rows so lesson pages never wait on MiniMax.
+Run: python prerender_tts.py [--only reading_text,reading_question] [--workers 4] [--limit N] [--dry-run]
+Safe to re-run: finished items are skipped and an interrupted run picks up where it stopped.
+"""
+import argparse
+import logging
+import sys
+from collections import Counter
+
+from app import create_app
+from app.services.tts_prerender import TARGETS, pending_items, prerender
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", default="", help="comma-separated targets: " + ", ".join(TARGETS))
+    parser.add_argument("--workers", type=int, default=4, help="concurrent MiniMax calls")
+    parser.add_argument("--limit", type=int, default=None, help="render at most N items this run")
+    parser.add_argument("--dry-run", action="store_true", help="only count what is missing")
+    args = parser.parse_args()
+    targets = [t.strip() for t in args.only.split(",") if t.strip()] or list(TARGETS)
+    unknown = [t for t in targets if t not in TARGETS]
+    if unknown:
+        parser.error("unknown target(s): " + ", ".join(unknown))
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    app = create_app()
+    with app.app_context():
+        if args.dry_run:
+            counts = Counter(name for name, _id, _text in pending_items(targets))
+            for name in targets:
+                print(f"{name:<20}{counts[name]:>8} missing")
+            return 0
+        stats = prerender(targets, workers=max(1, args.workers), limit=args.limit)
+    print(f"pending={stats['pending']} rendered={stats['rendered']} failed={stats['failed']}"
+          + (" (stopped: MiniMax circuit open)" if stats["stopped"] else ""))
+    return 1 if stats["failed"] or stats["stopped"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
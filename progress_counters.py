@@ -0,0 +1,31 @@
+"""
+Check or rebuild the materialized progress tables (user_item_completions, user_level_counters) from the
+attempt tables.
+Run: python progress_counters.py check      (exit 1 if they have drifted)
+     python progress_counters.py backfill   (rebuild to repair drift; safe to re-run)
+Upgrading needs no manual step: migration 5 (app/migrations.py) fills the tables when create_app() starts.
+"""
+import argparse
+import json
+import sys
+
+from app import create_app
+from app.services.progress import rebuild
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["check", "backfill"])
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        report = rebuild(fix=args.command == "backfill")
+    print(json.dumps(report, indent=2))
+    if args.command == "check" and not report["consistent"]:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
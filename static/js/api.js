@@ -29,24 +29,75 @@
     return h;
   }
 
+  function parseResponse(res) {
+    var next = res.json ? res.json() : res.text();
+    return next.then(function (data) {
+      if (!res.ok) {
+        var err = new Error(data.error || data.message || "Request failed");
+        err.status = res.status;
+        err.data = data;
+        throw err;
+      }
+      return data;
+    });
+  }
+
   function request(method, path, body, auth) {
     var url = (API_BASE || "") + path;
     var opts = { method: method, headers: headers(!!auth) };
     if (body && (method === "POST" || method === "PATCH")) opts.body = JSON.stringify(body);
-    return fetch(url, opts).then(function (res) {
-      var next = res.json ? res.json() : res.text();
-      return next.then(function (data) {
-        if (!res.ok) {
-          var err = new Error(data.error || data.message || "Request failed");
-          err.status = res.status;
-          err.data = data;
-          throw err;
-        }
-        return data;
+    return fetch(url, opts).then(parseResponse);
+  }
+
+  /** POST a binary body (Blob / ArrayBuffer) as-is instead of JSON. */
+  function requestBinary(path, body, contentType, auth) {
+    var h = headers(!!auth);
+    h["Content-Type"] = contentType || (body && body.type) || "application/octet-stream";
+    return fetch((API_BASE || "") + path, { method: "POST", headers: h, body: body }).then(parseResponse);
+  }
+
+  function queryString(params) {
+    var parts = [];
+    Object.keys(params || {}).forEach(function (k) {
+      if (params[k] != null && params[k] !== "") parts.push(encodeURIComponent(k) + "=" + encodeURIComponent(params[k]));
+    });
+    return parts.length ? "?" + parts.join("&") : "";
+  }
+
+  /** GET one page of a keyset-paginated listing: resolves to { items, nextCursor } (null on the last page). */
+  function requestPage(path, params, auth) {
+    return fetch((API_BASE || "") + path + queryString(params), { method: "GET", headers: headers(!!auth) }).then(function (res) {
+      var nextCursor = res.headers.get("X-Next-Cursor");
+      return parseResponse(res).then(function (items) {
+        return { items: items, nextCursor: nextCursor || null };
       });
     });
   }
 
+  /**
+   * Page iterator over a paginated listing: next() resolves to { value: items, done }, one request per call;
+   * also usable with `for await (const items of ...)`. params: { limit, type, ... }.
+   */
+  function pageIterator(path, params, auth) {
+    var cursor = null;
+    var finished = false;
+    var it = {
+      next: function () {
+        if (finished) return Promise.resolve({ value: undefined, done: true });
+        var q = Object.assign({}, params || {}, { cursor: cursor });
+        return requestPage(path, q, auth).then(function (page) {
+          cursor = page.nextCursor;
+          finished = !cursor;
+          return { value: page.items, done: false };
+        });
+      },
+    };
+    if (typeof Symbol !== "undefined" && Symbol.asyncIterator) {
+      it[Symbol.asyncIterator] = function () { return it; };
+    }
+    return it;
+  }
+
   var api = {
     getToken: getToken,
     setToken: setToken,
@@ -72,18 +123,136 @@
     getCategories: function () {
       return request("GET", "/api/categories", null, true);
     },
-    getReels: function () {
-      return request("GET", "/api/reels");
+    /** Reading texts of a level with their questions; texts and questions carry pre-rendered `audioUrl`. */
+    getLevelTexts: function (levelId) {
+      return request("GET", "/api/reading/levels/" + encodeURIComponent(levelId) + "/texts", null, true);
     },
-    getReelBatches: function () {
-      return request("GET", "/api/reels/batches");
+    /** One page of the reel feed; params: { limit, cursor }. Use iterReels to scroll through all of it. */
+    getReels: function (params) {
+      return request("GET", "/api/reels" + queryString(params));
+    },
+    getReelBatches: function (params) {
+      return request("GET", "/api/reels/batches" + queryString(params));
+    },
+    iterReels: function (params) {
+      return pageIterator("/api/reels", params, false);
+    },
+    iterReelBatches: function (params) {
+      return pageIterator("/api/reels/batches", params, false);
+    },
+    /** Feedback pages, newest first; params: { type, limit }. */
+    iterFeedback: function (params) {
+      return pageIterator("/api/feedback", params, true);
     },
     tts: function (payload) {
       return request("POST", "/api/tts-stt/tts", payload, true);
     },
+    /**
+     * Streaming TTS: starts playback as soon as the first audio chunk arrives (MediaSource), so long texts
+     * do not wait for the whole clip. Falls back to playing the full blob where MediaSource/audio/mpeg is
+     * unavailable. Resolves to the playing Audio element.
+     */
+    playTts: function (payload) {
+      var h = { "Content-Type": "application/json" };
+      var t = getToken();
+      if (t) h["Authorization"] = "Bearer " + t;
+      return fetch((API_BASE || "") + "/api/tts-stt/tts?stream=1", {
+        method: "POST",
+        headers: h,
+        body: JSON.stringify(payload),
+      }).then(function (res) {
+        if (!res.ok) return parseResponse(res);
+        var audio = new Audio();
+        var canStream = res.body && typeof MediaSource !== "undefined" && MediaSource.isTypeSupported("audio/mpeg");
+        if (!canStream) {
+          return res.blob().then(function (blob) {
+            audio.src = URL.createObjectURL(blob);
+            audio.play();
+            return audio;
+          });
+        }
+        var source = new MediaSource();
+        audio.src = URL.createObjectURL(source);
+        source.addEventListener("sourceopen", function () {
+          var buffer = source.addSourceBuffer("audio/mpeg");
+          var reader = res.body.getReader();
+          var pending = [];
+          var ended = false;
+          function pump() {
+            if (buffer.updating) return;
+            if (pending.length) {
+              buffer.appendBuffer(pending.shift());
+            } else if (ended && source.readyState === "open") {
+              source.endOfStream();
+            }
+          }
+          buffer.addEventListener("updateend", pump);
+          (function read() {
+            reader.read().then(function (r) {
+              if (r.done) {
+                ended = true;
+              } else {
+                pending.push(r.value);
+                read();
+              }
+              pump();
+            });
+          })();
+        });
+        audio.play();
+        return audio;
+      });
+    },
+    /**
+     * payload: { audioUrlOrBase64, language } (JSON) or { audio: Blob, language } to upload raw bytes
+     * (no base64 inflation).
+     */
     stt: function (payload) {
+      if (payload && typeof Blob !== "undefined" && payload.audio instanceof Blob) {
+        var q = payload.language ? "?language=" + encodeURIComponent(payload.language) : "";
+        return requestBinary("/api/tts-stt/stt" + q, payload.audio, null, true);
+      }
       return request("POST", "/api/tts-stt/stt", payload, true);
     },
+    /**
+     * Pick which option the learner said. payload: { audio: Blob | audioUrlOrBase64, options | questionId, language }.
+     * Resolves to { option, index, confidence, scores }.
+     */
+    sttMatch: function (payload) {
+      if (payload && typeof Blob !== "undefined" && payload.audio instanceof Blob) {
+        var form = new FormData();
+        form.append("audio", payload.audio, "answer.webm");
+        if (payload.options) form.append("options", JSON.stringify(payload.options));
+        if (payload.questionId) form.append("questionId", payload.questionId);
+        if (payload.language) form.append("language", payload.language);
+        var h = {};
+        var t = getToken();
+        if (t) h["Authorization"] = "Bearer " + t;
+        return fetch((API_BASE || "") + "/api/tts-stt/stt/match", { method: "POST", headers: h, body: form }).then(parseResponse);
+      }
+      return request("POST", "/api/tts-stt/stt/match", payload, true);
+    },
+    /** Streaming STT: open a stream, post recorder chunks as they arrive, then finish for the full text. */
+    sttStreamStart: function (language) {
+      return request("POST", "/api/tts-stt/stt/stream", { language: language }, true);
+    },
+    sttStreamChunk: function (streamId, blob) {
+      return requestBinary("/api/tts-stt/stt/stream/" + encodeURIComponent(streamId), blob, null, true);
+    },
+    /** options (optional): candidate answers; the response then includes match: { option, confidence }. */
+    sttStreamFinish: function (streamId, options) {
+      var body = options && options.length ? { options: options } : {};
+      return request("POST", "/api/tts-stt/stt/stream/" + encodeURIComponent(streamId) + "/finish", body, true);
+    },
+    /** Job mode: returns { jobId, status, statusUrl } right away; poll with getSttJob. */
+    sttJob: function (payload) {
+      return request("POST", "/api/tts-stt/stt?mode=job", payload, true);
+    },
+    /** Job status; waitSeconds > 0 long-polls until the transcript is ready. */
+    getSttJob: function (jobId, waitSeconds) {
+      var q = waitSeconds ? "?wait=" + encodeURIComponent(waitSeconds) : "";
+      return request("GET", "/api/tts-stt/stt/jobs/" + encodeURIComponent(jobId) + q, null, true);
+    },
   };
 
   global.LinglongAPI = api;
@@ -130,6 +130,29 @@
     }
   }
 
+  // Pre-rendered audio (prerender_tts.py) for prompts whose text matches a reading text or question of
+  // this level: the speaker then plays the stored file instead of calling /tts.
+  function loadPromptAudio() {
+    var main = document.querySelector(".lesson-main");
+    var levelId = main && main.getAttribute("data-reading-level");
+    var api = typeof LinglongAPI !== "undefined" ? LinglongAPI : null;
+    if (!levelId || !api || !api.getToken || !api.getToken()) return;
+    api.getLevelTexts(levelId).then(function (texts) {
+      var urls = {};
+      (texts || []).forEach(function (t) {
+        if (t.audioUrl) urls[normalizeForMatch(t.body)] = t.audioUrl;
+        (t.questions || []).forEach(function (q) {
+          if (q.audioUrl) urls[normalizeForMatch(q.question)] = q.audioUrl;
+        });
+      });
+      main.querySelectorAll(".lesson-prompt__speaker").forEach(function (speaker) {
+        var textEl = speaker.nextElementSibling;
+        var url = textEl && urls[normalizeForMatch(textEl.textContent)];
+        if (url) speaker.dataset.audioUrl = url;
+      });
+    }).catch(function () {});
+  }
+
   document.querySelector(".lesson-main").addEventListener("click", function (e) {
     var speaker = e.target.closest(".lesson-prompt__speaker");
     if (speaker) {
@@ -138,15 +161,11 @@
       var promptText = textEl ? textEl.textContent.trim() : "";
       if (!promptText) return;
       var api = typeof LinglongAPI !== "undefined" ? LinglongAPI : null;
-      if (api && api.getToken && api.getToken()) {
-        api.tts({ text: promptText }).then(function (data) {
-          if (data && data.audioUrl) {
-            var audio = new Audio(data.audioUrl);
-            audio.play();
-          } else {
-            speakPromptText(speaker);
-          }
-        }).catch(function () {
+      if (speaker.dataset.audioUrl) {
+        // pre-rendered by prerender_tts.py
+        new Audio(speaker.dataset.audioUrl).play();
+      } else if (api && api.getToken && api.getToken()) {
+        api.playTts({ text: promptText }).catch(function () {
           speakPromptText(speaker);
         });
       } else {
@@ -155,11 +174,37 @@
     }
   });
 
-  var recordingState = { active: false, stream: null, recorder: null, chunks: [], stepNum: null };
+  var recordingState = { active: false, stream: null, recorder: null, chunks: [], stepNum: null, stt: null };
+  var STT_STREAM_FLUSH_MS = 1000; // how often recorded chunks are uploaded while still recording
   var STT_LANGUAGE = "id"; // Indonesian (used when sending recorded audio to speech-to-text)
   function normalizeForMatch(s) {
     return (s || "").trim().toLowerCase().replace(/\s+/g, " ");
   }
+  var STT_MATCH_MIN_CONFIDENCE = 0.5; // below this, fall back to fuzzy-matching the transcript
+  function getStepOptionValues(stepNum) {
+    var stepEl = document.querySelector(".lesson-step[data-step=\"" + stepNum + "\"]");
+    if (!stepEl) return [];
+    var values = [];
+    stepEl.querySelectorAll(".lesson-option").forEach(function (opt) {
+      var val = (opt.getAttribute("data-value") || "").trim();
+      if (val) values.push(val);
+    });
+    return values;
+  }
+  function selectOptionByValue(stepNum, value) {
+    var stepEl = document.querySelector(".lesson-step[data-step=\"" + stepNum + "\"]");
+    if (!stepEl) return false;
+    var options = stepEl.querySelectorAll(".lesson-option");
+    for (var i = 0; i < options.length; i++) {
+      if ((options[i].getAttribute("data-value") || "").trim() === value) {
+        options.forEach(function (b) { b.classList.remove("is-selected"); });
+        options[i].classList.add("is-selected");
+        selectedByStep[stepNum] = value;
+        return true;
+      }
+    }
+    return false;
+  }
   function selectOptionByTranscript(stepNum, transcript) {
     var stepEl = document.querySelector(".lesson-step[data-step=\"" + stepNum + "\"]");
     if (!stepEl) return;
@@ -178,6 +223,33 @@
       }
     }
   }
+  // Streaming STT: chunks are uploaded while recording so Whisper works on closed phrases early
+  function startSttStream(api) {
+    var stt = { streamId: null, pending: [], chain: null, failed: false, timer: null, api: api };
+    stt.chain = api.sttStreamStart(STT_LANGUAGE).then(function (data) {
+      stt.streamId = data && data.streamId;
+      if (!stt.streamId) stt.failed = true;
+    }).catch(function () {
+      stt.failed = true;
+    });
+    stt.timer = setInterval(function () { flushSttStream(stt); }, STT_STREAM_FLUSH_MS);
+    return stt;
+  }
+  function flushSttStream(stt) {
+    if (!recordingState.active && stt.timer) {
+      clearInterval(stt.timer);
+      stt.timer = null;
+    }
+    if (stt.failed || !stt.pending.length) return;
+    var blob = new Blob(stt.pending, { type: "audio/webm" });
+    stt.pending = [];
+    stt.chain = stt.chain.then(function () {
+      if (stt.failed || !stt.streamId) return;
+      return stt.api.sttStreamChunk(stt.streamId, blob).catch(function () {
+        stt.failed = true;
+      });
+    });
+  }
   function setVerbalLabel(mic, text) {
     var verbal = mic && mic.closest(".lesson-verbal");
     var label = verbal && verbal.querySelector(".lesson-verbal__label");
@@ -186,6 +258,7 @@
   function setMicAriaLabel(mic, label) {
     if (mic) mic.setAttribute("aria-label", label);
   }
+
   document.querySelector(".lesson-main").addEventListener("click", function (e) {
     var mic = e.target.closest(".lesson-verbal__btn");
     if (!mic) return;
@@ -226,23 +299,46 @@
         }
         var blob = new Blob(recordingState.chunks, { type: "audio/webm" });
         recordingState.chunks = [];
-        var reader = new FileReader();
-        reader.onload = function () {
-          var dataUrl = reader.result;
-          api.stt({ audioUrlOrBase64: dataUrl, language: STT_LANGUAGE }).then(function (data) {
-            setLabelAfterConverting("Or answer verbally");
-            var transcript = data && data.text != null ? data.text : "";
-            selectOptionByTranscript(stepNum, transcript);
-          }).catch(function (err) {
-            var msg = (err && (err.message || (err.data && err.data.error))) || "Conversion failed — try again";
-            if (msg.length > 45) msg = msg.slice(0, 42) + "...";
-            setLabelAfterConverting(msg);
-            setTimeout(function () {
-              setVerbalLabel(mic, "Or answer verbally");
-            }, 4000);
-          });
-        };
-        reader.readAsDataURL(blob);
+        var optionValues = getStepOptionValues(stepNum);
+        function onTranscript(data) {
+          setLabelAfterConverting("Or answer verbally");
+          var match = data && data.match;
+          if (match && match.confidence >= STT_MATCH_MIN_CONFIDENCE && selectOptionByValue(stepNum, match.option)) return;
+          var transcript = data && data.text != null ? data.text : "";
+          selectOptionByTranscript(stepNum, transcript);
+        }
+        function onSttError(err) {
+          var msg = (err && (err.message || (err.data && err.data.error))) || "Conversion failed — try again";
+          if (msg.length > 45) msg = msg.slice(0, 42) + "...";
+          setLabelAfterConverting(msg);
+          setTimeout(function () {
+            setVerbalLabel(mic, "Or answer verbally");
+          }, 4000);
+        }
+        function transcribeWholeRecording() {
+          if (optionValues.length && api.sttMatch) {
+            // Scoring the known options is cheaper and more accurate than open transcription
+            api.sttMatch({ audio: blob, options: optionValues, language: STT_LANGUAGE }).then(function (match) {
+              onTranscript({ match: match, text: "" });
+            }).catch(function () {
+              api.stt({ audio: blob, language: STT_LANGUAGE }).then(onTranscript).catch(onSttError);
+            });
+            return;
+          }
+          api.stt({ audio: blob, language: STT_LANGUAGE }).then(onTranscript).catch(onSttError);
+        }
+        var stt = recordingState.stt;
+        recordingState.stt = null;
+        if (stt && !stt.failed) {
+          // Most of the audio is already transcribed; upload the tail and collect the full text
+          flushSttStream(stt);
+          stt.chain.then(function () {
+            if (stt.failed || !stt.streamId) throw new Error("stream unavailable");
+            return api.sttStreamFinish(stt.streamId, optionValues);
+          }).then(onTranscript).catch(transcribeWholeRecording);
+        } else {
+          transcribeWholeRecording();
+        }
       };
       try {
         if (typeof recorder.requestData === "function") recorder.requestData();
@@ -280,10 +376,15 @@
         recordingState.chunks = [];
         recordingState.stream = stream;
         recordingState.recorder = recorder;
+        recordingState.stt = null;
         recorder.ondataavailable = function (ev) {
-          if (ev.data && ev.data.size) recordingState.chunks.push(ev.data);
+          if (ev.data && ev.data.size) {
+            recordingState.chunks.push(ev.data);
+            if (recordingState.stt) recordingState.stt.pending.push(ev.data);
+          }
         };
         recorder.start(100);
+        if (api && api.sttStreamStart) recordingState.stt = startSttStream(api);
         recordingState.active = true;
         mic.classList.add("is-recording");
         setMicAriaLabel(mic, "Stop recording");
@@ -325,4 +426,5 @@
   }
 
   goToStep(1);
+  loadPromptAudio();
 })();
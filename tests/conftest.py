@@ -1,6 +1,7 @@
 import os
 import pytest
 
+from config import Config
 from app import create_app, db as _db
 from app.models import (
     Category,
@@ -10,9 +11,24 @@ from app.models import (
 )
 
 
+def _detach_loaded(*objects):
+    """Load column attributes and detach, so fixture objects stay readable after the app context ends."""
+    for obj in objects:
+        if obj in _db.session:
+            _db.session.refresh(obj)
+            _db.session.expunge(obj)
+
+
 @pytest.fixture()
-def app(tmp_path):
+def app(tmp_path, monkeypatch):
     db_path = tmp_path / "test.db"
+    # Services read these from Config and open their SQLite index lazily; keep them out of the checkout
+    from app.services import media, tts_cache
+    monkeypatch.setattr(Config, "MEDIA_INDEX", str(tmp_path / "media_index.sqlite"))
+    monkeypatch.setattr(Config, "TTS_CACHE_INDEX", str(tmp_path / "tts_index.sqlite"))
+    monkeypatch.setattr(media, "_index", None)
+    monkeypatch.setattr(media, "_janitor", None)
+    monkeypatch.setattr(tts_cache, "_cache", None)
 
     class TestConfig:
         TESTING = True
@@ -63,6 +79,7 @@ def seed_categories(app):
                 )
         _db.session.commit()
 
+        _detach_loaded(*cats)
         return {c.slug: c for c in cats}
 
 
@@ -95,5 +112,30 @@ def seed_reading_content(app, seed_categories):
             _db.session.add(q)
             _db.session.commit()
 
-        return {"category": reading_cat, "level": level, "text": text, "question": q}
+        out = {"category": reading_cat, "level": level, "text": text, "question": q}
+        _detach_loaded(*out.values())
+        return out
 
+
+@pytest.fixture()
+def count_queries(app):
+    """Context manager factory: `with count_queries() as statements:` collects the SQL run inside it."""
+    from contextlib import contextmanager
+    from sqlalchemy import event
+
+    @contextmanager
+    def counter():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        with app.app_context():
+            engine = _db.engine
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    return counter
@@ -0,0 +1,119 @@
+"""
+Local fake of the MiniMax t2a_v2 endpoint for tests and benchmarks.
+Returns the request text as hex "audio" (streamed as server-sent events when "stream" is true);
+delays and failures can be injected to simulate provider trouble.
+"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeMiniMax:
+    def __init__(self, delay: float = 0.0, slow_ratio: float = 0.0, slow_delay: float = 0.0,
+                 fail_status: int | None = None, fail_ratio: float = 0.0, seed: int = 0,
+                 chunk_size: int = 4, chunk_delay: float = 0.0):
+        self.delay = delay
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        self.slow_ratio = slow_ratio
+        self.slow_delay = slow_delay
+        self.fail_status = fail_status
+        self.fail_ratio = fail_ratio
+        self.requests = []
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1/t2a_v2"
+
+    def start(self) -> "FakeMiniMax":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _draw(self) -> tuple[bool, bool]:
+        with self._lock:
+            return self._rng.random() < self.fail_ratio, self._rng.random() < self.slow_ratio
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+                with fake._lock:
+                    fake.requests.append(body)
+                fail, slow = fake._draw()
+                time.sleep(fake.delay + (fake.slow_delay if slow else 0))
+                if fail and fake.fail_status:
+                    self._send(fake.fail_status, {"base_resp": {"status_code": fake.fail_status, "status_msg": "injected"}})
+                    return
+                audio = (body.get("text") or "").encode("utf-8")
+                if body.get("stream"):
+                    self._send_stream(audio)
+                    return
+                self._send(200, {"data": {"audio": audio.hex(), "status": 2}, "base_resp": {"status_code": 0}})
+
+            def _send_stream(self, audio):
+                """SSE like MiniMax: one event per chunk_size bytes, then a status-2 event with the whole clip."""
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                chunks = [audio[i:i + fake.chunk_size] for i in range(0, len(audio), fake.chunk_size)]
+                events = [{"data": {"audio": c.hex(), "status": 1}} for c in chunks]
+                events.append({"data": {"audio": audio.hex(), "status": 2}, "base_resp": {"status_code": 0}})
+                try:
+                    for event in events:
+                        raw = b"data: " + json.dumps(event).encode("utf-8") + b"\n\n"
+                        self.wfile.write(f"{len(raw):x}\r\n".encode() + raw + b"\r\n")
+                        self.wfile.flush()
+                        time.sleep(fake.chunk_delay)
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def _send(self, status, obj):
+                raw = json.dumps(obj).encode("utf-8")
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(raw)))
+                    self.end_headers()
+                    self.wfile.write(raw)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # client gave up (read timeout)
+
+        return Handler
+
+
+def minimax_client(url: str, max_retries: int = 0, failure_ratio: float = 0.5, cooldown_s: float = 30):
+    """MiniMaxClient pointed at a fake, with short timeouts and a small breaker window."""
+    from app.services.minimax import CircuitBreaker, MiniMaxClient
+
+    return MiniMaxClient(
+        api_key="test-key", url=url, connect_timeout=1, read_timeout=0.5, max_retries=max_retries,
+        backoff_base=0.01, breaker=CircuitBreaker(window=10, failure_ratio=failure_ratio, min_calls=4, cooldown_s=cooldown_s),
+    )
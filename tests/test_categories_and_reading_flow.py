@@ -1,3 +1,6 @@
+import json
+
+
 def _register_and_get_token(client, email="user@example.com"):
     reg = client.post(
         "/api/auth/register",
@@ -44,3 +47,70 @@ def test_reading_submit_creates_feedback(client, seed_reading_content):
     fb_list = fb.get_json()
     assert len(fb_list) >= 1
 
+
+
+def test_catalog_cache_serves_tree_and_invalidates_on_commit(app, client, seed_categories, count_queries):
+    from app import db
+    from app.models import Category, Level, UserLevelProgress
+
+    token = _register_and_get_token(client, email="catalog@example.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    client.get("/api/categories")  # warm
+    with count_queries() as statements:
+        assert client.get("/api/categories").status_code == 200
+        levels = client.get("/api/categories/reading/levels", headers=headers).get_json()
+    assert len(statements) == 1  # tree from cache; only the progress query hits the DB
+    assert levels[0]["unlocked"] is True and levels[0]["completed"] is False
+
+    with app.app_context():
+        reading = Category.query.filter_by(slug="reading").first()
+        level1 = Level.query.filter_by(category_id=reading.id, order=1).first()
+        db.session.add(Level(category_id=reading.id, order=2, name="Level 2"))
+        user_id = db.session.execute(db.text("SELECT id FROM users WHERE email = 'catalog@example.com'")).scalar()
+        db.session.add(UserLevelProgress(user_id=user_id, category_id=reading.id, level_id=level1.id, completed=True))
+        db.session.commit()
+
+    levels = client.get("/api/categories/reading/levels", headers=headers).get_json()
+    assert [(l["name"], l["unlocked"], l["completed"]) for l in levels] == [
+        ("Level 1", True, True),
+        ("Level 2", True, False),
+    ]
+    cats = {c["slug"]: c for c in client.get("/api/categories", headers=headers).get_json()}
+    assert [l["completed"] for l in cats["reading"]["levels"]] == [True, False]
+
+
+def test_level_texts_loads_questions_in_two_queries(app, client, seed_reading_content, count_queries):
+    from app import db
+    from app.models import Level, ReadingQuestion, ReadingText
+
+    token = _register_and_get_token(client, email="texts@example.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    with app.app_context():
+        level = Level.query.join(Level.category).filter_by(slug="reading").first()
+        level_id = level.id
+        for t in range(1, 6):
+            text = ReadingText(level_id=level_id, title=f"T{t}", body="...", order=t)
+            text.questions = [ReadingQuestion(question=f"Q{n}", options=json.dumps([str(n), "x"]), correct_answer=str(n), order=-n)
+                              for n in range(3)]
+            db.session.add(text)
+        db.session.commit()
+
+    with count_queries() as statements:
+        texts = client.get(f"/api/reading/levels/{level_id}/texts", headers=headers).get_json()
+    assert len(statements) == 2
+    assert len(texts) == 6
+    assert [q["question"] for q in texts[1]["questions"]] == ["Q2", "Q1", "Q0"]
+    assert texts[1]["questions"][0]["options"] == ["2", "x"]
+
+    with count_queries() as statements:
+        one = client.get(f"/api/reading/texts/{texts[1]['id']}", headers=headers).get_json()
+    assert len(statements) == 1 and one["questions"] == texts[1]["questions"]
+
+    # options are cached by question id; committing an edit drops the entry, and non-list values keep their shape
+    with app.app_context():
+        question = db.session.get(ReadingQuestion, texts[1]["questions"][0]["id"])
+        question.options = json.dumps({"a": "2", "b": "x"})
+        db.session.commit()
+    one = client.get(f"/api/reading/texts/{texts[1]['id']}", headers=headers).get_json()
+    assert one["questions"][0]["options"] == {"a": "2", "b": "x"}
+    assert one["questions"][1]["options"] == ["1", "x"]
@@ -0,0 +1,88 @@
+import sqlite3
+
+import pytest
+
+from app import create_app, db
+from app.db_routing import STICKY_COOKIE, replica_engine
+from app.models import Category, Level, WritingTopic
+
+
+@pytest.fixture()
+def replicated_app(tmp_path):
+    """Two SQLite files standing in for a primary and its replica."""
+    primary, replica = tmp_path / "primary.db", tmp_path / "replica.db"
+
+    class ReplicaConfig:
+        TESTING = True
+        SECRET_KEY = "test-secret"
+        JWT_SECRET_KEY = "test-jwt-secret"
+        JWT_ACCESS_TOKEN_EXPIRES = False
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{primary}"
+        SQLALCHEMY_REPLICA_URI = f"sqlite:///{replica}"
+        DB_REPLICA_STICKY_SECONDS = 30
+        UPLOAD_FOLDER = str(tmp_path / "uploads")
+
+    app = create_app(ReplicaConfig)
+    with app.app_context():
+        category = Category(slug="writing", name="Writing", order=1)
+        level = Level(category=category, order=1, name="Level 1")
+        db.session.add_all([category, level, WritingTopic(level=level, title="Shared", prompt="p", order=0)])
+        db.session.commit()
+        level_id = level.id
+
+    def replicate():
+        with sqlite3.connect(primary) as src, sqlite3.connect(replica) as dst:
+            src.backup(dst)
+
+    replicate()
+    yield app, level_id
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+    replica_engine(app).dispose()
+
+
+def _topic_titles(client, level_id, headers):
+    res = client.get(f"/api/writing/levels/{level_id}/topics", headers=headers)
+    assert res.status_code == 200
+    return [t["title"] for t in res.get_json()]
+
+
+def test_reads_go_to_replica_until_the_client_writes(replicated_app):
+    app, level_id = replicated_app
+    client = app.test_client()
+    # Registering is a write too: do it from another client so this one starts unpinned
+    reg = app.test_client().post("/api/auth/register", json={"email": "r@example.com", "password": "password123"})
+    token = reg.get_json()["token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    # Content added on the primary only: the replica has not caught up yet
+    with app.app_context():
+        db.session.add(WritingTopic(level_id=level_id, title="Primary only", prompt="p", order=1))
+        db.session.commit()
+    assert _topic_titles(client, level_id, headers) == ["Shared"]
+
+    # A submit (creates the user's data on the primary) pins this client's reads to the primary
+    with app.app_context():
+        topic_id = WritingTopic.query.filter_by(title="Shared").first().id
+    res = client.post(f"/api/writing/topics/{topic_id}/submit", json={"content": "An essay."}, headers=headers)
+    assert res.status_code == 201 and STICKY_COOKIE in res.headers.get("Set-Cookie", "")
+    assert _topic_titles(client, level_id, headers) == ["Shared", "Primary only"]
+
+    # Another client without the cookie still reads the replica
+    assert _topic_titles(app.test_client(), level_id, headers) == ["Shared"]
+
+
+def test_engine_options_reach_the_pool(tmp_path):
+    class PoolConfig:
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'pool.db'}"
+        SQLALCHEMY_ENGINE_OPTIONS = {"pool_size": 3, "max_overflow": 2, "pool_recycle": 600, "pool_pre_ping": True}
+        UPLOAD_FOLDER = str(tmp_path / "uploads")
+
+    app = create_app(PoolConfig)
+    with app.app_context():
+        pool = db.engine.pool
+        assert (pool.size(), pool._max_overflow, pool._recycle, pool._pre_ping) == (3, 2, 600, True)
+        assert db.session.get_bind() is db.engine  # no replica configured
+        db.engine.dispose()
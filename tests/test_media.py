@@ -0,0 +1,53 @@
+import os
+import time
+
+from app.services import media
+
+
+def _write(root, relpath, size, age_s=0):
+    path = root / relpath
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    if age_s:
+        then = time.time() - age_s
+        os.utime(path, (then, then))
+    return path
+
+
+def test_janitor_evicts_lru_but_keeps_referenced_and_recent(app, tmp_path, monkeypatch):
+    from app import db
+    from app.models import Reel
+
+    uploads = tmp_path / "uploads"
+    index = media.MediaIndex(str(tmp_path / "media_index.sqlite"))
+    monkeypatch.setattr(media, "_index", index)
+    reel_video = _write(uploads, "reels/ab/cd/clip.mp4", 400, age_s=9000)
+    oldest = _write(uploads, "tts/00/11/old.mp3", 300, age_s=8000)
+    touched = _write(uploads, "tts/22/33/touched.mp3", 300, age_s=7000)
+    newer = _write(uploads, "answers/new.webm", 300, age_s=60)
+    stale_part = _write(uploads, "tts/44/55/x.mp3.1.2.part", 50, age_s=2 * media.PART_MAX_AGE_SECONDS)
+    with app.app_context():
+        db.session.add(Reel(title="r", video_url="/uploads/reels/ab/cd/clip.mp4", language="id"))
+        db.session.commit()
+
+    # served files count as recently used
+    assert app.test_client().get("/uploads/tts/22/33/touched.mp3").status_code == 200
+
+    janitor = media.MediaJanitor(str(uploads), index, quota_bytes=1200)
+    with app.app_context():
+        assert janitor.collect(dry_run=True)["evicted"] == 1
+        assert oldest.exists()
+        stats = janitor.run_exclusive()
+    assert stats["bytes"] == 1300 and stats["referenced"] == 1
+    assert stats["evicted"] == 1 and stats["evictedBytes"] == 300 and stats["partsRemoved"] == 1
+    assert not oldest.exists() and not stale_part.exists()
+    assert reel_video.exists() and touched.exists() and newer.exists()
+
+
+def test_shard_relpath_and_upload_urls():
+    key = "ab12" + "0" * 60
+    assert media.shard_relpath("tts", key + ".mp3", key) == f"tts/ab/12/{key}.mp3"
+    assert media.shard_relpath("reels", "clip.mp4").startswith("reels/")
+    assert media.shard_relpath("reels", "clip.mp4").count("/") == 3
+    assert media.relpath_from_url("http://localhost:3000/uploads/reels/a%20b.mp4") == "reels/a b.mp4"
+    assert media.relpath_from_url("https://cdn.example.com/video.mp4") is None
@@ -0,0 +1,197 @@
+import re
+import uuid
+from datetime import datetime
+
+import pytest
+
+from sqlalchemy import inspect, tuple_
+
+from app import db
+from app.migrations import MIGRATIONS, applied_versions, migrate
+from app.models import (
+    Feedback,
+    Level,
+    ListeningAudio,
+    ReadingAttempt,
+    ReadingQuestion,
+    ReadingText,
+    Reel,
+    ReelBatch,
+    ReelBatchAttempt,
+    SpeakingAttempt,
+    SpeakingExercise,
+    UserLevelProgress,
+    WritingSubmission,
+    WritingTopic,
+)
+
+USER = "00000000-0000-0000-0000-000000000001"
+ITEM = "00000000-0000-0000-0000-000000000002"
+
+
+def _hot_queries():
+    """The per-request lookups the routes and submit pipeline run."""
+    feedback_key = tuple_(Feedback.created_at, Feedback.id)
+    feedback_after = tuple_(datetime(2024, 1, 1), ITEM)
+    feed_key = (Reel.order, Reel.order_in_batch, Reel.created_at, Reel.id)
+    batch_key = (ReelBatch.order, ReelBatch.created_at, ReelBatch.id)
+    return {
+        "feedback by type": Feedback.query.filter_by(user_id=USER, type="reading")
+        .filter(feedback_key < feedback_after).order_by(Feedback.created_at.desc(), Feedback.id.desc()).limit(50),
+        "feedback all": Feedback.query.filter_by(user_id=USER)
+        .filter(feedback_key < feedback_after).order_by(Feedback.created_at.desc(), Feedback.id.desc()).limit(50),
+        "reel feed page": Reel.query.filter(tuple_(*feed_key) > tuple_(0, 0, datetime(2024, 1, 1), ITEM))
+        .order_by(*feed_key).limit(50),
+        "reel batch page": ReelBatch.query.filter(tuple_(*batch_key) > tuple_(0, datetime(2024, 1, 1), ITEM))
+        .order_by(*batch_key).limit(50),
+        "reading attempts": ReadingAttempt.query.filter_by(user_id=USER, reading_text_id=ITEM),
+        "speaking attempts": SpeakingAttempt.query.filter_by(user_id=USER, exercise_id=ITEM),
+        "writing submissions": WritingSubmission.query.filter_by(user_id=USER, writing_topic_id=ITEM),
+        "reel batch attempts": ReelBatchAttempt.query.filter_by(user_id=USER, reel_batch_id=ITEM),
+        "levels": Level.query.filter_by(category_id=ITEM).order_by(Level.order),
+        "reading texts": ReadingText.query.filter_by(level_id=ITEM).order_by(ReadingText.order),
+        "reading questions": ReadingQuestion.query.filter_by(reading_text_id=ITEM).order_by(ReadingQuestion.order),
+        "listening audios": ListeningAudio.query.filter_by(level_id=ITEM).order_by(ListeningAudio.order),
+        "writing topics": WritingTopic.query.filter_by(level_id=ITEM).order_by(WritingTopic.order),
+        "speaking exercises": SpeakingExercise.query.filter_by(level_id=ITEM).order_by(SpeakingExercise.order),
+        "batch reels": Reel.query.filter_by(batch_id=ITEM).order_by(Reel.order_in_batch),
+        "user progress": UserLevelProgress.query.filter_by(user_id=USER),
+    }
+
+
+def _query_plan(query) -> list[str]:
+    dialect = db.engine.dialect
+    compiled = query.statement.compile(dialect=dialect)
+    raw = compiled.construct_params()
+    params = []
+    for name in compiled.positiontup:
+        process = compiled.binds[name].type.bind_processor(dialect)
+        params.append(process(raw[name]) if process else raw[name])
+    with db.engine.connect() as conn:
+        return [row[-1] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + str(compiled), tuple(params))]
+
+
+def test_hot_queries_use_indexes(app):
+    full_scan = re.compile(r"^SCAN \w+$")  # "SCAN t USING INDEX ..." walks an index; a bare "SCAN t" reads every row
+    with app.app_context():
+        for name, query in _hot_queries().items():
+            plan = _query_plan(query)
+            assert not [step for step in plan if full_scan.match(step)], f"{name}: {plan}"
+            assert not [step for step in plan if "TEMP B-TREE" in step], f"{name} sorts in memory: {plan}"
+
+
+def test_migrate_adds_indexes_to_existing_database(app):
+    with app.app_context():
+        assert set(applied_versions(db.engine)) == {m.version for m in MIGRATIONS}
+        assert migrate(db.engine, db.metadata) == []
+
+        # Simulate a database created before the index set: drop one and forget the versions
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql("DROP INDEX ix_feedback_user_type_created")
+            conn.exec_driver_sql("ALTER TABLE reading_texts DROP COLUMN tts_audio_url")
+            conn.exec_driver_sql("DELETE FROM schema_version")
+
+        assert migrate(db.engine, db.metadata) == [m.version for m in MIGRATIONS]
+        inspector = inspect(db.engine)
+        assert "ix_feedback_user_type_created" in {i["name"] for i in inspector.get_indexes("feedback")}
+        assert "tts_audio_url" in {c["name"] for c in inspector.get_columns("reading_texts")}
+        assert migrate(db.engine, db.metadata) == []
+
+
+def test_reel_feed_index_gains_in_batch_order_on_applied_database(app):
+    with app.app_context():
+        # A database that applied migrations 1-5 with the old feed index and unset in-batch positions
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql("DROP INDEX ix_reels_order")
+            conn.exec_driver_sql('CREATE INDEX ix_reels_order ON reels ("order", created_at, id)')
+            conn.exec_driver_sql("DELETE FROM schema_version WHERE version = 6")
+        db.session.add(Reel(title="r", video_url="/uploads/reels/r.mp4", language="id"))
+        db.session.commit()
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql("UPDATE reels SET order_in_batch = NULL")
+
+        assert migrate(db.engine, db.metadata) == [6]
+        index = next(i for i in inspect(db.engine).get_indexes("reels") if i["name"] == "ix_reels_order")
+        assert index["column_names"] == ["order", "order_in_batch", "created_at", "id"]
+        with db.engine.connect() as conn:
+            assert conn.exec_driver_sql("SELECT order_in_batch FROM reels").scalar() == 0
+
+
+def test_text_ids_are_copied_to_uuid7(app, tmp_path):
+    from sqlalchemy import create_engine
+
+    from app import create_app
+    from app.migrations import copy_with_new_ids
+    from app.models import Category, User, UserItemCompletion
+
+    legacy = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    db.metadata.create_all(legacy)
+    with legacy.begin() as conn:  # rows as the old generate_id() wrote them: 25-character text ids
+        conn.exec_driver_sql("INSERT INTO users (id, email, password_hash, created_at) VALUES "
+                             "('u-old', 'old@example.com', 'x', '2023-01-01 00:00:00'),"
+                             "('u-new', 'new@example.com', 'x', '2024-01-01 00:00:00')")
+        conn.exec_driver_sql("INSERT INTO categories (id, slug, name, \"order\") VALUES ('c1', 'reading', 'Reading', 1)")
+        conn.exec_driver_sql("INSERT INTO levels (id, category_id, \"order\", name) VALUES ('l1', 'c1', 1, 'Level 1')")
+        conn.exec_driver_sql("INSERT INTO reading_texts (id, level_id, title, body) VALUES ('t1', 'l1', 'T', 'B')")
+        conn.exec_driver_sql("INSERT INTO user_item_completions (id, user_id, level_id, item_type, item_id) "
+                             "VALUES ('i1', 'u-old', 'l1', 'reading', 't1'), ('i2', 'gone', 'l1', 'reading', 't1')")
+
+    class LegacyConfig:
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = str(legacy.url)
+        UPLOAD_FOLDER = str(tmp_path / "uploads")
+
+    with pytest.raises(RuntimeError, match="migrate_ids.py"):
+        create_app(LegacyConfig)
+
+    with app.app_context():
+        stats = copy_with_new_ids(legacy, db.engine, db.metadata, batch_size=2)
+        assert stats["users"] == 2 and stats["user_item_completions"] == 1 and stats["dropped"] == 1
+        old_user, new_user = (User.query.filter_by(email=e).one() for e in ("old@example.com", "new@example.com"))
+        assert uuid.UUID(old_user.id).version == 7 and old_user.id < new_user.id  # creation order kept
+        completion = UserItemCompletion.query.one()
+        text = ReadingText.query.one()
+        assert completion.user_id == old_user.id and completion.item_id == text.id
+        assert text.level.category.id == Category.query.one().id
+        assert migrate(db.engine, db.metadata) == []
+
+
+def test_upgrade_backfills_progress_counters_from_existing_attempts(app, seed_reading_content):
+    from app import create_app
+    from app.models import User, UserLevelCounter
+
+    level_id, first_id = seed_reading_content["level"].id, seed_reading_content["text"].id
+    with app.app_context():
+        second = ReadingText(level_id=level_id, title="Second", body="...", order=1)
+        db.session.add(second)
+        db.session.commit()
+        second_id = second.id
+        # a database from before the counters: attempts, but no counter tables and no migration 5
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql("DROP TABLE user_item_completions")
+            conn.exec_driver_sql("DROP TABLE user_level_counters")
+            conn.exec_driver_sql("DELETE FROM schema_version WHERE version = 5")
+
+    client = app.test_client()
+    token = client.post("/api/auth/register", json={"email": "old@example.com", "password": "password123"}).get_json()["token"]
+    with app.app_context():
+        user_id = User.query.filter_by(email="old@example.com").one().id
+        db.session.add(ReadingAttempt(user_id=user_id, reading_text_id=first_id, answers="{}"))
+        db.session.commit()
+
+    class UpgradeConfig:
+        TESTING = True
+        JWT_SECRET_KEY = app.config["JWT_SECRET_KEY"]
+        SQLALCHEMY_DATABASE_URI = app.config["SQLALCHEMY_DATABASE_URI"]
+        UPLOAD_FOLDER = app.config["UPLOAD_FOLDER"]
+
+    upgraded = create_app(UpgradeConfig)
+    with upgraded.app_context():
+        assert UserLevelCounter.query.one().completed_items == 1
+        assert migrate(db.engine, db.metadata) == []
+
+    # the pre-upgrade attempt counts: the second text completes the two-text level
+    headers = {"Authorization": f"Bearer {token}"}
+    assert upgraded.test_client().post(f"/api/reading/texts/{second_id}/submit", headers=headers, json={"answers": {}}).status_code == 201
+    with upgraded.app_context():
+        assert [(p.level_id, p.completed) for p in UserLevelProgress.query.all()] == [(level_id, True)]
@@ -0,0 +1,107 @@
+import json
+
+from app import db
+from app.models import Reel, ReelBatch, ReelBatchQuestion, ReelDubbing
+
+
+def _seed_batches(app, count, dubbings=2):
+    """`count` more batches of 5 reels, each with `dubbings` dubbings, plus a question. Returns ids."""
+    with app.app_context():
+        ids = []
+        for i in range(count):
+            batch = ReelBatch(title=f"Batch {i}", order=i)
+            db.session.add(batch)
+            db.session.flush()
+            for n in range(1, 6):
+                reel = Reel(title=f"Reel {i}.{n}", video_url=f"/uploads/reels/{i}_{n}.mp4", language="id",
+                            batch_id=batch.id, order_in_batch=n)
+                reel.dubbings = [ReelDubbing(language=f"l{d}", audio_url=f"/uploads/d/{i}_{n}_{d}.mp3") for d in range(dubbings)]
+                db.session.add(reel)
+            db.session.add(ReelBatchQuestion(reel_batch_id=batch.id, question="Q?", options=json.dumps(["a", "b"]), correct_answer="a"))
+            ids.append(batch.id)
+        db.session.commit()
+        return ids
+
+
+def _query_count(client, count_queries, url):
+    with count_queries() as statements:
+        res = client.get(url)
+    assert res.status_code == 200
+    return len(statements), res.get_json()
+
+
+def test_reel_listings_use_constant_queries(app, client, count_queries):
+    _seed_batches(app, 2)
+    small_batches, _ = _query_count(client, count_queries, "/api/reels/batches")
+    small_reels, _ = _query_count(client, count_queries, "/api/reels")
+
+    _seed_batches(app, 8)
+    big_batches, batches = _query_count(client, count_queries, "/api/reels/batches")
+    big_reels, reels = _query_count(client, count_queries, "/api/reels")
+
+    assert big_batches == small_batches <= 4  # batches, reels, dubbings, questions
+    assert big_reels == small_reels <= 2
+    assert len(batches) == 10 and all(len(b["reels"]) == 5 and b["question"] for b in batches)
+    assert [r["orderInBatch"] for r in batches[0]["reels"]] == [1, 2, 3, 4, 5]
+    assert len(reels) == 50 and all(len(r["dubbings"]) == 2 for r in reels)
+
+
+def test_single_reel_and_batch_use_constant_queries(app, client, count_queries):
+    (few,) = _seed_batches(app, 1, dubbings=1)
+    (many,) = _seed_batches(app, 1, dubbings=6)
+    with app.app_context():
+        reel_few = Reel.query.filter_by(batch_id=few).first().id
+        reel_many = Reel.query.filter_by(batch_id=many).first().id
+
+    n_few, _ = _query_count(client, count_queries, f"/api/reels/batches/{few}")
+    n_many, batch = _query_count(client, count_queries, f"/api/reels/batches/{many}")
+    assert n_few == n_many <= 4 and batch["question"]["options"] == ["a", "b"]
+
+    n_few, _ = _query_count(client, count_queries, f"/api/reels/{reel_few}")
+    n_many, reel = _query_count(client, count_queries, f"/api/reels/{reel_many}")
+    assert n_few == n_many == 1 and len(reel["dubbings"]) == 6
+
+
+def test_reel_feed_pages_with_cursor(app, client, count_queries):
+    _seed_batches(app, 4)
+    seen, cursor, per_page = [], None, []
+    while True:
+        url = "/api/reels?limit=6" + (f"&cursor={cursor}" if cursor else "")
+        with count_queries() as statements:
+            res = client.get(url)
+        assert res.status_code == 200
+        per_page.append(len(statements))
+        seen += [r["id"] for r in res.get_json()]
+        cursor = res.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert len(seen) == len(set(seen)) == 20 and len(per_page) == 4
+    assert len(set(per_page)) == 1  # a deep page costs the same as the first
+
+    batches = client.get("/api/reels/batches?limit=3")
+    rest = client.get(f"/api/reels/batches?cursor={batches.headers['X-Next-Cursor']}")
+    assert len(batches.get_json()) == 3 and len(rest.get_json()) == 1 and "X-Next-Cursor" not in rest.headers
+    assert client.get("/api/reels?cursor=not-a-cursor").status_code == 400
+
+
+def test_reel_feed_keeps_authored_order_within_batch(app, client):
+    with app.app_context():
+        batch = ReelBatch(title="Batch", order=0)
+        db.session.add(batch)
+        db.session.flush()
+        for n in (3, 1, 2):  # uploaded out of authored order
+            db.session.add(Reel(title=f"Reel {n}", video_url=f"/uploads/reels/{n}.mp4", language="id",
+                                batch_id=batch.id, order_in_batch=n))
+            db.session.flush()
+        db.session.add(Reel(title="Loose", video_url="/uploads/reels/loose.mp4", language="id", order_in_batch=None))
+        db.session.commit()
+
+    titles, cursor = [], None
+    while True:
+        res = client.get("/api/reels?limit=1" + (f"&cursor={cursor}" if cursor else ""))
+        titles += [r["title"] for r in res.get_json()]
+        cursor = res.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert titles == ["Loose", "Reel 1", "Reel 2", "Reel 3"]
+    assert client.get("/api/reels").get_json()[0]["orderInBatch"] is None
@@ -0,0 +1,24 @@
+from app import db
+from app.models import Feedback, User
+
+
+def test_sqlite_profile_pragmas(app):
+    with app.app_context():
+        pragma = lambda name: db.session.execute(db.text(f"PRAGMA {name}")).scalar()  # noqa: E731
+        assert pragma("journal_mode") == "wal"
+        assert pragma("synchronous") == 1  # NORMAL
+        assert pragma("foreign_keys") == 1
+        assert pragma("busy_timeout") > 0
+
+
+def test_foreign_key_cascades_run(app):
+    with app.app_context():
+        user = User(email="cascade@example.com", password_hash="x")
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(Feedback(user_id=user.id, type="writing", content="ok"))
+        db.session.commit()
+        # Delete below the ORM so only the database's ON DELETE CASCADE can remove the feedback row
+        db.session.execute(db.delete(User.__table__).where(User.__table__.c.id == user.id))
+        db.session.commit()
+        assert Feedback.query.count() == 0
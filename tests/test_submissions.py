@@ -0,0 +1,116 @@
+from datetime import datetime
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app import db
+from app.models import Feedback, Level, ReadingText, User, UserLevelProgress, WritingTopic
+
+
+def _token(client, email):
+    reg = client.post("/api/auth/register", json={"email": email, "password": "password123"})
+    return reg.get_json()["token"]
+
+
+def _count_commits():
+    commits = []
+    listener = lambda session: commits.append(1)  # noqa: E731
+    event.listen(Session, "after_commit", listener)
+    return commits, lambda: event.remove(Session, "after_commit", listener)
+
+
+def test_submit_commits_once_and_completes_level_on_distinct_items(app, client, seed_reading_content):
+    headers = {"Authorization": f"Bearer {_token(client, 'submit@example.com')}"}
+    text_id, question_id = seed_reading_content["text"].id, seed_reading_content["question"].id
+    level_id = seed_reading_content["level"].id
+    with app.app_context():
+        second = ReadingText(level_id=level_id, title="Second", body="...", order=1)
+        db.session.add(second)
+        db.session.commit()
+        second_id = second.id
+
+    commits, stop = _count_commits()
+    try:
+        for _ in range(2):  # the same text twice must not complete a two-text level
+            res = client.post(f"/api/reading/texts/{text_id}/submit", headers=headers, json={"answers": {question_id: "A sample"}})
+            assert res.status_code == 201
+    finally:
+        stop()
+    assert len(commits) == 2
+    with app.app_context():
+        assert UserLevelProgress.query.count() == 0
+        assert Feedback.query.filter_by(type="reading").count() == 2
+
+    client.post(f"/api/reading/texts/{second_id}/submit", headers=headers, json={"answers": {}})
+    client.post(f"/api/reading/texts/{second_id}/submit", headers=headers, json={"answers": {}})
+    with app.app_context():
+        rows = UserLevelProgress.query.all()
+        assert [(r.level_id, r.completed) for r in rows] == [(level_id, True)]
+
+
+def test_upsert_level_completion_keeps_one_row(app, seed_categories):
+    from app.services.submissions import upsert_level_completion
+
+    with app.app_context():
+        writing = seed_categories["writing"]
+        level = Level.query.filter_by(category_id=writing.id).first()
+        user = User(email="upsert@example.com", password_hash="x")
+        db.session.add_all([user, WritingTopic(level_id=level.id, title="t", prompt="p")])
+        db.session.commit()
+        for _ in range(3):
+            upsert_level_completion(user.id, writing.id, level.id)
+            db.session.commit()
+        rows = UserLevelProgress.query.filter_by(user_id=user.id).all()
+        assert len(rows) == 1 and rows[0].completed and rows[0].id and rows[0].completed_at
+
+
+def test_completion_counters_and_rebuild(app, client, seed_reading_content):
+    from app.models import ReadingAttempt, UserItemCompletion, UserLevelCounter
+    from app.services.progress import rebuild
+
+    headers = {"Authorization": f"Bearer {_token(client, 'counter@example.com')}"}
+    text_id, level_id = seed_reading_content["text"].id, seed_reading_content["level"].id
+    for _ in range(3):
+        client.post(f"/api/reading/texts/{text_id}/submit", headers=headers, json={"answers": {}})
+    with app.app_context():
+        counter = UserLevelCounter.query.one()
+        assert (counter.level_id, counter.completed_items) == (level_id, 1)
+        assert UserItemCompletion.query.count() == 1
+        assert rebuild()["consistent"]
+
+        # attempts written before the counters existed: check reports drift, backfill repairs it
+        user_id = counter.user_id
+        other = ReadingText(level_id=level_id, title="Older", body="...", order=2)
+        db.session.add(other)
+        db.session.flush()
+        db.session.add(ReadingAttempt(user_id=user_id, reading_text_id=other.id, answers="{}"))
+        db.session.commit()
+        report = rebuild()
+        assert not report["consistent"] and report["missingCompletions"] == 1 and report["mismatchedCounters"] == 1
+        rebuild(fix=True)
+        assert UserLevelCounter.query.one().completed_items == 2
+        assert rebuild()["consistent"]
+
+
+def test_feedback_listing_pages_newest_first(app, client):
+    reg = client.post("/api/auth/register", json={"email": "pages@example.com", "password": "password123"}).get_json()
+    headers = {"Authorization": f"Bearer {reg['token']}"}
+    with app.app_context():
+        same_time = datetime(2024, 1, 1)
+        for i in range(5):  # ties on created_at must neither repeat nor drop rows across pages
+            db.session.add(Feedback(user_id=reg["user"]["id"], type="writing", content=f"w{i}", created_at=same_time))
+        db.session.add(Feedback(user_id=reg["user"]["id"], type="writing", content="newest", created_at=datetime(2024, 2, 1)))
+        db.session.add(Feedback(user_id=reg["user"]["id"], type="reading", content="other type"))
+        db.session.commit()
+
+    contents, cursor = [], None
+    while True:
+        url = "/api/feedback?type=writing&limit=2" + (f"&cursor={cursor}" if cursor else "")
+        res = client.get(url, headers=headers)
+        assert res.status_code == 200
+        contents += [f["content"] for f in res.get_json()]
+        cursor = res.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert contents[0] == "newest" and sorted(contents[1:]) == [f"w{i}" for i in range(5)]
+    assert len(client.get("/api/feedback", headers=headers).get_json()) == 7
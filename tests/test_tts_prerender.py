@@ -0,0 +1,84 @@
+import sqlite3
+
+import pytest
+
+from fake_minimax import FakeMiniMax, minimax_client
+
+
+@pytest.fixture()
+def fake_tts(monkeypatch, tmp_path):
+    from app.services import minimax, tts_cache
+    from config import Config
+
+    cache = tts_cache.TtsCache(str(tmp_path / "uploads"), str(tmp_path / "tts_index.sqlite"))
+    monkeypatch.setattr(tts_cache, "_cache", cache)
+    with FakeMiniMax() as server:
+        monkeypatch.setattr(Config, "MINIMAX_API_KEY", "test-key")
+        monkeypatch.setattr(minimax, "_client", minimax_client(server.url))
+        yield server
+
+
+def test_prerender_is_idempotent_and_rerenders_edited_text(app, seed_reading_content, fake_tts):
+    from app import db
+    from app.models import ReadingQuestion, ReadingText
+    from app.services.tts_prerender import audio_key, pending_items, prerender
+
+    with app.app_context():
+        assert len(pending_items()) == 2  # seeded text body + question
+        stats = prerender(workers=2, commit_every=1)
+        assert stats == {"pending": 2, "rendered": 2, "failed": 0, "stopped": False}
+        text = ReadingText.query.first()
+        assert text.tts_audio_url.endswith(f"/{audio_key(text.body)}.mp3")
+        assert len(fake_tts.requests) == 2
+
+        assert prerender()["pending"] == 0
+        assert len(fake_tts.requests) == 2
+
+        question = ReadingQuestion.query.first()
+        question.question = "Who wrote this text?"
+        db.session.commit()
+        assert [(name, row_id) for name, row_id, _ in pending_items()] == [("reading_question", question.id)]
+        assert prerender()["rendered"] == 1
+        text_id = text.id
+
+    client = app.test_client()
+    token = client.post("/api/auth/register", json={"email": "pre@example.com", "password": "password123"}).get_json()["token"]
+    body = client.get(f"/api/reading/texts/{text_id}", headers={"Authorization": f"Bearer {token}"}).get_json()
+    assert body["audioUrl"].startswith("/uploads/tts/") and body["questions"][0]["audioUrl"]
+
+
+def test_lesson_page_loads_prerendered_prompt_audio(app, client, seed_reading_content, fake_tts):
+    from app.services.tts_prerender import prerender
+
+    with app.app_context():
+        prerender()
+    level_id = seed_reading_content["level"].id
+
+    # the lesson page names its reading level; lesson.js reads the level payload and sets data-audio-url
+    page = client.get("/level/1").get_data(as_text=True)
+    assert f'data-reading-level="{level_id}"' in page
+    assert 'data-reading-level=""' in client.get("/level/99").get_data(as_text=True)
+
+    token = client.post("/api/auth/register", json={"email": "lesson@example.com", "password": "password123"}).get_json()["token"]
+    texts = client.get(f"/api/reading/levels/{level_id}/texts", headers={"Authorization": f"Bearer {token}"}).get_json()
+    urls = [texts[0]["audioUrl"], texts[0]["questions"][0]["audioUrl"]]
+    assert all(url.startswith("/uploads/tts/") for url in urls)
+    assert all(client.get(url).status_code == 200 for url in urls)
+
+
+def test_create_app_adds_new_columns_to_existing_database(tmp_path):
+    from app import create_app
+
+    db_path = tmp_path / "old.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE writing_topics (id VARCHAR(36) PRIMARY KEY, level_id VARCHAR(36) NOT NULL,"
+                 " title VARCHAR(255) NOT NULL, prompt TEXT NOT NULL, \"order\" INTEGER)")
+    conn.commit()
+
+    class OldDbConfig:
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{db_path}"
+        JWT_SECRET_KEY = "test-jwt-secret"
+
+    create_app(OldDbConfig)
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(writing_topics)")]
+    assert "tts_audio_url" in columns
@@ -0,0 +1,587 @@
+from concurrent.futures import ThreadPoolExecutor, wait
+import io
+import json
+import shutil
+import threading
+import time
+import wave
+
+import pytest
+
+from app.services import stt_jobs
+from fake_minimax import FakeMiniMax, minimax_client
+
+
+@pytest.fixture()
+def fake_minimax(monkeypatch):
+    from app.services import minimax
+    from config import Config
+
+    with FakeMiniMax() as server:
+        monkeypatch.setattr(Config, "MINIMAX_API_KEY", "test-key")
+        monkeypatch.setattr(minimax, "_client", minimax_client(server.url))
+        yield server
+
+
+@pytest.fixture()
+def job_queue(monkeypatch):
+    release = threading.Event()
+
+    def fake_stt(audio, language, suffix=".webm"):
+        release.wait(5)
+        return {"success": True, "text": f"heard {audio} ({language})"}
+
+    queue = stt_jobs.SttJobQueue(
+        workers=1, max_pending=1, timeout=10,
+        executor=ThreadPoolExecutor(max_workers=1), func=fake_stt,
+    )
+    monkeypatch.setattr(stt_jobs, "_queue", queue)
+    yield queue, release
+    release.set()
+    queue.shutdown(wait=True)
+
+
+def test_stt_job_mode_enqueues_and_long_polls(client, job_queue):
+    queue, release = job_queue
+    res = client.post("/api/tts-stt/stt?mode=job", json={"audioUrlOrBase64": "abc", "language": "en"})
+    assert res.status_code == 202
+    job = res.get_json()
+    assert job["status"] in ("queued", "running")
+
+    # queue depth is 1, so a second job is rejected while the first is pending
+    busy = client.post("/api/tts-stt/stt", json={"audioUrlOrBase64": "def", "async": True})
+    assert busy.status_code == 503
+
+    release.set()
+    status = client.get(job["statusUrl"] + "?wait=5")
+    assert status.status_code == 200
+    assert status.get_json() == {"jobId": job["jobId"], "status": "done", "text": "heard abc (en)"}
+
+    assert client.get("/api/tts-stt/stt/jobs/missing").status_code == 404
+
+
+def test_timed_out_job_keeps_its_slot_until_the_worker_finishes():
+    release = threading.Event()
+    queue = stt_jobs.SttJobQueue(
+        workers=1, max_pending=1, timeout=0.05,
+        executor=ThreadPoolExecutor(max_workers=1), func=lambda audio, language, suffix: release.wait(5) and {},
+    )
+    try:
+        job = queue.submit("slow")
+        time.sleep(0.1)
+        assert queue.get(job.id).to_json()["error"] == "STT job timed out."
+        # the worker is still busy with it, so the queue is still full
+        assert queue.pending_count() == 1
+        with pytest.raises(stt_jobs.QueueFullError):
+            queue.submit("next")
+        release.set()
+        deadline = time.monotonic() + 5
+        while queue.pending_count() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert queue.pending_count() == 0
+        assert queue.submit("next").id != job.id
+    finally:
+        release.set()
+        queue.shutdown(wait=True)
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+def test_decode_pcm_stream_and_file_paths_agree():
+    from app.services.audio import SAMPLE_RATE, decode_pcm_file, decode_pcm_stream
+
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(SAMPLE_RATE)
+        w.writeframes(b"\x00\x10" * SAMPLE_RATE)  # one second of a constant tone
+    data = buf.getvalue()
+
+    streamed = decode_pcm_stream(data)
+    from_file = decode_pcm_file(data, suffix=".wav")
+    assert streamed.dtype.name == "float32"
+    assert len(streamed) == len(from_file) == SAMPLE_RATE
+
+
+def test_transcript_cache_skips_whisper_on_repeat(monkeypatch, tmp_path):
+    import numpy as np
+    from app.services import stt_cache, tts_stt
+    from config import Config
+
+    monkeypatch.setattr(Config, "STT_BATCH_MAX_SIZE", 1)
+
+    calls = []
+
+    class FakeModel:
+        def transcribe(self, audio, language=None, fp16=False):
+            calls.append(language)
+            return {"text": " halo "}
+
+    def fake_get_model():
+        calls.append("load")
+        return FakeModel()
+
+    monkeypatch.setattr(tts_stt, "_get_whisper_model", fake_get_model)
+    monkeypatch.setattr(tts_stt, "decode_pcm", lambda data, suffix=".webm": np.zeros(16000, dtype=np.float32))
+    db_path = str(tmp_path / "stt_cache.sqlite")
+    monkeypatch.setattr(stt_cache, "_cache", stt_cache.TranscriptCache(8, db_path))
+
+    audio = "data:audio/webm;base64,AAECAwQ="
+    assert tts_stt.speech_to_text(audio, language="id") == {"success": True, "text": "halo"}
+    # one miss, counted once (the single-flight leader's re-check does not count again)
+    assert stt_cache.get_transcript_cache().stats()["misses"] == 1
+    assert tts_stt.speech_to_text(audio, language="id") == {"success": True, "text": "halo"}
+    assert calls == ["load", "id"]
+    stats = stt_cache.get_transcript_cache().stats()
+    assert (stats["memoryHits"], stats["misses"], stats["hitRate"]) == (1, 1, 0.5)
+
+    # a different language is a different key
+    tts_stt.speech_to_text(audio, language="en")
+    assert calls[-1] == "en"
+
+    # the SQLite tier survives a "restart" (new cache instance)
+    restarted = stt_cache.TranscriptCache(8, db_path)
+    key = stt_cache.transcript_key(b"\x00\x01\x02\x03\x04", "id", tts_stt._whisper_model_name())
+    assert restarted.get(key) == "halo"
+    assert restarted.stats()["diskHits"] == 1
+
+
+def test_whisper_batcher_groups_concurrent_requests():
+    from app.services.tts_stt import WhisperBatcher
+
+    batches = []
+
+    def fake_decode(pcms, language):
+        batches.append((len(pcms), language))
+        return [f"{language}:{len(p)}" for p in pcms]
+
+    batcher = WhisperBatcher(window_s=0.2, max_batch=3, decode_batch=fake_decode)
+    requests = [([0.0] * n, "id") for n in (1, 2, 3)] + [([0.0] * 4, "en")]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda r: batcher.transcribe(*r), requests))
+
+    assert results == ["id:1", "id:2", "id:3", "en:4"]
+    assert sum(size for size, _ in batches) == 4
+    assert max(size for size, _ in batches) > 1
+    assert batcher.stats()["items"] == 4
+
+
+def test_batched_results_get_transcribe_fallback():
+    from types import SimpleNamespace
+    from app.services.tts_stt import _batch_result_text
+
+    def result(text, avg_logprob=-0.2, compression_ratio=1.2, no_speech_prob=0.01):
+        return SimpleNamespace(text=text, avg_logprob=avg_logprob, compression_ratio=compression_ratio,
+                               no_speech_prob=no_speech_prob)
+
+    retried = []
+
+    def retranscribe():
+        retried.append(1)
+        return "fallback"
+
+    assert _batch_result_text(result(" halo "), retranscribe) == "halo"
+    assert _batch_result_text(result("ya ya ya ya", compression_ratio=3.1), retranscribe) == "fallback"
+    assert _batch_result_text(result("hm", avg_logprob=-1.4), retranscribe) == "fallback"
+    assert _batch_result_text(result("hm", avg_logprob=-1.4, no_speech_prob=0.9), retranscribe) == ""
+    assert len(retried) == 2
+
+
+def _wav_bytes(samples):
+    import numpy as np
+    from app.services.audio import SAMPLE_RATE
+
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(SAMPLE_RATE)
+        w.writeframes((np.asarray(samples) * 32767).astype("<i2").tobytes())
+    return buf.getvalue()
+
+
+def _tone(seconds, amplitude=0.3):
+    import numpy as np
+    from app.services.audio import SAMPLE_RATE
+
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return amplitude * np.sin(2 * np.pi * 220 * t)
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+def test_stt_stream_returns_partials_before_finish(client, monkeypatch):
+    import numpy as np
+    from app.services import stt_stream
+
+    manager = stt_stream.SttStreamManager(2, transcribe=lambda pcm, lang: f"seg{len(pcm) // 1600}")
+    monkeypatch.setattr(stt_stream, "_manager", manager)
+
+    # word, pause, word, pause, word (still speaking when the last chunk arrives)
+    audio = np.concatenate([_tone(1.0), np.zeros(16000), _tone(1.0), np.zeros(16000), _tone(0.5)])
+    data = _wav_bytes(audio)
+
+    stream_id = client.post("/api/tts-stt/stt/stream", json={"language": "id"}).get_json()["streamId"]
+    step = len(data) // 4
+    for i in range(0, len(data), step):
+        res = client.post(f"/api/tts-stt/stt/stream/{stream_id}", data=data[i:i + step],
+                          content_type="audio/wav")
+        assert res.status_code == 200
+
+    # the two closed words were sent to Whisper before the mic was released
+    stream = manager.get(stream_id)
+    assert len(stream.segments) == 2
+    wait(stream.segments, timeout=5)
+    assert stream.partial_text().split() == ["seg12", "seg14"]  # 1 s words plus 0.2 s context
+
+    final = client.post(f"/api/tts-stt/stt/stream/{stream_id}/finish").get_json()
+    assert final["final"] is True
+    assert len(final["text"].split()) == 3
+    assert client.post(f"/api/tts-stt/stt/stream/{stream_id}/finish").status_code == 404
+
+
+def test_stt_stream_limits_size_throttles_decodes_and_sweeps_idle(client, monkeypatch):
+    import numpy as np
+    from app.services import stt_stream
+    from config import Config
+
+    decoded = []
+
+    def fake_decode(data):
+        decoded.append(len(data))
+        return np.zeros(len(data) * 10, dtype=np.float32)
+
+    manager = stt_stream.SttStreamManager(1, transcribe=lambda pcm, lang: "")
+    monkeypatch.setattr(stt_stream, "_manager", manager)
+    monkeypatch.setattr(stt_stream, "decode_pcm_stream", fake_decode)
+    monkeypatch.setattr(Config, "STT_MAX_UPLOAD_BYTES", 100)
+
+    stream_id = client.post("/api/tts-stt/stt/stream", json={}).get_json()["streamId"]
+    for _ in range(10):
+        assert client.post(f"/api/tts-stt/stt/stream/{stream_id}", data=b"x" * 10).status_code == 200
+    # decoded at 10, 20, 30, 40, 50, 70, 90 bytes, not on every chunk
+    assert decoded == [10, 20, 30, 40, 50, 70, 90]
+    assert client.post(f"/api/tts-stt/stt/stream/{stream_id}/finish").status_code == 200
+    assert decoded[-1] == 100
+
+    stream_id = client.post("/api/tts-stt/stt/stream", json={}).get_json()["streamId"]
+    assert client.post(f"/api/tts-stt/stt/stream/{stream_id}", data=b"x" * 101).status_code == 413
+    assert client.post(f"/api/tts-stt/stt/stream/{stream_id}", data=b"x" * 60).status_code == 200
+    assert client.post(f"/api/tts-stt/stt/stream/{stream_id}", data=b"x" * 60).status_code == 413
+    assert client.post(f"/api/tts-stt/stt/stream/{stream_id}", data=b"x").status_code == 404  # dropped
+
+    stream_id = client.post("/api/tts-stt/stt/stream", json={}).get_json()["streamId"]
+    manager.get(stream_id).last_activity -= stt_stream.STREAM_IDLE_SECONDS + 1
+    assert client.post(f"/api/tts-stt/stt/stream/{stream_id}", data=b"x").status_code == 404
+
+
+def test_stt_accepts_multipart_and_raw_body_uploads(client, monkeypatch):
+    from app.routes import tts_stt as tts_stt_routes
+    from config import Config
+
+    seen = []
+
+    def fake_transcribe(audio_bytes, suffix=".webm", language=None):
+        seen.append((audio_bytes, suffix, language))
+        return {"success": True, "text": "ok"}
+
+    monkeypatch.setattr(tts_stt_routes, "transcribe_audio_bytes", fake_transcribe)
+
+    res = client.post(
+        "/api/tts-stt/stt",
+        data={"audio": (io.BytesIO(b"RIFFdata"), "answer.wav", "audio/wav"), "language": "en"},
+        content_type="multipart/form-data",
+    )
+    assert res.status_code == 200 and res.get_json() == {"text": "ok"}
+    res = client.post("/api/tts-stt/stt?language=id", data=b"\x1a\x45\xdf\xa3", content_type="audio/webm")
+    assert res.status_code == 200
+    assert seen == [(b"RIFFdata", ".wav", "en"), (b"\x1a\x45\xdf\xa3", ".webm", "id")]
+
+    monkeypatch.setattr(Config, "STT_MAX_UPLOAD_BYTES", 4)
+    res = client.post("/api/tts-stt/stt", data=b"12345", content_type="application/octet-stream")
+    assert res.status_code == 413
+
+
+def test_stt_rejects_oversized_bodies_before_parsing(app, client, monkeypatch):
+    import base64
+    from app.routes import tts_stt as tts_stt_routes
+    from config import Config
+
+    monkeypatch.setattr(Config, "STT_MAX_UPLOAD_BYTES", 1024)
+    monkeypatch.setattr(tts_stt_routes, "speech_to_text", lambda **kw: pytest.fail("body was parsed"))
+    audio = base64.b64encode(b"x" * (200 * 1024)).decode("ascii")
+    res = client.post("/api/tts-stt/stt", json={"audioUrlOrBase64": audio})
+    assert res.status_code == 413 and "error" in res.get_json()
+
+    # chunked upload: no Content-Length, cut off while reading
+    from werkzeug.test import EnvironBuilder, run_wsgi_app
+    body = json.dumps({"audioUrlOrBase64": audio}).encode("utf-8")
+    environ = EnvironBuilder(
+        path="/api/tts-stt/stt", method="POST", input_stream=io.BytesIO(body),
+        content_type="application/json", environ_overrides={"wsgi.input_terminated": True},
+    ).get_environ()
+    del environ["CONTENT_LENGTH"]
+    body, status, _ = run_wsgi_app(app, environ, buffered=True)
+    assert status.startswith("413") and b"error" in b"".join(body)
+
+
+def test_trim_silence_cuts_edges_and_long_pauses():
+    import numpy as np
+    from app.services.audio import SAMPLE_RATE, duration_seconds, trim_silence
+
+    rng = np.random.default_rng(0)
+    hiss = lambda secs: rng.standard_normal(int(secs * SAMPLE_RATE)) * 0.001  # noqa: E731
+    audio = np.concatenate([hiss(2.0), _tone(1.0), hiss(3.0), _tone(1.0), hiss(2.0)]).astype(np.float32)
+
+    trimmed = trim_silence(audio)
+    # 2 s of speech + 0.3 s kept pause + 0.15 s context around each word
+    assert duration_seconds(trimmed) == pytest.approx(2.9, abs=0.1)
+    assert duration_seconds(trim_silence(hiss(1.0).astype(np.float32))) == pytest.approx(1.0)
+
+    # no silence at all: a quiet stretch and a soft ending (about -43 dBFS) are kept
+    speech_only = np.concatenate([_tone(1.0), _tone(1.0, 0.01), _tone(1.0), _tone(0.5, 0.01)]).astype(np.float32)
+    assert len(trim_silence(speech_only)) == len(speech_only)
+
+
+def test_stt_match_scores_question_options(app, client, seed_reading_content, monkeypatch):
+    import numpy as np
+    from app.models import ReadingQuestion
+    from app.services import tts_stt
+    from app.services.question_options import get_question_options
+
+    scored = []
+
+    def fake_score(pcm, options, language=None):
+        scored.append((tuple(options), language))
+        return [-1.0 if o == "A sample" else -9.0 for o in options]
+
+    monkeypatch.setattr(tts_stt, "decode_pcm", lambda data, suffix=".webm": np.zeros(16000, dtype=np.float32))
+    monkeypatch.setattr(tts_stt, "score_options", fake_score)
+    with app.app_context():
+        question_id = ReadingQuestion.query.first().id
+
+    def match():
+        return client.post(
+            "/api/tts-stt/stt/match",
+            data={"audio": (io.BytesIO(b"webm"), "answer.webm"), "questionId": question_id, "language": "en"},
+            content_type="multipart/form-data",
+        )
+
+    res = match()
+    assert res.status_code == 200
+    body = res.get_json()
+    assert body["option"] == "A sample" and body["index"] == 0
+    assert body["confidence"] > 0.99
+    assert scored == [(("A sample", "Nothing", "Welcome"), "en")]
+    # options come from the shared decoded-options cache, as in the reading routes
+    hits = get_question_options().counters["hits"]
+    assert match().status_code == 200 and get_question_options().counters["hits"] == hits + 1
+
+    missing = client.post("/api/tts-stt/stt/match", json={"audioUrlOrBase64": "AAAA"})
+    assert missing.status_code == 400
+
+
+def test_option_scores_are_length_normalized():
+    from app.services.tts_stt import best_option, length_normalized
+
+    # a one-token distractor vs. the full sentence the learner said, each followed by EOT
+    options = ["Yes", "I would like a cup of tea"]
+    token_logprobs = [[-1.2, -0.3], [-0.4, -0.3, -0.2, -0.3, -0.4, -0.2, -0.3, -0.1]]
+    assert sum(token_logprobs[0]) > sum(token_logprobs[1])  # the summed likelihood prefers the short one
+    scores = [length_normalized(lp) for lp in token_logprobs]
+    assert best_option(options, scores)["option"] == "I would like a cup of tea"
+    assert length_normalized([]) == float("-inf")
+
+
+def test_stt_reads_own_upload_urls_from_disk(monkeypatch, tmp_path):
+    from app.services import tts_stt
+    from config import Config
+
+    monkeypatch.setattr(Config, "UPLOAD_FOLDER", str(tmp_path))
+    (tmp_path / "answers").mkdir()
+    (tmp_path / "answers" / "a.mp3").write_bytes(b"ID3audio")
+
+    def no_network(*args, **kwargs):
+        raise AssertionError("should not fetch over HTTP")
+
+    monkeypatch.setattr(tts_stt._http, "get", no_network)
+    for url in ("http://localhost:3000/uploads/answers/a.mp3", "/uploads/answers/a.mp3"):
+        assert tts_stt._load_audio_bytes(url) == (b"ID3audio", ".mp3", None)
+    assert tts_stt._local_upload_path("/uploads/../config.py") is None
+    assert tts_stt._local_upload_path("https://cdn.example.com/uploads/answers/a.mp3") is None
+
+
+def test_tts_cache_reuses_audio_and_leaves_eviction_to_janitor(app, seed_reading_content, monkeypatch, tmp_path,
+                                                                fake_minimax):
+    from app import db
+    from app.models import ReadingText
+    from app.services import media, tts_cache, tts_stt
+
+    cache = tts_cache.TtsCache(str(tmp_path / "uploads"), str(tmp_path / "tts_index.sqlite"))
+    monkeypatch.setattr(tts_cache, "_cache", cache)
+
+    first = tts_stt.text_to_speech("Pagi")
+    assert first["success"] and first["audioUrl"].startswith("/uploads/tts/")
+    assert (cache.counters["hits"], cache.counters["misses"]) == (0, 1)
+    assert tts_stt.text_to_speech("Pagi") == first
+    assert (cache.counters["hits"], cache.counters["misses"]) == (1, 1)
+    assert tts_stt.text_to_speech("Pagi", voice="Other_voice") != first
+    assert [r["text"] for r in fake_minimax.requests] == ["Pagi", "Pagi"]
+
+    # the index survives a restart
+    restarted = tts_cache.TtsCache(str(tmp_path / "uploads"), str(tmp_path / "tts_index.sqlite"))
+    monkeypatch.setattr(tts_cache, "_cache", restarted)
+    assert tts_stt.text_to_speech("Pagi") == first
+    mama = tts_stt.text_to_speech("Mama")
+    assert restarted.stats()["entries"] == 3
+    assert restarted.lookup(tts_cache.tts_cache_key({"text": "nope"})) is None
+
+    # over quota, the janitor evicts unreferenced audio but keeps what a lesson row points at
+    with app.app_context():
+        db.session.get(ReadingText, seed_reading_content["text"].id).tts_audio_url = first["audioUrl"]
+        db.session.commit()
+        janitor = media.MediaJanitor(str(tmp_path / "uploads"), media.MediaIndex(str(tmp_path / "mi.sqlite")), 1)
+        assert janitor.collect()["evicted"] == 2
+    assert app.test_client().get(first["audioUrl"]).status_code == 200
+    assert tts_stt.text_to_speech("Pagi") == first
+    assert tts_stt.text_to_speech("Mama") == mama  # rendered again
+    assert [r["text"] for r in fake_minimax.requests] == ["Pagi", "Pagi", "Mama", "Mama"]
+
+
+def test_minimax_client_retries_then_opens_circuit():
+    from app.services.minimax import CircuitOpenError, MiniMaxError
+
+    with FakeMiniMax(fail_status=503, fail_ratio=1.0) as server:
+        client = minimax_client(server.url, max_retries=2, cooldown_s=0.2)
+        for _ in range(4):
+            with pytest.raises(MiniMaxError):
+                client.t2a({"text": "x"})
+        assert len(server.requests) == 12  # 1 try + 2 retries each
+        assert client.breaker.state == "open"
+        with pytest.raises(CircuitOpenError):
+            client.t2a({"text": "x"})
+        assert len(server.requests) == 12  # failed fast, provider not called
+
+        # after the cooldown one probe goes through; success closes the circuit
+        server.fail_ratio = 0.0
+        time.sleep(0.25)
+        assert client.t2a({"text": "ok"})["data"]["audio"] == b"ok".hex()
+        assert client.breaker.state == "closed"
+
+
+def test_minimax_probe_failing_with_other_request_error_reopens_circuit(monkeypatch):
+    import requests
+    from app.services.minimax import CircuitOpenError, MiniMaxError
+
+    with FakeMiniMax(fail_status=503, fail_ratio=1.0) as server:
+        client = minimax_client(server.url, max_retries=0, cooldown_s=0.2)
+        for _ in range(5):
+            with pytest.raises(MiniMaxError):
+                client.t2a({"text": "x"})
+        assert client.breaker.state == "open"
+
+        def redirect_loop(*args, **kwargs):
+            raise requests.TooManyRedirects("Exceeded 30 redirects.")
+
+        time.sleep(0.25)
+        monkeypatch.setattr(client.session, "post", redirect_loop)
+        with pytest.raises(MiniMaxError, match="redirects"):
+            client.t2a({"text": "probe"})
+        assert client.breaker.state == "open"  # the probe was recorded as a failure
+        with pytest.raises(CircuitOpenError):
+            client.t2a({"text": "x"})
+
+        # the probe slot was released: the next probe can close the circuit
+        monkeypatch.undo()
+        server.fail_ratio = 0.0
+        time.sleep(0.25)
+        assert client.t2a({"text": "ok"})["data"]["audio"] == b"ok".hex()
+        assert client.breaker.state == "closed"
+
+
+def test_minimax_client_read_timeout_is_bounded():
+    from app.services.minimax import MiniMaxError
+
+    with FakeMiniMax(delay=2.0) as server:
+        client = minimax_client(server.url)
+        started = time.monotonic()
+        with pytest.raises(MiniMaxError):
+            client.t2a({"text": "slow"})
+        assert time.monotonic() - started < 1.5
+
+
+def test_tts_stream_relays_chunks_and_fills_cache(client, monkeypatch, tmp_path, fake_minimax):
+    from app.services import media, tts_cache
+
+    cache = tts_cache.TtsCache(str(tmp_path / "uploads"), str(tmp_path / "tts_index.sqlite"))
+    monkeypatch.setattr(tts_cache, "_cache", cache)
+    monkeypatch.setattr(media, "_index", media.MediaIndex(str(tmp_path / "media_index.sqlite")))
+    reg = client.post("/api/auth/register", json={"email": "tts@example.com", "password": "password123"})
+    headers = {"Authorization": f"Bearer {reg.get_json()['token']}"}
+    text = "Selamat pagi, apa kabar?"
+
+    res = client.post("/api/tts-stt/tts?stream=1", json={"text": text}, headers=headers, buffered=False)
+    assert res.status_code == 200 and res.mimetype == "audio/mpeg"
+    chunks = [c for c in res.response if c]
+    res.close()
+    assert len(chunks) > 1 and b"".join(chunks) == text.encode("utf-8")  # status-2 recap not duplicated
+    assert fake_minimax.requests[-1]["stream"] is True
+
+    # the tee registered the clip: the JSON endpoint and the next stream are served from cache
+    audio_url = res.headers["X-Audio-Url"]
+    assert client.post("/api/tts-stt/tts", json={"text": text}, headers=headers).get_json() == {"audioUrl": audio_url}
+    again = client.post("/api/tts-stt/tts", json={"text": text, "stream": True}, headers=headers)
+    assert again.data == text.encode("utf-8")
+    assert len(fake_minimax.requests) == 1
+
+
+def test_tts_stream_abandoned_leaves_no_cache_entry(monkeypatch, tmp_path, fake_minimax):
+    from app.services import tts_cache, tts_stt
+
+    cache = tts_cache.TtsCache(str(tmp_path / "uploads"), str(tmp_path / "tts_index.sqlite"))
+    monkeypatch.setattr(tts_cache, "_cache", cache)
+    result = tts_stt.text_to_speech_stream("Terima kasih banyak")
+    assert next(result["chunks"]) == b"Teri"
+    result["chunks"].close()  # client disconnected mid-stream
+    assert cache.stats()["entries"] == 0
+    assert not [p for p in (tmp_path / "uploads" / "tts").rglob("*") if p.is_file()]
+
+
+def test_single_flight_coalesces_concurrent_tts(monkeypatch, tmp_path):
+    from app.services import minimax, tts_cache, tts_stt
+    from config import Config
+
+    monkeypatch.setattr(tts_cache, "_cache", tts_cache.TtsCache(str(tmp_path / "uploads"), str(tmp_path / "idx.sqlite")))
+    flight = tts_stt.SingleFlight()
+    monkeypatch.setattr(tts_stt, "_single_flight", flight)
+    with FakeMiniMax(delay=0.3) as server:
+        monkeypatch.setattr(Config, "MINIMAX_API_KEY", "test-key")
+        monkeypatch.setattr(minimax, "_client", minimax_client(server.url))
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: tts_stt.text_to_speech("Halo kelas"), range(8)))
+        assert len(server.requests) == 1
+    assert all(r == results[0] and r["success"] for r in results)
+    assert flight.stats()["leaders"] + flight.stats()["coalesced"] == 8 and flight.stats()["coalesced"] >= 6
+
+
+def test_single_flight_lock_dir_serializes_leaders_across_instances(tmp_path):
+    from app.services.tts_stt import SingleFlight
+
+    # two instances stand in for two worker processes sharing the lock directory and a result cache
+    shared, calls = {}, []
+
+    def work():
+        if "k" in shared:
+            return shared["k"]
+        calls.append(1)
+        time.sleep(0.2)
+        shared["k"] = "audio"
+        return shared["k"]
+
+    a, b = SingleFlight(str(tmp_path / "locks")), SingleFlight(str(tmp_path / "locks"))
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        results = [f.result() for f in [pool.submit(a.do, "tts:k", work), pool.submit(b.do, "tts:k", work)]]
+    assert results == ["audio", "audio"] and len(calls) == 1
+
+    with pytest.raises(ValueError):
+        a.do("bad", lambda: int("x"))
+    assert a.stats()["inFlight"] == 0